@@ -0,0 +1,63 @@
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any
+
+
+def result_key(result: dict[str, Any]) -> str:
+    shape = result.get("shape", {}).get("name", "-")
+    params = json.dumps(result.get("params", {}), sort_keys=True)
+    return f"{result['name']} [{shape}] {params}"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare two benchmark results")
+    parser.add_argument("base", type=Path)
+    parser.add_argument("head", type=Path)
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="Relative slowdown of the median time reported as a regression",
+    )
+    args = parser.parse_args()
+
+    base = {
+        result_key(result): result
+        for result in json.loads(args.base.read_text())["results"]
+    }
+    head = {
+        result_key(result): result
+        for result in json.loads(args.head.read_text())["results"]
+    }
+
+    regressions = []
+    print(f"{'benchmark':<80} {'base':>10} {'head':>10} {'change':>8} {'memory':>8}")
+    for key in sorted(base.keys() & head.keys()):
+        base_median = base[key]["seconds"]["median"]
+        head_median = head[key]["seconds"]["median"]
+        change = head_median / base_median - 1 if base_median else 0.0
+        memory_change = (
+            head[key]["peak_memory_bytes"] / base[key]["peak_memory_bytes"] - 1
+            if base[key]["peak_memory_bytes"]
+            else 0.0
+        )
+        flag = ""
+        if change > args.threshold:
+            regressions.append(key)
+            flag = " !"
+        print(
+            f"{key:<80} {base_median:>10.4f} {head_median:>10.4f} "
+            f"{change:>+8.1%} {memory_change:>+8.1%}{flag}"
+        )
+    for key in sorted(base.keys() ^ head.keys()):
+        print(f"{key:<80} only in {'base' if key in base else 'head'}")
+
+    if regressions:
+        print(f"{len(regressions)} regression(s) over {args.threshold:.0%}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+import argparse
+import json
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable
+
+from shapes import SHAPES, Shape, make_record, record_model
+
+from delibird import Package
+from delibird.encoders.paginated_pydantic_encoder import PaginatedPydanticEncoder
+from delibird.encoders.pydantic_encoder import PydanticEncoder
+
+
+def measure(
+    func: Callable[[], Any],
+    repeat: int,
+    setup: Callable[[], Any] | None = None,
+    teardown: Callable[[], Any] | None = None,
+) -> dict[str, Any]:
+    # Timings come from untraced runs; peak memory from one extra run under
+    # tracemalloc, which would otherwise slow the timed runs down
+    timings = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+        if teardown is not None:
+            teardown()
+
+    if setup is not None:
+        setup()
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        if teardown is not None:
+            teardown()
+
+    return {
+        "seconds": {
+            "min": min(timings),
+            "median": statistics.median(timings),
+            "mean": statistics.mean(timings),
+        },
+        "peak_memory_bytes": peak,
+    }
+
+
+def bench_package(shape: Shape, workdir: Path, repeat: int) -> list[dict[str, Any]]:
+    package = shape.build()
+    package.root = workdir
+    path = workdir / package.name
+
+    def clean() -> None:
+        shutil.rmtree(path, ignore_errors=True)
+
+    results = [
+        {
+            "name": "package.dump",
+            **measure(package.dump, repeat, setup=clean, teardown=clean),
+        }
+    ]
+    package.dump()
+    results.append(
+        {"name": "package.load", **measure(lambda: Package.load(path), repeat)}
+    )
+    clean()
+    return results
+
+
+def bench_encoders(workdir: Path, repeat: int) -> list[dict[str, Any]]:
+    results = []
+    for width in (4, 128):
+        model = record_model(width)
+        record = make_record(model, random.Random(0))
+        path = workdir / "record.json"
+        results.append(
+            {
+                "name": "PydanticEncoder.disk_dump",
+                "params": {"model_width": width},
+                **measure(lambda: PydanticEncoder.disk_dump(record, path), repeat),
+            }
+        )
+        results.append(
+            {
+                "name": "PydanticEncoder.disk_load",
+                "params": {"model_width": width},
+                **measure(lambda: PydanticEncoder.disk_load(path, model), repeat),
+            }
+        )
+
+    model = record_model(32)
+    rng = random.Random(0)
+    records = [make_record(model, rng) for _ in range(10000)]
+    for page_size in (100, 1000, 10000):
+        directory = workdir / f"paginated_{page_size}"
+        directory.mkdir()
+        path = directory / "records.json"
+        results.append(
+            {
+                "name": "PaginatedPydanticEncoder.disk_dump",
+                "params": {"records": len(records), "page_size": page_size},
+                **measure(
+                    lambda: PaginatedPydanticEncoder.disk_dump(
+                        records, path, page_size=page_size
+                    ),
+                    repeat,
+                ),
+            }
+        )
+        results.append(
+            {
+                "name": "PaginatedPydanticEncoder.disk_load",
+                "params": {"records": len(records), "page_size": page_size},
+                **measure(
+                    lambda: PaginatedPydanticEncoder.disk_load(path, model), repeat
+                ),
+            }
+        )
+        shutil.rmtree(directory)
+    return results
+
+
+def bench_s3(
+    shape: Shape, workdir: Path, repeat: int, endpoint_url: str, bucket_name: str
+) -> list[dict[str, Any]]:
+    from delibird.exporters.s3 import S3Exporter
+
+    exporter = S3Exporter(bucket_name=bucket_name, endpoint_url=endpoint_url)
+    package = shape.build()
+    package.root = workdir
+    results = []
+    for compressed in (False, True):
+        params = {"compressed": compressed}
+        results.append(
+            {
+                "name": "S3Exporter.export",
+                "params": params,
+                **measure(
+                    lambda: exporter.export(package, compress=compressed), repeat
+                ),
+            }
+        )
+        results.append(
+            {
+                "name": "S3Exporter.load",
+                "params": params,
+                **measure(
+                    lambda: exporter.load(
+                        package.name, temp_dir=workdir / "tmp", compressed=compressed
+                    ),
+                    repeat,
+                ),
+            }
+        )
+    return results
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the delibird benchmarks")
+    parser.add_argument("--output", type=Path, help="Where to write the JSON results")
+    parser.add_argument(
+        "--shapes", default=",".join(SHAPES), help="Comma separated shape names"
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--s3-endpoint",
+        help="S3 compatible endpoint, e.g. a local MinIO. S3 benchmarks are "
+        "skipped without it",
+    )
+    parser.add_argument("--bucket", default="delibird-bench")
+    args = parser.parse_args()
+
+    results = []
+    workdir = Path(tempfile.mkdtemp(prefix="delibird-bench-"))
+    try:
+        for name in args.shapes.split(","):
+            shape = SHAPES[name]
+            print(f"Benchmarking {name}", file=sys.stderr)
+            shape_results = bench_package(shape, workdir, args.repeat)
+            if args.s3_endpoint:
+                shape_results += bench_s3(
+                    shape, workdir, args.repeat, args.s3_endpoint, args.bucket
+                )
+            for result in shape_results:
+                results.append({"shape": shape.model_dump(), **result})
+        print("Benchmarking encoders", file=sys.stderr)
+        results += bench_encoders(workdir, args.repeat)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "metadata": {
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output is None:
+        print(output)
+    else:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(output)
+
+
+if __name__ == "__main__":
+    main()
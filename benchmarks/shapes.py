@@ -0,0 +1,105 @@
+import random
+from typing import Any
+
+from pydantic import BaseModel, create_model
+
+from delibird import File, Folder, Package
+from delibird.encoders.paginated_pydantic_encoder import PaginatedPydanticEncoder
+
+MODEL_WIDTHS = (4, 32, 128)
+
+
+def _record_model(width: int) -> type[BaseModel]:
+    # Models are module globals so packages holding them can be loaded again
+    fields: dict[str, Any] = {}
+    for i in range(width):
+        fields[f"field_{i}"] = (int, ...) if i % 2 == 0 else (str, ...)
+    return create_model(f"Record{width}", __module__=__name__, **fields)
+
+
+for _width in MODEL_WIDTHS:
+    globals()[f"Record{_width}"] = _record_model(_width)
+
+
+def record_model(width: int) -> type[BaseModel]:
+    return globals()[f"Record{width}"]
+
+
+def make_record(model: type[BaseModel], rng: random.Random) -> BaseModel:
+    return model(
+        **{
+            name: rng.randint(0, 1_000_000)
+            if field.annotation is int
+            else f"value-{rng.randint(0, 1_000_000)}"
+            for name, field in model.model_fields.items()
+        }
+    )
+
+
+class Shape(BaseModel):
+    name: str
+    files_per_folder: int
+    depth: int
+    fanout: int = 1
+    model_width: int = 4
+    paginated_records: int = 0
+    page_size: int = 100
+
+    def build(self, package_name: str | None = None, seed: int = 0) -> Package:
+        # Seeded so every run and every commit benchmarks the same content
+        rng = random.Random(seed)
+        model = record_model(self.model_width)
+        package = Package(name=package_name or f"bench_{self.name}")
+        for i in range(self.fanout):
+            package.add_folder(self._build_folder(f"folder_{i}", 1, model, rng))
+        return package
+
+    def _build_folder(
+        self, name: str, level: int, model: type[BaseModel], rng: random.Random
+    ) -> Folder:
+        folder = Folder(name=name)
+        for i in range(self.files_per_folder):
+            folder.add_file(
+                File(filename=f"file_{i}.json", content=make_record(model, rng))
+            )
+        if self.paginated_records:
+            folder.add_file(
+                File(
+                    filename="records.json",
+                    content=[
+                        make_record(model, rng) for _ in range(self.paginated_records)
+                    ],
+                    content_encoder=PaginatedPydanticEncoder,
+                    dump_kwargs={"page_size": self.page_size},
+                )
+            )
+        if level < self.depth:
+            for i in range(self.fanout):
+                folder.add_folder(
+                    self._build_folder(f"folder_{i}", level + 1, model, rng)
+                )
+        return folder
+
+
+SHAPES = {
+    shape.name: shape
+    for shape in [
+        Shape(name="flat", files_per_folder=1000, depth=1),
+        Shape(name="deep", files_per_folder=5, depth=8, fanout=2),
+        Shape(name="wide_models", files_per_folder=200, depth=1, model_width=128),
+        Shape(
+            name="paginated_small_pages",
+            files_per_folder=0,
+            depth=1,
+            paginated_records=20000,
+            page_size=100,
+        ),
+        Shape(
+            name="paginated_large_pages",
+            files_per_folder=0,
+            depth=1,
+            paginated_records=20000,
+            page_size=5000,
+        ),
+    ]
+}
@@ -0,0 +1,40 @@
+import asyncio
+
+from s3_exporter import build_package
+
+from delibird.exporters.archive import PackageArchiver
+from delibird.exporters.async_s3 import AsyncS3Exporter
+
+
+async def main():
+    async with AsyncS3Exporter(
+        bucket_name="delibird-test", endpoint_url="http://localhost:9000"
+    ) as exporter:
+        packages = [build_package(f"test_async_{i}") for i in range(4)]
+        await asyncio.gather(*(exporter.export(package) for package in packages))
+        loaded_packages = await asyncio.gather(
+            *(exporter.load(package.name) for package in packages)
+        )
+        for package, loaded_package in zip(packages, loaded_packages):
+            assert loaded_package.name == package.name
+            assert loaded_package.folders == package.folders
+
+        await exporter.export_many(packages)
+        names = [package.name for package in packages] * 2
+        loaded_packages = await exporter.load_many(names)
+        for package, loaded_package in zip(packages * 2, loaded_packages):
+            assert loaded_package.folders == package.folders
+
+        package = build_package("test_async_compressed")
+        await exporter.export(package, compress=True)
+        loaded_compressed_package = await exporter.load(package.name, compressed=True)
+        assert loaded_compressed_package.folders == package.folders
+        await exporter.export(
+            package, compress=True, archiver=PackageArchiver("tar.gz")
+        )
+        loaded_compressed_package = await exporter.load(package.name, compressed=True)
+        assert loaded_compressed_package.folders == package.folders
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
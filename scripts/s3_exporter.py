@@ -1,8 +1,17 @@
+import shutil
 from pathlib import Path
 
 from pydantic import BaseModel
 
 from delibird import File, Folder, Package
+from delibird.core import instrumentation
+from delibird.core.instrumentation import MetricsRecorder
+from delibird.core.spill import SpillArea
+from delibird.encoders.paginated_pydantic_encoder import PaginatedPydanticEncoder
+from delibird.exporters.archive import PackageArchiver
+from delibird.exporters.cache import PackageCache
+from delibird.exporters.disk_cache import DiskCache
+from delibird.exporters.pipeline import ExportPipeline
 from delibird.exporters.s3 import S3Exporter
 
 
@@ -11,7 +20,7 @@ class TestContent(BaseModel):
     age: int
 
 
-def build_package(package_name: str) -> Package:
+def build_package(package_name: str, spill_area: SpillArea | None = None) -> Package:
     files = [
         File(filename="test.json", content=TestContent(name="test", age=10)),
         File(filename="test2.json", content=TestContent(name="test2", age=20)),
@@ -30,13 +39,49 @@ def build_package(package_name: str) -> Package:
     folders[1].add_folder(folders[0])
 
     root = Path(".")
-    package = Package(name=package_name, root=root)
+    package = Package(name=package_name, root=root, spill_area=spill_area)
     package.add_folder(folders[0])
     package.add_folder(folders[1])
 
     return package
 
 
+class LargeContent(BaseModel):
+    data: str
+
+
+def export_with_interruption(exporter: S3Exporter, package: Package) -> None:
+    upload_part = exporter.s3.upload_part
+    calls = []
+
+    def failing_upload_part(**kwargs):
+        calls.append(kwargs["PartNumber"])
+        if len(calls) == 2:
+            raise ConnectionError("simulated network failure")
+        return upload_part(**kwargs)
+
+    exporter.s3.upload_part = failing_upload_part
+    try:
+        exporter.export(package, resumable=True)
+    except ConnectionError:
+        pass
+    else:
+        raise AssertionError("export should have been interrupted")
+
+    try:
+        exporter.load(package.name)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("incomplete package should not be loadable")
+
+    exporter.export(package, resumable=True)
+    exporter.s3.upload_part = upload_part
+    # The large file is staged twice (test is nested in test2) with two parts
+    # each. The part uploaded before the failure is not sent again.
+    assert len(calls) == 5
+
+
 def main():
     exporter = S3Exporter(
         bucket_name="delibird-test", endpoint_url="http://localhost:9000"
@@ -59,6 +104,201 @@ def main():
     assert loaded_compressed_package.folders[1].files == package.folders[1].files
     assert loaded_compressed_package.folders[1].folders == package.folders[1].folders
 
+    package = build_package("test_packed")
+    exporter.export(package, enforce_uniqueness=False, pack_threshold=1024)
+    loaded_packed_package = exporter.load(package.name)
+    assert loaded_packed_package.name == package.name
+    assert loaded_packed_package.folders == package.folders
+
+    package = build_package("test_pipelined")
+    exporter.export(package, pipeline=ExportPipeline(compress_level=6))
+    loaded_pipelined_package = exporter.load(package.name)
+    assert loaded_pipelined_package.name == package.name
+    assert loaded_pipelined_package.folders == package.folders
+
+    package = build_package("test_resumable")
+    package.folders[0].add_file(
+        File(filename="large.json", content=LargeContent(data="x" * 12 * 1024 * 1024))
+    )
+    export_with_interruption(exporter, package)
+    loaded_resumable_package = exporter.load(package.name)
+    assert loaded_resumable_package.folders == package.folders
+
+    package = build_package("test_selective")
+    exporter.export(package, pack_threshold=1024)
+    loaded_selected_package = exporter.load(package.name, select="test2/test/*.json")
+    assert [str(folder.name) for folder in loaded_selected_package.folders] == ["test2"]
+    assert loaded_selected_package["test2"].files == []
+    assert loaded_selected_package["test2"]["test"] == package["test2"]["test"]
+
+    packages = [build_package(f"test_many_{i}") for i in range(4)]
+    assert exporter.export_many(packages) == [None] * 4
+    # The same package loaded concurrently gets separate download directories
+    names = [package.name for package in packages] * 2
+    for package, loaded in zip(packages * 2, exporter.load_many(names)):
+        assert loaded.folders == package.folders
+    [missing] = exporter.load_many(["test_missing"], return_exceptions=True)
+    assert isinstance(missing, ValueError)
+
+    assert "test_many_0" in exporter.list_packages()
+    assert "test_compressed" in exporter.list_packages(compressed=True)
+    assert exporter.list_packages(prefix="test_many_") == [
+        package.name for package in packages
+    ]
+    for compressed in (False, True):
+        package = build_package("test_describe")
+        exporter.export(package, compress=compressed, pack_threshold=1024)
+        description = exporter.describe(package.name, compressed=compressed)
+        assert description.compressed == compressed
+        assert description.file_count == 6
+        assert description.folder_count == 3
+        assert description.size > 0
+    assert exporter.describe("test_pipelined").file_count == 6
+
+    package = build_package("test_versioned")
+    package.folders[0].add_file(
+        File(filename="large.json", content=LargeContent(data="x" * 12 * 1024 * 1024))
+    )
+    exporter.export(package, version="1")
+    package["test2"].files[1].content.age = 41
+    upload_file = exporter.s3.upload_file
+    uploaded = []
+    exporter.s3.upload_file = lambda *args, **kwargs: (
+        uploaded.append(args[2]),
+        upload_file(*args, **kwargs),
+    )
+    try:
+        exporter.export(package, version="2", base_version="1")
+    finally:
+        del exporter.s3.upload_file
+    # Only the changed file goes through the client, the rest is copied
+    assert uploaded == ["test_versioned@2/test2/test4.json"]
+    assert exporter.list_versions("test_versioned") == ["1", "2"]
+    loaded_versioned_package = exporter.load("test_versioned", version="2")
+    assert loaded_versioned_package.name == "test_versioned"
+    assert loaded_versioned_package.folders == package.folders
+    assert exporter.load("test_versioned", version="1")["test2"]["test4.json"].age == 40
+
+    package = build_package("test_sharded")
+    exporter.export(package, compress=True, shards=2)
+    assert "test_sharded" in exporter.list_packages(compressed=True)
+    assert "test_sharded.shards" not in exporter.list_packages()
+    loaded_sharded_package = exporter.load(package.name, compressed=True)
+    assert loaded_sharded_package.folders == package.folders
+    loaded_selected_package = exporter.load(
+        package.name, compressed=True, select="test/*.json"
+    )
+    assert [str(folder.name) for folder in loaded_selected_package.folders] == ["test"]
+    assert exporter.describe(package.name, compressed=True).file_count == 6
+    # Fewer shards than before: the stale ones are removed
+    exporter.export(package, compress=True, shards=1)
+    assert [
+        file.key for file in exporter._get_package_files("test_sharded.shards")
+    ] == ["test_sharded.shards/0.zip", "test_sharded.shards/__manifest__.json"]
+    assert exporter.load(package.name, compressed=True).folders == package.folders
+
+    package = build_package("test_archived")
+    exporter.export(package, compress=True)
+    # The format is told apart on load, and the zip from before is removed
+    exporter.export(package, compress=True, archiver=PackageArchiver("tar.xz"))
+    assert [archive.key for archive in exporter._find_archives(package.name)] == [
+        "test_archived.tar.xz"
+    ]
+    assert "test_archived" in exporter.list_packages(compressed=True)
+    assert exporter.load(package.name, compressed=True).folders == package.folders
+    assert exporter.describe(package.name, compressed=True).file_count == 6
+    exporter.export(
+        package,
+        compress=True,
+        archiver=PackageArchiver(levels={"test/*": 9}, level=1),
+    )
+    assert exporter.load(package.name, compressed=True).folders == package.folders
+
+    package = build_package("test_lookup")
+    records = [TestContent(name=f"user_{i}", age=i % 7) for i in range(100)]
+    package["test"].add_file(
+        File(
+            filename="records.json",
+            content=records,
+            content_encoder=PaginatedPydanticEncoder,
+            dump_kwargs={"page_size": 10, "index_fields": ["name", "age"]},
+        )
+    )
+    exporter.export(package)
+    assert exporter.lookup(package.name, "test/records.json", "name", "user_42") == [
+        records[42]
+    ]
+    assert exporter.lookup(package.name, "test/records.json", "age", 3) == [
+        record for record in records if record.age == 3
+    ]
+    selected = exporter.load(package.name, select="test/records.json")
+    assert selected["test"]["records.json"] == records
+    assert exporter.get(package.name, "test/records.json") == records
+    assert exporter.get(package.name, "test2/test/test.json") == package.get(
+        "test2/test/test.json"
+    )
+    exporter.export(package, pack_threshold=1024)
+    assert exporter.get(package.name, "test2/test3.json") == package.get(
+        "test2/test3.json"
+    )
+    pipelined = build_package("test_pipelined_get")
+    exporter.export(pipelined, pipeline=ExportPipeline(compress_level=6))
+    assert exporter.get(pipelined.name, "test/test.json") == pipelined.get(
+        "test/test.json"
+    )
+
+    cached_exporter = S3Exporter(
+        bucket_name="delibird-test",
+        endpoint_url="http://localhost:9000",
+        cache=PackageCache(),
+    )
+    package = build_package("test_cached")
+    cached_exporter.export(package)
+    first = cached_exporter.load(package.name)
+    assert cached_exporter.load(package.name) is first
+    cached_exporter.export(package)
+    assert cached_exporter.load(package.name) is not first
+    assert cached_exporter.cache.hits == 1
+
+    disk_cached_exporter = S3Exporter(
+        bucket_name="delibird-test",
+        endpoint_url="http://localhost:9000",
+        disk_cache=DiskCache(Path(".") / "tmp_cache"),
+    )
+    package = build_package("test_disk_cached")
+    disk_cached_exporter.export(package, pack_threshold=1024)
+    assert disk_cached_exporter.load(package.name).folders == package.folders
+    # Served from the disk cache: downloads would fail without a client
+    disk_cached_exporter.s3.get_object = None
+    assert disk_cached_exporter.load(package.name).folders == package.folders
+    selected = disk_cached_exporter.load(package.name, select="test2/test/*.json")
+    assert selected["test2"]["test"] == package["test2"]["test"]
+    disk_cached_exporter.export(package, compress=True)
+    del disk_cached_exporter.s3.get_object
+    for _ in range(2):
+        loaded = disk_cached_exporter.load(package.name, compressed=True)
+        assert loaded.folders == package.folders
+    shutil.rmtree(disk_cached_exporter.disk_cache.directory)
+
+    spilled = build_package("test_spilled", SpillArea(memory_budget=0))
+    exporter.export(spilled)
+    expected = build_package("test_spilled")
+    assert exporter.load(spilled.name).folders == expected.folders
+
+    recorder = MetricsRecorder()
+    package = build_package("test_instrumented")
+    with instrumentation.subscribed(recorder):
+        exporter.export(package)
+        exporter.load(package.name)
+        exporter.export(package, compress=True)
+        exporter.load(package.name, compressed=True)
+    summary = recorder.summary()
+    assert summary["spans"]["s3.export"]["count"] == 2
+    assert summary["spans"]["s3.archive"]["bytes"] > 0
+    assert summary["counters"]["s3.objects_uploaded"] == 11
+    assert summary["counters"]["s3.objects_downloaded"] == 11
+    assert summary["counters"]["s3.bytes_downloaded"] > 0
+
 
 if __name__ == "__main__":
     main()
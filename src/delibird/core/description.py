@@ -0,0 +1,171 @@
+import json
+from collections import Counter
+from fnmatch import fnmatchcase
+from pathlib import Path
+from typing import Any, Iterator, Mapping
+
+from pydantic import BaseModel, computed_field
+
+from .package import METADATA_FILENAME, FileMetadata
+
+
+class FileDescription(BaseModel):
+    filename: str
+    content_class: str
+    encoder_class: str
+    packed: bool = False
+    size: int | None = None
+
+
+class FolderDescription(BaseModel):
+    name: str
+    files: list[FileDescription] = []
+    folders: list["FolderDescription"] = []
+
+    def iter_files(self) -> Iterator[FileDescription]:
+        yield from self.files
+        for folder in self.folders:
+            yield from folder.iter_files()
+
+    def iter_folders(self) -> Iterator["FolderDescription"]:
+        yield self
+        for folder in self.folders:
+            yield from folder.iter_folders()
+
+
+class PackageDescription(BaseModel):
+    name: str
+    compressed: bool = False
+    complete: bool = True
+    folders: list[FolderDescription] = []
+
+    @computed_field
+    @property
+    def file_count(self) -> int:
+        return sum(1 for _ in self.iter_files())
+
+    @computed_field
+    @property
+    def folder_count(self) -> int:
+        return sum(1 for folder in self.folders for _ in folder.iter_folders())
+
+    @computed_field
+    @property
+    def size(self) -> int:
+        return sum(file.size or 0 for file in self.iter_files())
+
+    @computed_field
+    @property
+    def content_classes(self) -> dict[str, int]:
+        return dict(Counter(file.content_class for file in self.iter_files()))
+
+    @computed_field
+    @property
+    def encoder_classes(self) -> dict[str, int]:
+        return dict(Counter(file.encoder_class for file in self.iter_files()))
+
+    def iter_files(self) -> Iterator[FileDescription]:
+        for folder in self.folders:
+            yield from folder.iter_files()
+
+
+def _class_name(reference: str) -> str:
+    data = json.loads(reference)
+    return f"{data['module']}.{data['name']}"
+
+
+def _file_patterns(file_metadata: Mapping[str, Any]) -> list[str] | None:
+    # Only the encoder is imported, content classes may not be installed where
+    # packages are described. Without a hint from the encoder the objects that
+    # hold the file are unknown.
+    try:
+        encoder = FileMetadata._module_loading(
+            file_metadata, "file_content_encoder_class"
+        )
+    except (ImportError, AttributeError):
+        return None
+    patterns = getattr(encoder, "stored_patterns", None)
+    if patterns is None:
+        return None
+    return patterns(file_metadata["filename"])
+
+
+def _describe_folder(
+    path: str,
+    metadata: Mapping[str, Mapping[str, Any]],
+    objects: Mapping[str, Mapping[str, int]],
+) -> FolderDescription:
+    folder_metadata = metadata[path]
+    packed_files = folder_metadata.get("packed_files", {})
+    names = objects.get(path, {})
+
+    files = []
+    for file_metadata in folder_metadata["files_metadata"]:
+        filename = file_metadata["filename"]
+        size = None
+        if filename in packed_files:
+            size = packed_files[filename]["length"]
+        elif (patterns := _file_patterns(file_metadata)) is not None:
+            size = sum(
+                size
+                for name, size in names.items()
+                if any(fnmatchcase(name, pattern) for pattern in patterns)
+            )
+        files.append(
+            FileDescription(
+                filename=filename,
+                content_class=_class_name(file_metadata["file_content_class"]),
+                encoder_class=_class_name(file_metadata["file_content_encoder_class"]),
+                packed=filename in packed_files,
+                size=size,
+            )
+        )
+
+    folders = [
+        _describe_folder(f"{path}/{name}", metadata, objects)
+        for name in folder_metadata["folders"]
+        if f"{path}/{name}" in metadata
+    ]
+    return FolderDescription(name=path.rpartition("/")[2], files=files, folders=folders)
+
+
+def describe_package(
+    name: str,
+    metadata: Mapping[str, Mapping[str, Any]],
+    sizes: Mapping[str, int],
+    compressed: bool = False,
+    complete: bool = True,
+) -> PackageDescription:
+    # metadata maps folder paths to their raw folder metadata and sizes maps
+    # the path of every stored object to its size, both relative to the
+    # package directory
+    objects: dict[str, dict[str, int]] = {}
+    for path, size in sizes.items():
+        folder, _, filename = path.rpartition("/")
+        objects.setdefault(folder, {})[filename] = size
+
+    return PackageDescription(
+        name=name,
+        compressed=compressed,
+        complete=complete,
+        folders=[
+            _describe_folder(path, metadata, objects)
+            for path in sorted(metadata)
+            if "/" not in path
+        ],
+    )
+
+
+def describe_directory(path: Path) -> PackageDescription:
+    metadata = {}
+    sizes = {}
+    for file_path in path.rglob("*"):
+        if not file_path.is_file():
+            continue
+        relative_path = file_path.relative_to(path).as_posix()
+        sizes[relative_path] = file_path.stat().st_size
+        if file_path.name == METADATA_FILENAME:
+            metadata[relative_path.rpartition("/")[0]] = json.loads(
+                file_path.read_bytes()
+            )
+    return describe_package(path.name, metadata, sizes)
@@ -0,0 +1,187 @@
+import threading
+import time
+import warnings
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Iterator, Mapping, NamedTuple
+
+SPAN = "span"
+COUNTER = "counter"
+PROGRESS = "progress"
+
+
+class Event(NamedTuple):
+    kind: str
+    name: str
+    # Seconds for spans, the increment for counters, the amount done so far
+    # for progress
+    value: float
+    attributes: Mapping[str, Any] = {}
+    total: float | None = None
+    parent: str | None = None
+
+
+Callback = Callable[[Event], None]
+
+# Replaced, never mutated, so emitting iterates without taking the lock and
+# checking whether anyone listens is a single truth test
+_subscribers: tuple[Callback, ...] = ()
+_subscribers_lock = threading.Lock()
+_current_span: ContextVar[str | None] = ContextVar("delibird_span", default=None)
+
+
+def subscribe(callback: Callback) -> Callable[[], None]:
+    global _subscribers
+    with _subscribers_lock:
+        _subscribers = (*_subscribers, callback)
+    return lambda: unsubscribe(callback)
+
+
+def unsubscribe(callback: Callback) -> None:
+    global _subscribers
+    with _subscribers_lock:
+        subscribers = list(_subscribers)
+        if callback in subscribers:
+            subscribers.remove(callback)
+        _subscribers = tuple(subscribers)
+
+
+@contextmanager
+def subscribed(callback: Callback) -> Iterator[Callback]:
+    subscribe(callback)
+    try:
+        yield callback
+    finally:
+        unsubscribe(callback)
+
+
+def enabled() -> bool:
+    return bool(_subscribers)
+
+
+def _emit(event: Event) -> None:
+    for callback in _subscribers:
+        try:
+            callback(event)
+        except Exception as error:
+            # A broken metrics sink must not fail the export it is observing
+            warnings.warn(
+                f"Instrumentation callback {callback!r} failed: {error!r}",
+                RuntimeWarning,
+                stacklevel=2,
+            )
+
+
+class Span:
+    __slots__ = ("name", "attributes", "parent", "_start", "_token")
+
+    def __init__(self, name: str, attributes: dict[str, Any]):
+        self.name = name
+        self.attributes = attributes
+        self.parent = None
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def __enter__(self) -> "Span":
+        self.parent = _current_span.get()
+        self._token = _current_span.set(self.name)
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        duration = time.perf_counter() - self._start
+        _current_span.reset(self._token)
+        if exc_type is not None:
+            self.attributes["error"] = exc_type.__name__
+        _emit(Event(SPAN, self.name, duration, self.attributes, parent=self.parent))
+
+
+class Progress:
+    __slots__ = ("name", "total", "done", "attributes", "_lock")
+
+    def __init__(self, name: str, total: float | None, attributes: dict[str, Any]):
+        self.name = name
+        self.total = total
+        self.done = 0
+        self.attributes = attributes
+        self._lock = threading.Lock()
+
+    def advance(self, amount: float = 1) -> None:
+        # Transfers advance from several threads, the events still count up
+        with self._lock:
+            self.done += amount
+            _emit(Event(PROGRESS, self.name, self.done, self.attributes, self.total))
+
+
+class _Disabled:
+    # Stands in for spans and progress while nobody subscribes. It is falsy so
+    # callers can skip computing attributes that only matter when recorded.
+    __slots__ = ()
+
+    def set(self, **attributes: Any) -> None:
+        pass
+
+    def advance(self, amount: float = 1) -> None:
+        pass
+
+    def __enter__(self) -> "_Disabled":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        pass
+
+    def __bool__(self) -> bool:
+        return False
+
+
+DISABLED = _Disabled()
+
+
+def span(name: str, **attributes: Any) -> Span | _Disabled:
+    if not _subscribers:
+        return DISABLED
+    return Span(name, attributes)
+
+
+def count(name: str, value: float = 1, **attributes: Any) -> None:
+    if not _subscribers:
+        return
+    _emit(Event(COUNTER, name, value, attributes, parent=_current_span.get()))
+
+
+def progress(name: str, total: float | None = None, **attributes: Any):
+    if not _subscribers:
+        return DISABLED
+    return Progress(name, total, attributes)
+
+
+class MetricsRecorder:
+    # A ready made subscriber adding spans and counters up per name
+    def __init__(self):
+        self.spans: dict[str, dict[str, float]] = {}
+        self.counters: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, event: Event) -> None:
+        with self._lock:
+            if event.kind == SPAN:
+                stats = self.spans.setdefault(
+                    event.name, {"count": 0, "seconds": 0.0, "max_seconds": 0.0}
+                )
+                stats["count"] += 1
+                stats["seconds"] += event.value
+                stats["max_seconds"] = max(stats["max_seconds"], event.value)
+                if "bytes" in event.attributes:
+                    stats["bytes"] = stats.get("bytes", 0) + event.attributes["bytes"]
+            elif event.kind == COUNTER:
+                self.counters[event.name] = (
+                    self.counters.get(event.name, 0) + event.value
+                )
+
+    def summary(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "spans": {name: dict(stats) for name, stats in self.spans.items()},
+                "counters": dict(self.counters),
+            }
@@ -1,22 +1,45 @@
 import importlib
 import inspect
 import json
-from copy import deepcopy
+import weakref
+from bisect import bisect_left
+from functools import lru_cache
 from pathlib import Path
-from typing import Annotated, Any, Mapping, Sequence, Type
+from typing import (
+    Annotated,
+    Any,
+    Iterator,
+    Mapping,
+    MutableSequence,
+    Sequence,
+    Type,
+)
 
 from pydantic import (
     BaseModel,
     BeforeValidator,
     ConfigDict,
     Field,
+    PrivateAttr,
     computed_field,
     field_serializer,
+    field_validator,
     model_validator,
 )
 
 from ..encoders.pydantic_encoder import PydanticEncoder
-from .protocols import ContentEncoderProtocol
+from . import instrumentation
+from .packing import PackedFile, pack_files, read_packed_files, unpack_files
+from .protocols import (
+    BytesContentEncoderProtocol,
+    ContentEncoderProtocol,
+    supports_bytes,
+)
+from .selection import PathSelector, Selection, glob_to_regex
+from .spill import SpillArea, SpilledContent
+
+METADATA_FILENAME = "__metadata__"
+INDEX_FILENAME = "__index__"
 
 
 def _ensure_path(p: str | Path) -> Path:
@@ -27,6 +50,20 @@ def _ensure_path(p: str | Path) -> Path:
     raise TypeError(f"Expected str or Path, got {type(p)}")
 
 
+@lru_cache(maxsize=4096)
+def _class_reference(v: Type[Any]) -> str:
+    return json.dumps({"name": v.__name__, "module": inspect.getmodule(v).__name__})
+
+
+@lru_cache(maxsize=4096)
+def _resolve_class_reference(reference: str) -> Type[Any]:
+    data = json.loads(reference)
+    return getattr(
+        importlib.import_module(data["module"]),
+        data["name"],
+    )
+
+
 class FileMetadata(BaseModel):
     filename: str
     file_content_encoder_class: Type[ContentEncoderProtocol]
@@ -43,17 +80,15 @@ class FileMetadata(BaseModel):
     def serialize_file_content_class(self, v: Type[Any]) -> str:
         return self._module_dumping(v)
 
+    # A package holds few distinct classes, so references are built and
+    # resolved once per class rather than once per file
     @staticmethod
     def _module_dumping(v: Type[Any]) -> str:
-        return json.dumps({"name": v.__name__, "module": inspect.getmodule(v).__name__})
+        return _class_reference(v)
 
     @staticmethod
     def _module_loading(metadata: Mapping[str, str], field_name: str) -> Type[Any]:
-        data = json.loads(metadata[field_name])
-        return getattr(
-            importlib.import_module(data["module"]),
-            data["name"],
-        )
+        return _resolve_class_reference(metadata[field_name])
 
     @classmethod
     def load(cls, data: dict) -> "FileMetadata":
@@ -64,6 +99,10 @@ class FileMetadata(BaseModel):
         return cls.model_validate(data)
 
 
+# Shared by every model built without validation, all of them set every field
+_FILE_METADATA_FIELDS = set(FileMetadata.model_fields)
+
+
 class FolderMetadata(BaseModel):
     files_metadata: Annotated[
         Sequence[FileMetadata],
@@ -72,17 +111,21 @@ class FolderMetadata(BaseModel):
     folders: Annotated[
         Sequence[str], Field(..., description="The names of the folders in the package")
     ] = []
+    packed_files: Annotated[
+        Mapping[str, PackedFile],
+        Field(..., description="The location of the files packed into blobs"),
+    ] = {}
 
     def append(self, file_metadata: FileMetadata):
         self.files_metadata.append(file_metadata)
 
     def dump(self, path: Path) -> None:
-        with open(path / "__metadata__", "w") as f:
+        with open(path / METADATA_FILENAME, "w") as f:
             f.write(self.model_dump_json())
 
     @classmethod
     def load(cls, path: Path) -> "FolderMetadata":
-        with open(path / "__metadata__", "r") as f:
+        with open(path / METADATA_FILENAME, "r") as f:
             data = json.loads(f.read())
             data["files_metadata"] = [
                 FileMetadata.load(file_metadata)
@@ -97,6 +140,263 @@ class FolderMetadata(BaseModel):
         return self.files_metadata[idx]
 
 
+class PackageIndex(BaseModel):
+    files: Annotated[
+        Sequence[str], Field(..., description="The paths of the files in the package")
+    ] = []
+    folders: Annotated[
+        Sequence[str],
+        Field(..., description="The paths of the folders in the package"),
+    ] = []
+
+    def dump(self, path: Path) -> None:
+        with open(path / INDEX_FILENAME, "w") as f:
+            f.write(self.model_dump_json())
+
+    @classmethod
+    def load(cls, path: Path) -> "PackageIndex":
+        with open(path / INDEX_FILENAME, "r") as f:
+            return cls.model_validate_json(f.read())
+
+
+class _Parents:
+    # Back-references from a folder to the folders and packages holding it.
+    # They are not part of the folder's value, so every instance compares equal.
+    # References are weak, a folder does not keep short lived packages alive.
+    __slots__ = ("refs",)
+
+    def __init__(self):
+        self.refs: list[weakref.ref] = []
+
+    def add(self, parent: Any) -> None:
+        self.refs.append(weakref.ref(parent))
+
+    def __iter__(self) -> Iterator[Any]:
+        parents = [ref() for ref in self.refs]
+        if any(parent is None for parent in parents):
+            self.refs = [
+                ref for ref, parent in zip(self.refs, parents) if parent is not None
+            ]
+        return (parent for parent in parents if parent is not None)
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, _Parents)
+
+    def __reduce__(self):
+        # Copies start without parents, the copied folders and packages
+        # register themselves again once their own state is in place
+        return _Parents, ()
+
+
+class _PathIndex:
+    # Derived from the folder tree, so it is left out of comparisons as well
+    __slots__ = ("paths", "sorted_paths")
+
+    def __init__(self):
+        self.paths: dict[str, _FileRecord | Folder] = {}
+        self.sorted_paths: list[str] | None = None
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, _PathIndex)
+
+
+class _FileRecord:
+    # What a folder keeps per file. A File model and its metadata cost several
+    # times as much, so they are only built when a file is handed out or
+    # dumped. Encoders are classes, every record refers to the same object.
+    __slots__ = ("filename", "content", "content_encoder", "_dump_kwargs")
+
+    def __init__(
+        self,
+        filename: str,
+        content: Any,
+        content_encoder: Type[ContentEncoderProtocol],
+        dump_kwargs: Mapping[str, Any] | None = None,
+    ):
+        self.filename = filename
+        self.content = content
+        self.content_encoder = content_encoder
+        self.dump_kwargs = dump_kwargs
+
+    @property
+    def dump_kwargs(self) -> Mapping[str, Any]:
+        if self._dump_kwargs is None:
+            return {}
+        return self._dump_kwargs
+
+    @dump_kwargs.setter
+    def dump_kwargs(self, dump_kwargs: Mapping[str, Any] | None) -> None:
+        # Most files have none, they do not each hold an empty dict
+        self._dump_kwargs = dump_kwargs or None
+
+    @classmethod
+    def of(cls, file: "File") -> "_FileRecord":
+        return cls(file.filename, file.content, file.content_encoder, file.dump_kwargs)
+
+    @classmethod
+    def load(
+        cls,
+        folder_path: Path,
+        filename: str,
+        content_class: Type[Any],
+        dump_kwargs: Mapping[str, Any] | None = None,
+        content_encoder_class: Type[ContentEncoderProtocol] = PydanticEncoder,
+        **kwargs,
+    ) -> "_FileRecord":
+        with instrumentation.span("file.load", filename=filename):
+            content = content_encoder_class.disk_load(
+                folder_path / filename,
+                content_class,
+                **kwargs,
+            )
+        return cls(filename, content, content_encoder_class, dump_kwargs)
+
+    @classmethod
+    def loads(
+        cls,
+        data: bytes,
+        filename: str,
+        content_class: Type[Any],
+        dump_kwargs: Mapping[str, Any] | None = None,
+        content_encoder_class: Type[BytesContentEncoderProtocol] = PydanticEncoder,
+        **kwargs,
+    ) -> "_FileRecord":
+        with instrumentation.span("file.load", filename=filename, bytes=len(data)):
+            content = content_encoder_class.loads(data, content_class, **kwargs)
+        return cls(filename, content, content_encoder_class, dump_kwargs)
+
+    def file(self) -> "File":
+        # The content was validated when the file was added or decoded by its
+        # encoder, so the model is built without validating it again
+        file = File.model_construct(
+            _FILE_FIELDS,
+            filename=self.filename,
+            content=self.content,
+            content_encoder=self.content_encoder,
+            dump_kwargs=self.dump_kwargs,
+        )
+        file._record.record = self
+        return file
+
+    def materialize(self) -> Any:
+        # The content itself, decoded from the spill area if it was spilled
+        if isinstance(self.content, SpilledContent):
+            return self.content.load()
+        return self.content
+
+    def metadata(self) -> FileMetadata:
+        if isinstance(self.content, SpilledContent):
+            content_class = self.content.content_class
+        else:
+            content_class = self.content_encoder.base_dump_class(self.content)
+        return FileMetadata.model_construct(
+            _FILE_METADATA_FIELDS,
+            filename=self.filename,
+            file_content_class=content_class,
+            file_content_encoder_class=self.content_encoder,
+            file_dump_kwargs=self.dump_kwargs,
+        )
+
+    def dump(self, path: Path, **kwargs) -> None:
+        _kwargs = {**self.dump_kwargs, **kwargs}
+        with instrumentation.span("file.dump", filename=self.filename):
+            # Spilled content is already encoded with these kwargs, so its
+            # files are copied over instead of being decoded and encoded again
+            if (
+                isinstance(self.content, SpilledContent)
+                and _kwargs == self.content.dump_kwargs
+            ):
+                self.content.copy_to(path)
+                return
+            self.content_encoder.disk_dump(
+                self.materialize(), path / self.filename, **_kwargs
+            )
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, (_FileRecord, File)):
+            return NotImplemented
+        return (
+            self.filename == other.filename
+            and self.content == other.content
+            and self.content_encoder == other.content_encoder
+            and self.dump_kwargs == other.dump_kwargs
+        )
+
+
+class _RecordLink:
+    # The record a file was added as or built from, so assignments to the
+    # file reach the folder. Not part of the file's value.
+    __slots__ = ("record",)
+
+    def __init__(self):
+        self.record: _FileRecord | None = None
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, _RecordLink)
+
+
+class _FileList(MutableSequence):
+    # The files of a folder, as File models built from its records on access.
+    # Changes go through the folder, so its indexes follow them.
+    __slots__ = ("records", "_folder")
+
+    def __init__(self, records: list[_FileRecord]):
+        self.records = records
+        self._folder: weakref.ref | None = None
+
+    def __reduce__(self):
+        # The folder attaches itself again once copied or unpickled
+        return _FileList, (self.records,)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __getitem__(self, idx: int | slice) -> "File | list[File]":
+        if isinstance(idx, slice):
+            return [record.file() for record in self.records[idx]]
+        return self.records[idx].file()
+
+    def __setitem__(self, idx: int, file: "File") -> None:
+        if isinstance(idx, slice):
+            raise TypeError("Files are replaced one at a time")
+        replaced = self.records[idx]
+        if file.filename != replaced.filename and isinstance(
+            self._folder()._index.get(str(file.filename)), _FileRecord
+        ):
+            raise ValueError(f"File {file.filename} already exists")
+        del self[idx]
+        self.insert(idx, file)
+
+    def __delitem__(self, idx: int | slice) -> None:
+        records = self.records[idx] if isinstance(idx, slice) else [self.records[idx]]
+        for record in records:
+            self._folder().remove_file(record.file())
+
+    def insert(self, idx: int, file: "File") -> None:
+        self._folder()._add_record(file._bound_record(), idx)
+
+    def __iter__(self) -> Iterator["File"]:
+        return (record.file() for record in self.records)
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, _FileList):
+            return self.records == other.records
+        if not isinstance(other, Sequence):
+            return NotImplemented
+        return len(self.records) == len(other) and all(
+            record == file for record, file in zip(self.records, other)
+        )
+
+    def __add__(self, other: Sequence["File"]) -> list["File"]:
+        return [*self, *other]
+
+    def __radd__(self, other: Sequence["File"]) -> list["File"]:
+        return [*other, *self]
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+
 class File(BaseModel):
     filename: Annotated[str, Field(..., description="The name of the file")]
     content: Annotated[
@@ -120,19 +420,29 @@ class File(BaseModel):
             description="The kwargs used to dump the file. Will be passed to the content encoder",
         ),
     ] = {}
+    _record: _RecordLink = PrivateAttr(default_factory=_RecordLink)
 
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
     @model_validator(mode="after")
     def validate_content_encoder(self):
-        if not self.content_encoder.validate_content(self.content):
-            raise ValueError(f"Invalid content: {self.content}")
+        if isinstance(self.content, SpilledContent):
+            return self
+        with instrumentation.span("file.validate", filename=self.filename):
+            if not self.content_encoder.validate_content(self.content):
+                raise ValueError(f"Invalid content: {self.content}")
         return self
 
+    def __setattr__(self, name: str, value: Any) -> None:
+        super().__setattr__(name, value)
+        if name in _FILE_FIELDS and self._record.record is not None:
+            setattr(self._record.record, name, value)
+
+    def materialize(self) -> Any:
+        return self._as_record().materialize()
+
     def dump(self, path: Path, **kwargs) -> None:
-        _kwargs = deepcopy(self.dump_kwargs)
-        _kwargs.update(kwargs)
-        self.content_encoder.disk_dump(self.content, path / self.filename, **_kwargs)
+        self._as_record().dump(path, **kwargs)
 
     @classmethod
     def load(
@@ -144,104 +454,315 @@ class File(BaseModel):
         content_encoder_class: Type[ContentEncoderProtocol] = PydanticEncoder,
         **kwargs,
     ) -> "File":
-        content = content_encoder_class.disk_load(
-            folder_path / filename,
+        return _FileRecord.load(
+            folder_path,
+            filename,
             content_class,
+            dump_kwargs,
+            content_encoder_class,
             **kwargs,
-        )
-        if dump_kwargs is None:
-            dump_kwargs = {}
-        return cls(
-            filename=filename,
-            content=content,
-            content_encoder=content_encoder_class,
-            dump_kwargs=dump_kwargs,
-        )
+        ).file()
+
+    @classmethod
+    def loads(
+        cls,
+        data: bytes,
+        filename: str,
+        content_class: Type[Any],
+        dump_kwargs: Mapping[str, Any] | None = None,
+        content_encoder_class: Type[BytesContentEncoderProtocol] = PydanticEncoder,
+        **kwargs,
+    ) -> "File":
+        return _FileRecord.loads(
+            data, filename, content_class, dump_kwargs, content_encoder_class, **kwargs
+        ).file()
 
     @computed_field
     @property
     def metadata(self) -> FileMetadata:
-        return FileMetadata(
-            filename=self.filename,
-            file_content_class=self.content_encoder.base_dump_class(self.content),
-            file_content_encoder_class=self.content_encoder,
-            file_dump_kwargs=self.dump_kwargs,
-        )
+        return self._as_record().metadata()
+
+    def _as_record(self) -> _FileRecord:
+        # Once added to a folder, the record is what the folder dumps and what
+        # the spill area swaps the content of
+        if self._record.record is not None:
+            return self._record.record
+        return _FileRecord.of(self)
+
+    def _bound_record(self) -> _FileRecord:
+        if self._record.record is None:
+            self._record.record = _FileRecord.of(self)
+        return self._record.record
+
+
+_FILE_FIELDS = set(File.model_fields)
 
 
 class Folder(BaseModel):
     name: Annotated[Path, BeforeValidator(_ensure_path)]
     files: Annotated[Sequence[File], Field(default_factory=list)]
     folders: Annotated[Sequence["Folder"], Field(default_factory=list)]
-    folder_metadata: Annotated[FolderMetadata, Field(default_factory=FolderMetadata)]
     _index: Mapping[str, Any]
+    _parents: _Parents
 
     def model_post_init(self, context: Any):
-        self._index = {str(file.filename): file.content for file in self.files}
+        # Files are kept as records and indexed rather than their content, so
+        # spilling a file leaves no other reference to the content behind
+        records = [file._bound_record() for file in self.files]
+        self.__dict__["files"] = _FileList(records)
+        self._parents = _Parents()
+        self._reindex()
+
+    # Copied and unpickled folders start without parents, and their index is
+    # rebuilt from the copied files and folders
+    def __deepcopy__(self, memo: dict[int, Any] | None = None) -> "Folder":
+        copied = super().__deepcopy__({} if memo is None else memo)
+        copied._reindex()
+        return copied
+
+    def __setstate__(self, state: dict[Any, Any]) -> None:
+        super().__setstate__(state)
+        self._reindex()
+
+    def model_copy(
+        self, *, update: Mapping[str, Any] | None = None, deep: bool = False
+    ) -> "Folder":
+        copied = super().model_copy(update=update, deep=deep)
+        # Deep copies with updates are made without going through __deepcopy__
+        if deep and update:
+            copied._reindex()
+        return copied
+
+    def _reindex(self) -> None:
+        self.files._folder = weakref.ref(self)
+        self._index = {str(record.filename): record for record in self.files.records}
         self._index.update({str(folder.name): folder for folder in self.folders})
+        for folder in self.folders:
+            folder._parents.add(self)
+
+    @field_serializer("files")
+    def serialize_files(self, files: Sequence[File]) -> list[File]:
+        return list(files)
+
+    @field_validator("files", mode="before")
+    @classmethod
+    def validate_files(cls, files: Any) -> Any:
+        # Files of another folder are taken as models, not rebuilt as its list
+        if isinstance(files, _FileList):
+            return list(files)
+        return files
+
+    @model_validator(mode="wrap")
+    @classmethod
+    def validate_folder_metadata(cls, data: Any, handler: Any) -> "Folder":
+        # The metadata is derived from the files and folders. It is still
+        # accepted, e.g. from a dump, as long as it describes the same ones.
+        folder_metadata = None
+        if isinstance(data, Mapping) and "folder_metadata" in data:
+            data = dict(data)
+            folder_metadata = data.pop("folder_metadata")
+        folder = handler(data)
+        if folder_metadata is not None:
+            if not isinstance(folder_metadata, FolderMetadata):
+                folder_metadata = FolderMetadata.model_validate(folder_metadata)
+            expected = folder.folder_metadata
+            if list(folder_metadata.files_metadata) != expected.files_metadata or (
+                list(folder_metadata.folders) != expected.folders
+            ):
+                raise ValueError(
+                    f"folder_metadata does not match the files and folders of "
+                    f"{folder.name}"
+                )
+        return folder
+
+    @computed_field
+    @property
+    def folder_metadata(self) -> FolderMetadata:
+        return FolderMetadata(
+            files_metadata=[record.metadata() for record in self.files.records],
+            folders=[str(folder.name) for folder in self.folders],
+        )
 
     def add_file(self, file: File):
-        if file.filename in [f.filename for f in self.files]:
-            raise ValueError(f"File {file.filename} already exists")
-        self.files.append(file)
-        self.folder_metadata.append(file.metadata)
-        self._index[str(file.filename)] = file.content
+        self._add_record(file._bound_record())
         return self
 
+    def _add_record(self, record: _FileRecord, idx: int | None = None) -> None:
+        if isinstance(self._index.get(str(record.filename)), _FileRecord):
+            raise ValueError(f"File {record.filename} already exists")
+        if idx is None:
+            self.files.records.append(record)
+        else:
+            self.files.records.insert(idx, record)
+        self._index[str(record.filename)] = record
+        self._add_paths([(str(record.filename), record)])
+
     def remove_file(self, file: File):
-        idx = self.files.index(file)
-        self.files.remove(file)
-        self.folder_metadata.files_metadata.pop(idx)
+        record = self._index.get(str(file.filename))
+        if not isinstance(record, _FileRecord) or (
+            record is not file._record.record and record != file
+        ):
+            raise ValueError(f"File {file.filename} does not exist")
+        records = self.files.records
+        records.pop(next(i for i, r in enumerate(records) if r is record))
         self._index.pop(str(file.filename))
+        self._remove_paths([str(file.filename)])
         return self
 
     def add_folder(self, folder: "Folder"):
-        if folder.name in [f.name for f in self.folders]:
+        if isinstance(self._index.get(str(folder.name)), Folder):
             raise ValueError(f"Folder {folder.name} already exists")
         self.folders.append(folder)
-        self.folder_metadata.folders.append(str(folder.name))
         self._index[str(folder.name)] = folder
+        folder._parents.add(self)
+        self._add_paths(folder._walk(prefix=f"{folder.name}/", include_self=True))
         return self
 
-    def dump(self, path: Path, **kwargs) -> None:
+    def _walk(
+        self, prefix: str = "", include_self: bool = False
+    ) -> Iterator[tuple[str, "_FileRecord | Folder"]]:
+        if include_self:
+            yield prefix.removesuffix("/"), self
+        for record in self.files.records:
+            yield f"{prefix}{record.filename}", record
+        for folder in self.folders:
+            yield from folder._walk(f"{prefix}{folder.name}/", include_self=True)
+
+    def _add_paths(self, entries: Iterator[tuple[str, "_FileRecord | Folder"]]) -> None:
+        # Paths are passed up to every package holding this folder, so their
+        # flat indexes stay current as the tree is built
+        entries = list(entries)
+        for parent in self._parents:
+            parent._add_paths((f"{self.name}/{path}", item) for path, item in entries)
+
+    def _remove_paths(self, paths: list[str]) -> None:
+        for parent in self._parents:
+            parent._remove_paths([f"{self.name}/{path}" for path in paths])
+
+    def dump(self, path: Path, pack_threshold: int | None = None, **kwargs) -> None:
+        with instrumentation.span("folder.dump", folder=str(self.name)):
+            self._dump(path, pack_threshold, **kwargs)
+
+    def _dump(self, path: Path, pack_threshold: int | None = None, **kwargs) -> None:
         full_path = path / self.name
         full_path.mkdir(parents=True, exist_ok=True)
-        for file in self.files:
-            file.dump(full_path, **kwargs)
+        for record in self.files.records:
+            record.dump(full_path, **kwargs)
         for folder in self.folders:
-            folder.dump(full_path, **kwargs)
-        self.folder_metadata.dump(full_path)
+            folder.dump(full_path, pack_threshold=pack_threshold, **kwargs)
+
+        folder_metadata = self.folder_metadata
+        if pack_threshold is not None:
+            with instrumentation.span("folder.pack", folder=str(self.name)):
+                packed_files = pack_files(
+                    full_path,
+                    [record.filename for record in self.files.records],
+                    pack_threshold,
+                )
+            folder_metadata = folder_metadata.model_copy(
+                update={"packed_files": packed_files}
+            )
+        folder_metadata.dump(full_path)
 
     @classmethod
-    def load(cls, path: Path, level: int = 0) -> "Folder":
-        folder_metadata = FolderMetadata.load(path)
-        files = []
-        for file_metadata in folder_metadata.files_metadata:
-            file = File.load(
-                folder_path=path,
-                filename=file_metadata.filename,
-                content_encoder_class=file_metadata.file_content_encoder_class,
-                content_class=file_metadata.file_content_class,
-                dump_kwargs=file_metadata.file_dump_kwargs,
-            )
-            files.append(file)
+    def load(
+        cls,
+        path: Path,
+        level: int = 0,
+        select: Selection | PathSelector | None = None,
+        prefix: str = "",
+    ) -> "Folder":
+        with instrumentation.span("folder.load", folder=path.name):
+            return cls._load(path, level, select, prefix)
+
+    @classmethod
+    def _load(
+        cls,
+        path: Path,
+        level: int = 0,
+        select: Selection | PathSelector | None = None,
+        prefix: str = "",
+    ) -> "Folder":
+        if select is not None and not isinstance(select, PathSelector):
+            select = PathSelector(select)
 
-        folders = [
-            cls.load(path / folder_name, level=level + 1)
-            for folder_name in folder_metadata.folders
+        folder_metadata = FolderMetadata.load(path)
+        files_metadata = [
+            file_metadata
+            for file_metadata in folder_metadata.files_metadata
+            if select is None
+            or select.matches(f"{prefix}{file_metadata.filename}", file_metadata)
         ]
+        # Packed files may already be on disk, e.g. fetched with a ranged read.
+        # Encoders that decode bytes read theirs straight from the blob, the
+        # others get them written out next to the blob first.
+        in_memory = {}
+        on_disk = {}
+        for file_metadata in files_metadata:
+            packed_file = folder_metadata.packed_files.get(file_metadata.filename)
+            if packed_file is None or (path / file_metadata.filename).exists():
+                continue
+            if supports_bytes(file_metadata.file_content_encoder_class):
+                in_memory[file_metadata.filename] = packed_file
+            else:
+                on_disk[file_metadata.filename] = packed_file
+        packed_data = read_packed_files(path, in_memory)
+        unpacked = unpack_files(path, on_disk)
+
+        records = []
+        # Unpacked copies are removed even when a file fails to load, otherwise
+        # later loads would prefer them over the blob
+        try:
+            for file_metadata in files_metadata:
+                if file_metadata.filename in packed_data:
+                    record = _FileRecord.loads(
+                        packed_data.pop(file_metadata.filename),
+                        filename=file_metadata.filename,
+                        content_encoder_class=file_metadata.file_content_encoder_class,
+                        content_class=file_metadata.file_content_class,
+                        dump_kwargs=file_metadata.file_dump_kwargs,
+                    )
+                else:
+                    record = _FileRecord.load(
+                        folder_path=path,
+                        filename=file_metadata.filename,
+                        content_encoder_class=file_metadata.file_content_encoder_class,
+                        content_class=file_metadata.file_content_class,
+                        dump_kwargs=file_metadata.file_dump_kwargs,
+                    )
+                records.append(record)
+        finally:
+            for file_path in unpacked:
+                file_path.unlink(missing_ok=True)
+
+        folders = []
+        for folder_name in folder_metadata.folders:
+            if select is not None and not select.may_contain(f"{prefix}{folder_name}"):
+                continue
+            folder = cls.load(
+                path / folder_name,
+                level=level + 1,
+                select=select,
+                prefix=f"{prefix}{folder_name}/",
+            )
+            if select is None or folder.files or folder.folders:
+                folders.append(folder)
 
         if level != 0:
             _path = path.relative_to(path.parent)
         else:
             _path = path
 
-        return cls(
-            name=_path, files=files, folders=folders, folder_metadata=folder_metadata
-        )
+        folder = cls(name=_path, folders=folders)
+        for record in records:
+            folder._add_record(record)
+        return folder
 
     def __getitem__(self, key: str) -> Any:
-        return self._index[key]
+        item = self._index[key]
+        if isinstance(item, _FileRecord):
+            return item.materialize()
+        return item
 
 
 class Package(BaseModel):
@@ -251,31 +772,164 @@ class Package(BaseModel):
         Sequence[Folder],
         Field(default_factory=list, description="The folders in the package"),
     ]
+    spill_area: Annotated[
+        SpillArea | None,
+        Field(
+            default=None,
+            exclude=True,
+            description="Where file content goes once it exceeds the memory budget",
+        ),
+    ]
     _index: Mapping[str, Any]
+    _paths: _PathIndex
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
 
     def model_post_init(self, context: Any):
+        self._reindex()
+
+    def __deepcopy__(self, memo: dict[int, Any] | None = None) -> "Package":
+        copied = super().__deepcopy__({} if memo is None else memo)
+        copied._reindex()
+        return copied
+
+    def __setstate__(self, state: dict[Any, Any]) -> None:
+        super().__setstate__(state)
+        self._reindex()
+
+    def model_copy(
+        self, *, update: Mapping[str, Any] | None = None, deep: bool = False
+    ) -> "Package":
+        copied = super().model_copy(update=update, deep=deep)
+        if deep and update:
+            copied._reindex()
+        return copied
+
+    def _reindex(self) -> None:
+        # Rebuilt rather than copied, a copied index would still point into
+        # the original tree
         self._index = {str(folder.name): folder for folder in self.folders}
+        self._paths = _PathIndex()
+        for folder in self.folders:
+            folder._parents.add(self)
+            self._add_paths(folder._walk(prefix=f"{folder.name}/", include_self=True))
 
     def add_folder(self, folder: Folder):
-        if folder.name in [f.name for f in self.folders]:
+        if str(folder.name) in self._index:
             raise ValueError(f"Folder {folder.name} already exists")
         self.folders.append(folder)
         self._index[str(folder.name)] = folder
+        folder._parents.add(self)
+        self._add_paths(folder._walk(prefix=f"{folder.name}/", include_self=True))
 
         return self
 
-    def dump(self, **kwargs) -> None:
-        for folder in self.folders:
-            folder.dump(self.root / self.name, **kwargs)
+    def get(self, path: str, default: Any = None) -> Any:
+        # Same result as chaining item lookups through every folder on the path
+        item = self._paths.paths.get(path.strip("/"))
+        if item is None:
+            return default
+        if isinstance(item, _FileRecord):
+            return item.materialize()
+        return item
+
+    def paths(self, prefix: str = "") -> list[str]:
+        # The sorted path list is rebuilt lazily after the tree changes, then
+        # every prefix query is a binary search
+        if self._paths.sorted_paths is None:
+            self._paths.sorted_paths = sorted(self._paths.paths)
+        sorted_paths = self._paths.sorted_paths
+        paths = []
+        for path in sorted_paths[bisect_left(sorted_paths, prefix) :]:
+            if not path.startswith(prefix):
+                break
+            paths.append(path)
+        return paths
+
+    def glob(self, pattern: str) -> list[str]:
+        regex = glob_to_regex(pattern)
+        literal_end = min(
+            (i for i, char in enumerate(pattern) if char in "*?["), default=len(pattern)
+        )
+        return [path for path in self.paths(pattern[:literal_end]) if regex.match(path)]
+
+    @property
+    def index(self) -> PackageIndex:
+        paths = self.paths()
+        return PackageIndex(
+            files=[
+                path
+                for path in paths
+                if isinstance(self._paths.paths[path], _FileRecord)
+            ],
+            folders=[
+                path for path in paths if isinstance(self._paths.paths[path], Folder)
+            ],
+        )
+
+    def _add_paths(self, entries: Iterator[tuple[str, _FileRecord | Folder]]) -> None:
+        entries = list(entries)
+        self._paths.paths.update(entries)
+        self._paths.sorted_paths = None
+        if self.spill_area is not None:
+            for _, item in entries:
+                if isinstance(item, _FileRecord):
+                    self.spill_area.track(item)
+
+    def _remove_paths(self, paths: list[str]) -> None:
+        for path in paths:
+            item = self._paths.paths.pop(path, None)
+            if self.spill_area is not None and isinstance(item, _FileRecord):
+                self.spill_area.release(item)
+        self._paths.sorted_paths = None
+
+    def dump(self, pack_threshold: int | None = None, **kwargs) -> None:
+        with instrumentation.span("package.dump", package=self.name):
+            for folder in self.folders:
+                folder.dump(
+                    self.root / self.name, pack_threshold=pack_threshold, **kwargs
+                )
+            (self.root / self.name).mkdir(parents=True, exist_ok=True)
+            self.index.dump(self.root / self.name)
 
     @classmethod
-    def load(cls, path: Path) -> "Package":
-        folders = [
-            Folder.load(folder_name, level=1)
-            for folder_name in path.iterdir()
-            if folder_name.is_dir()
-        ]
+    def load(cls, path: Path, select: Selection | None = None) -> "Package":
+        with instrumentation.span("package.load", package=path.name):
+            return cls._load(path, select)
+
+    @classmethod
+    def _load(cls, path: Path, select: Selection | None = None) -> "Package":
+        if select is None:
+            folders = [
+                Folder.load(path / name, level=1) for name in cls._folder_names(path)
+            ]
+            return cls(name=path.name, root=path.parent, folders=folders)
+
+        selector = PathSelector(select)
+        folders = []
+        for name in cls._folder_names(path):
+            if not selector.may_contain(name):
+                continue
+            folder = Folder.load(
+                path / name, level=1, select=selector, prefix=f"{name}/"
+            )
+            if folder.files or folder.folders:
+                folders.append(folder)
         return cls(name=path.name, root=path.parent, folders=folders)
 
+    @staticmethod
+    def _folder_names(path: Path) -> list[str]:
+        # The index names the package's folders, so directories that are not
+        # part of it are never mistaken for folders and the order does not
+        # depend on the filesystem. Selective downloads may leave some out.
+        if (path / INDEX_FILENAME).exists():
+            return [
+                name
+                for name in PackageIndex.load(path).folders
+                if "/" not in name and (path / name).is_dir()
+            ]
+        # Dumped before the index existed
+        return sorted(entry.name for entry in path.iterdir() if entry.is_dir())
+
     def __getitem__(self, key: str) -> Any:
         return self._index[key]
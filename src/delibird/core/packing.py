@@ -0,0 +1,75 @@
+import mmap
+import os
+from pathlib import Path
+from typing import Iterable, Mapping
+
+from pydantic import BaseModel
+
+PACK_FILENAME = "__pack__"
+
+
+class PackedFile(BaseModel):
+    blob: str
+    offset: int
+    length: int
+
+
+def pack_files(
+    folder_path: Path, filenames: Iterable[str], threshold: int
+) -> dict[str, PackedFile]:
+    # Only files the encoder wrote under their own name can be packed. Encoders
+    # that spread content over several files (e.g. pagination) are left as is.
+    blob_path = folder_path / PACK_FILENAME
+    packed = {}
+    offset = 0
+    with open(blob_path, "wb") as blob:
+        for filename in filenames:
+            file_path = folder_path / filename
+            if not file_path.is_file() or file_path.stat().st_size > threshold:
+                continue
+            data = file_path.read_bytes()
+            blob.write(data)
+            packed[filename] = PackedFile(
+                blob=PACK_FILENAME, offset=offset, length=len(data)
+            )
+            offset += len(data)
+            file_path.unlink()
+
+    if not packed:
+        blob_path.unlink()
+    return packed
+
+
+def read_packed_files(
+    folder_path: Path, packed: Mapping[str, PackedFile]
+) -> dict[str, bytes]:
+    # Blobs are memory-mapped, so only the ranges asked for are copied out
+    blobs: dict[str, list[tuple[str, PackedFile]]] = {}
+    for filename, entry in packed.items():
+        blobs.setdefault(entry.blob, []).append((filename, entry))
+
+    data = {}
+    for blob, entries in blobs.items():
+        with open(folder_path / blob, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                # Empty files packed on their own, an empty blob cannot be mapped
+                data.update((filename, b"") for filename, _ in entries)
+                continue
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+                for filename, entry in entries:
+                    data[filename] = view[entry.offset : entry.offset + entry.length]
+    return data
+
+
+def unpack_files(folder_path: Path, packed: Mapping[str, PackedFile]) -> list[Path]:
+    unpacked = []
+    try:
+        for filename, data in read_packed_files(folder_path, packed).items():
+            file_path = folder_path / filename
+            file_path.write_bytes(data)
+            unpacked.append(file_path)
+    except BaseException:
+        for file_path in unpacked:
+            file_path.unlink(missing_ok=True)
+        raise
+    return unpacked
@@ -1,3 +1,4 @@
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Protocol, Type, runtime_checkable
 
@@ -17,3 +18,20 @@ class ContentEncoderProtocol(Protocol):
 
     @staticmethod
     def base_dump_class(content: Any, **kwargs) -> Type[Any]: ...
+
+
+@runtime_checkable
+class BytesContentEncoderProtocol(ContentEncoderProtocol, Protocol):
+    # Encoders writing a single file can also encode to and decode from bytes,
+    # so content can be moved without going through the filesystem
+    @staticmethod
+    def dumps(content: Any, **kwargs) -> bytes: ...
+
+    @staticmethod
+    def loads(data: bytes, klass: Type[BaseModel], **kwargs) -> Any: ...
+
+
+@lru_cache(maxsize=256)
+def supports_bytes(encoder: Type[ContentEncoderProtocol]) -> bool:
+    # Checking a runtime protocol inspects every member, once per class is enough
+    return isinstance(encoder, BytesContentEncoderProtocol)
@@ -0,0 +1,84 @@
+import re
+from fnmatch import fnmatchcase
+from typing import TYPE_CHECKING, Any, Callable, Sequence
+
+if TYPE_CHECKING:
+    from .package import FileMetadata
+
+Selection = str | Sequence[str] | Callable[[str, "FileMetadata"], bool]
+
+
+def glob_to_regex(pattern: str) -> re.Pattern:
+    # `*`, `?` and `[...]` stay within a path segment, `**` spans segments
+    parts = []
+    i, n = 0, len(pattern)
+    while i < n:
+        if pattern.startswith("**/", i):
+            parts.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("**", i):
+            parts.append(".*")
+            i += 2
+        elif pattern[i] == "*":
+            parts.append("[^/]*")
+            i += 1
+        elif pattern[i] == "?":
+            parts.append("[^/]")
+            i += 1
+        elif pattern[i] == "[" and (end := pattern.find("]", i + 2)) != -1:
+            body = pattern[i + 1 : end].replace("\\", "\\\\")
+            if body.startswith("!"):
+                body = "^" + body[1:]
+            parts.append(f"[{body}]")
+            i = end + 1
+        else:
+            parts.append(re.escape(pattern[i]))
+            i += 1
+    return re.compile("".join(parts) + r"\Z")
+
+
+def stored_patterns(encoder: Any, filename: str) -> list[str]:
+    # Encoders may tell which names they write for a file. Without that hint
+    # every object in the folder has to be considered part of the file.
+    patterns = getattr(encoder, "stored_patterns", None)
+    if patterns is None:
+        return ["*"]
+    return patterns(filename)
+
+
+class PathSelector:
+    def __init__(self, selection: Selection):
+        self.predicate = None
+        self.patterns: list[str] = []
+        if callable(selection):
+            self.predicate = selection
+        elif isinstance(selection, str):
+            self.patterns = [selection]
+        else:
+            self.patterns = list(selection)
+        self._regexes = [glob_to_regex(pattern) for pattern in self.patterns]
+        self._segments = [pattern.split("/") for pattern in self.patterns]
+
+    def matches(self, path: str, file_metadata: "FileMetadata") -> bool:
+        if self.predicate is not None:
+            return self.predicate(path, file_metadata)
+        return any(regex.match(path) for regex in self._regexes)
+
+    def may_contain(self, folder_path: str) -> bool:
+        if self.predicate is not None:
+            return True
+        folder_segments = folder_path.split("/")
+        return any(
+            self._may_contain(segments, folder_segments) for segments in self._segments
+        )
+
+    @staticmethod
+    def _may_contain(pattern_segments: list[str], folder_segments: list[str]) -> bool:
+        for i, folder_segment in enumerate(folder_segments):
+            if i >= len(pattern_segments):
+                return False
+            if "**" in pattern_segments[i]:
+                return True
+            if not fnmatchcase(folder_segment, pattern_segments[i]):
+                return False
+        return len(pattern_segments) > len(folder_segments)
@@ -0,0 +1,169 @@
+import shutil
+import sys
+import tempfile
+import threading
+import uuid
+import weakref
+from collections import OrderedDict
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Mapping, Type
+
+from pydantic import BaseModel
+
+from . import instrumentation
+from .protocols import ContentEncoderProtocol
+
+if TYPE_CHECKING:
+    from .package import _FileRecord
+
+
+def estimate_size(content: Any) -> int:
+    # Deep size of the objects reachable from the content, counting shared
+    # objects once. Far cheaper than encoding just to measure.
+    seen = set()
+    stack = [content]
+    total = 0
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)
+        if isinstance(obj, BaseModel):
+            stack.append(obj.__dict__)
+        elif isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(obj)
+    return total
+
+
+class SpilledContent:
+    # Stands in for the content of a file once it was encoded to a spill area.
+    # The content is decoded again on every access and never kept.
+    __slots__ = (
+        "area",
+        "directory",
+        "filename",
+        "content_encoder",
+        "content_class",
+        "dump_kwargs",
+    )
+
+    def __init__(
+        self,
+        area: "SpillArea",
+        directory: Path,
+        filename: str,
+        content_encoder: Type[ContentEncoderProtocol],
+        content_class: Type[Any],
+        dump_kwargs: Mapping[str, Any],
+    ):
+        self.area = area
+        self.directory = directory
+        self.filename = filename
+        self.content_encoder = content_encoder
+        self.content_class = content_class
+        self.dump_kwargs = dump_kwargs
+
+    def load(self) -> Any:
+        return self.content_encoder.disk_load(
+            self.directory / self.filename, self.content_class
+        )
+
+    def copy_to(self, path: Path) -> None:
+        # Everything the encoder wrote, e.g. every page of a paginated file
+        for source in self.directory.iterdir():
+            shutil.copyfile(source, path / source.name)
+
+    @property
+    def size(self) -> int:
+        return sum(path.stat().st_size for path in self.directory.iterdir())
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, SpilledContent):
+            return self.directory == other.directory or self.load() == other.load()
+        return self.load() == other
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"SpilledContent({self.directory / self.filename})"
+
+
+class SpillArea:
+    # Files tracked here are encoded to disk, oldest first, whenever the
+    # estimated size of the content still in memory goes over the budget
+    def __init__(
+        self,
+        directory: Path | None = None,
+        memory_budget: int = 1024 * 1024 * 1024,
+        size_of: Callable[[Any], int] = estimate_size,
+    ):
+        if directory is None:
+            directory = Path(tempfile.mkdtemp(prefix="delibird-spill-"))
+            self._finalizer = weakref.finalize(
+                self, shutil.rmtree, directory, ignore_errors=True
+            )
+        else:
+            directory.mkdir(parents=True, exist_ok=True)
+            self._finalizer = None
+        self.directory = directory
+        self.memory_budget = memory_budget
+        self.size_of = size_of
+        self.resident_bytes = 0
+        self._resident: OrderedDict[int, tuple["_FileRecord", int]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def track(self, file: "_FileRecord") -> None:
+        if isinstance(file.content, SpilledContent):
+            return
+        size = self.size_of(file.content)
+        to_spill = []
+        with self._lock:
+            if id(file) in self._resident:
+                return
+            self._resident[id(file)] = (file, size)
+            self.resident_bytes += size
+            while self.resident_bytes > self.memory_budget and self._resident:
+                _, (oldest, oldest_size) = self._resident.popitem(last=False)
+                self.resident_bytes -= oldest_size
+                to_spill.append(oldest)
+        for oldest in to_spill:
+            self.spill(oldest)
+
+    def release(self, file: "_FileRecord") -> None:
+        with self._lock:
+            entry = self._resident.pop(id(file), None)
+            if entry is not None:
+                self.resident_bytes -= entry[1]
+
+    def spill(self, file: "_FileRecord") -> SpilledContent:
+        if isinstance(file.content, SpilledContent):
+            return file.content
+        self.release(file)
+        directory = self.directory / uuid.uuid4().hex
+        directory.mkdir()
+        with instrumentation.span("file.spill", filename=file.filename) as span:
+            file.content_encoder.disk_dump(
+                file.content, directory / file.filename, **file.dump_kwargs
+            )
+            handle = SpilledContent(
+                self,
+                directory,
+                file.filename,
+                file.content_encoder,
+                file.content_encoder.base_dump_class(file.content),
+                file.dump_kwargs,
+            )
+            if span:
+                span.set(bytes=handle.size)
+        file.content = handle
+        return handle
+
+    def cleanup(self) -> None:
+        with self._lock:
+            self._resident.clear()
+            self.resident_bytes = 0
+        shutil.rmtree(self.directory, ignore_errors=True)
@@ -1,14 +1,27 @@
+import glob
 import json
 from pathlib import Path
-from typing import Any, Sequence, Type
+from typing import Any, Callable, Sequence, Type
 
 from pydantic import BaseModel
 
+from ..core import instrumentation
+
+
+def _index_name(path: Path) -> str:
+    return f"{path.stem}.index.json"
+
+
+def _index_key(value: Any) -> str:
+    return json.dumps(value, sort_keys=True)
+
 
 class PaginatedPydanticEncoder:
     @staticmethod
     def disk_dump(content: Sequence[BaseModel], path: Path, **kwargs) -> None:
         page_size = kwargs.pop("page_size", 10)
+        index_fields = kwargs.pop("index_fields", [])
+        index = {field: {} for field in index_fields}
         total_pages = len(content) // page_size
         if len(content) % page_size != 0:
             total_pages += 1
@@ -16,8 +29,56 @@ class PaginatedPydanticEncoder:
             page_content = content[
                 page_number * page_size : (page_number + 1) * page_size
             ]
-            with open(path.parent / f"{path.stem}_{page_number}.json", "w") as f:
-                json.dump([page.model_dump(**kwargs) for page in page_content], f)
+            with instrumentation.span(
+                "encoder.encode", encoder="PaginatedPydanticEncoder"
+            ):
+                rows = [page.model_dump(**kwargs) for page in page_content]
+                data = json.dumps(rows)
+            with instrumentation.span("fs.write", bytes=len(data)):
+                with open(path.parent / f"{path.stem}_{page_number}.json", "w") as f:
+                    f.write(data)
+            for row_number, row in enumerate(rows):
+                for field in index_fields:
+                    index[field].setdefault(_index_key(row[field]), []).append(
+                        [page_number, row_number]
+                    )
+
+        # Maps every value of the indexed fields to the page and row holding it
+        if index_fields:
+            with open(path.parent / _index_name(path), "w") as f:
+                json.dump(index, f)
+
+    @staticmethod
+    def lookup(
+        path: Path,
+        klass: Type[BaseModel],
+        field: str,
+        value: Any,
+        read: Callable[[str], bytes] | None = None,
+    ) -> list[BaseModel]:
+        # read returns the content of a file next to path given its name, so
+        # lookups work the same on disk and against remote storage
+        if read is None:
+
+            def read(name: str) -> bytes:
+                return (path.parent / name).read_bytes()
+
+        try:
+            index = json.loads(read(_index_name(path)))
+        except FileNotFoundError:
+            raise ValueError(f"File {path.name} has no index") from None
+        if field not in index:
+            raise ValueError(f"Field {field} is not indexed in {path.name}")
+
+        positions = index[field].get(_index_key(value), [])
+        pages = {}
+        for page_number, _ in positions:
+            if page_number not in pages:
+                pages[page_number] = json.loads(read(f"{path.stem}_{page_number}.json"))
+        return [
+            klass.model_validate(pages[page_number][row_number])
+            for page_number, row_number in positions
+        ]
 
     @staticmethod
     def disk_load(path: Path, klass: Type[BaseModel], **kwargs) -> Sequence[BaseModel]:
@@ -26,9 +87,20 @@ class PaginatedPydanticEncoder:
         files.sort(key=lambda x: int(x.stem.split("_")[-1]))
         content = []
         for file in files:
-            with open(file, "r") as f:
-                content.extend(json.load(f))
-        return [klass.model_validate(item) for item in content]
+            with instrumentation.span("fs.read") as span:
+                data = file.read_bytes()
+                span.set(bytes=len(data))
+            with instrumentation.span(
+                "encoder.decode", encoder="PaginatedPydanticEncoder"
+            ):
+                content.extend(json.loads(data))
+        with instrumentation.span("encoder.decode", encoder="PaginatedPydanticEncoder"):
+            return [klass.model_validate(item) for item in content]
+
+    @staticmethod
+    def stored_patterns(filename: str) -> list[str]:
+        stem = glob.escape(Path(filename).stem)
+        return [f"{stem}_*.json", f"{stem}.index.json"]
 
     @staticmethod
     def validate_content(content: Any, **kwargs) -> bool:
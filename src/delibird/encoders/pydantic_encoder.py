@@ -1,19 +1,41 @@
+import glob
 from pathlib import Path
 from typing import Any, Type
 
 from pydantic import BaseModel
 
+from ..core import instrumentation
+
 
 class PydanticEncoder:
     @staticmethod
     def disk_dump(content: BaseModel, path: Path, **kwargs) -> None:
-        with open(path, "w") as f:
-            f.write(content.model_dump_json(**kwargs))
+        data = PydanticEncoder.dumps(content, **kwargs)
+        with instrumentation.span("fs.write", bytes=len(data)):
+            path.write_bytes(data)
 
     @staticmethod
     def disk_load(path: Path, klass: Type[BaseModel], **kwargs) -> BaseModel:
-        with open(path, "r") as f:
-            return klass.model_validate_json(f.read(), **kwargs)
+        with instrumentation.span("fs.read") as span:
+            data = path.read_bytes()
+            span.set(bytes=len(data))
+        return PydanticEncoder.loads(data, klass, **kwargs)
+
+    @staticmethod
+    def dumps(content: BaseModel, **kwargs) -> bytes:
+        # Same output as model_dump_json, without decoding it to str first
+        with instrumentation.span("encoder.encode", encoder="PydanticEncoder"):
+            return content.__pydantic_serializer__.to_json(content, **kwargs)
+
+    @staticmethod
+    def loads(data: bytes, klass: Type[BaseModel], **kwargs) -> BaseModel:
+        # The validator parses the UTF-8 bytes itself, no str is built
+        with instrumentation.span("encoder.decode", encoder="PydanticEncoder"):
+            return klass.model_validate_json(data, **kwargs)
+
+    @staticmethod
+    def stored_patterns(filename: str) -> list[str]:
+        return [glob.escape(filename)]
 
     @staticmethod
     def validate_content(content: Any, **kwargs) -> bool:
@@ -0,0 +1,223 @@
+import bz2
+import gzip
+import io
+import lzma
+import os
+import tarfile
+import zipfile
+import zlib
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from fnmatch import fnmatchcase
+from pathlib import Path
+from typing import BinaryIO, Callable, Mapping, Sequence
+
+from ..core import instrumentation
+
+ARCHIVE_SUFFIXES = {
+    "zip": ".zip",
+    "tar.gz": ".tar.gz",
+    "tar.bz2": ".tar.bz2",
+    "tar.xz": ".tar.xz",
+}
+# Already compressed content gains nothing from another pass
+STORED_PATTERNS = (
+    "*.zip",
+    "*.gz",
+    "*.tgz",
+    "*.bz2",
+    "*.xz",
+    "*.zst",
+    "*.lz4",
+    "*.7z",
+    "*.png",
+    "*.jpg",
+    "*.jpeg",
+    "*.gif",
+    "*.webp",
+    "*.mp3",
+    "*.mp4",
+    "*.parquet",
+)
+PROBE_SIZE = 64 * 1024
+CHUNK_SIZE = 8 * 1024 * 1024
+
+
+def archive_format(name: str) -> str | None:
+    for format, suffix in ARCHIVE_SUFFIXES.items():
+        if name.endswith(suffix):
+            return format
+    return None
+
+
+def is_compressible(data: bytes) -> bool:
+    # A fast pass over a sample tells binary or compressed data apart
+    sample = data[:PROBE_SIZE]
+    return len(zlib.compress(sample, 1)) < 0.9 * len(sample)
+
+
+def extract_archive(archive_path: Path, destination: Path) -> None:
+    format = archive_format(archive_path.name)
+    if format is None:
+        raise ValueError(f"Unknown archive format: {archive_path.name}")
+    with instrumentation.span("archive.extract", format=format):
+        if format == "zip":
+            with zipfile.ZipFile(archive_path) as archive:
+                archive.extractall(destination)
+        else:
+            with tarfile.open(archive_path, "r:*") as archive:
+                archive.extractall(destination, filter="data")
+
+
+class _ChunkWriter(io.RawIOBase):
+    # The uncompressed tar stream is cut into chunks that are compressed
+    # concurrently, each into a stream of its own, and written out in order.
+    # Concatenated gzip, bz2 and xz streams read back as a single file.
+    def __init__(
+        self,
+        output: BinaryIO,
+        compress: Callable[[bytes], bytes],
+        chunk_size: int,
+        executor: ThreadPoolExecutor,
+        max_pending: int,
+    ):
+        self.output = output
+        self.compress = compress
+        self.chunk_size = chunk_size
+        self.executor = executor
+        self.max_pending = max_pending
+        self._buffer = bytearray()
+        self._pending: deque[Future] = deque()
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._buffer += data
+        while len(self._buffer) >= self.chunk_size:
+            self._submit(bytes(self._buffer[: self.chunk_size]))
+            del self._buffer[: self.chunk_size]
+        return len(data)
+
+    def finish(self) -> None:
+        if self._buffer:
+            self._submit(bytes(self._buffer))
+            self._buffer.clear()
+        while self._pending:
+            self.output.write(self._pending.popleft().result())
+
+    def _submit(self, chunk: bytes) -> None:
+        self._pending.append(self.executor.submit(self.compress, chunk))
+        # Bounds the chunks held in memory, compressed or not
+        while len(self._pending) > self.max_pending:
+            self.output.write(self._pending.popleft().result())
+
+
+class PackageArchiver:
+    def __init__(
+        self,
+        format: str = "zip",
+        level: int | None = None,
+        levels: Mapping[str, int] | None = None,
+        max_workers: int | None = None,
+        chunk_size: int = CHUNK_SIZE,
+        stored_patterns: Sequence[str] = STORED_PATTERNS,
+        probe_threshold: int | None = 1024 * 1024,
+    ):
+        if format not in ARCHIVE_SUFFIXES:
+            raise ValueError(
+                f"Unknown archive format {format}, expected one of "
+                f"{', '.join(ARCHIVE_SUFFIXES)}"
+            )
+        if levels and format != "zip":
+            raise ValueError("Per-entry compression levels require a zip archive")
+        self.format = format
+        self.level = level
+        # Glob patterns matched against member paths, the first match wins
+        self.levels = dict(levels or {})
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.stored_patterns = tuple(stored_patterns)
+        # Members at least this large are sampled and stored when they do not
+        # compress. None turns sampling off.
+        self.probe_threshold = probe_threshold
+
+    @property
+    def suffix(self) -> str:
+        return ARCHIVE_SUFFIXES[self.format]
+
+    def write(self, source: Path, archive_path: Path) -> None:
+        members = [
+            (path, path.relative_to(source).as_posix())
+            for path in sorted(source.rglob("*"))
+            if path.is_file()
+        ]
+        with instrumentation.span("archive.write", format=self.format) as span:
+            if self.format == "zip":
+                self._write_zip(members, archive_path)
+            else:
+                self._write_tar(members, archive_path)
+            if span:
+                span.set(bytes=archive_path.stat().st_size)
+
+    def _write_zip(self, members: list[tuple[Path, str]], archive_path: Path) -> None:
+        # Members are independent, each gets its own method and level
+        with zipfile.ZipFile(archive_path, "w") as archive:
+            for path, name in members:
+                if self._stored(path, name):
+                    archive.write(path, name, compress_type=zipfile.ZIP_STORED)
+                else:
+                    archive.write(
+                        path,
+                        name,
+                        compress_type=zipfile.ZIP_DEFLATED,
+                        compresslevel=self._level(name),
+                    )
+
+    def _write_tar(self, members: list[tuple[Path, str]], archive_path: Path) -> None:
+        # The codecs release the GIL, so threads compress on every core
+        with (
+            open(archive_path, "wb") as output,
+            ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="delibird-archive"
+            ) as executor,
+        ):
+            writer = _ChunkWriter(
+                output,
+                self._compress_chunk,
+                self.chunk_size,
+                executor,
+                2 * self.max_workers,
+            )
+            with tarfile.open(
+                fileobj=writer, mode="w|", format=tarfile.PAX_FORMAT
+            ) as archive:
+                for path, name in members:
+                    archive.add(path, name, recursive=False)
+            writer.finish()
+
+    def _compress_chunk(self, chunk: bytes) -> bytes:
+        # Chunks that do not compress go through the codec's fastest setting
+        fast = self.probe_threshold is not None and not is_compressible(chunk)
+        if self.format == "tar.gz":
+            level = 0 if fast else 9 if self.level is None else self.level
+            return gzip.compress(chunk, compresslevel=level, mtime=0)
+        if self.format == "tar.bz2":
+            level = 1 if fast else 9 if self.level is None else self.level
+            return bz2.compress(chunk, compresslevel=level)
+        return lzma.compress(chunk, preset=0 if fast else self.level)
+
+    def _level(self, name: str) -> int | None:
+        for pattern, level in self.levels.items():
+            if fnmatchcase(name, pattern):
+                return level
+        return self.level
+
+    def _stored(self, path: Path, name: str) -> bool:
+        filename = name.rpartition("/")[2]
+        if any(fnmatchcase(filename, pattern) for pattern in self.stored_patterns):
+            return True
+        if self.probe_threshold is None or path.stat().st_size < self.probe_threshold:
+            return False
+        with open(path, "rb") as f:
+            return not is_compressible(f.read(PROBE_SIZE))
@@ -0,0 +1,172 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, Iterable
+
+from .. import Package
+from ..core.description import PackageDescription
+from ..core.selection import Selection
+from .archive import PackageArchiver
+from .cache import PackageCache
+from .disk_cache import DiskCache
+from .pipeline import ExportPipeline
+from .s3 import S3Exporter
+from .transfer import TransferController
+
+
+class AsyncS3Exporter:
+    # max_concurrency bounds how many exporter calls (whole exports, loads,
+    # listings...) run at once. The object transfers within those calls are
+    # bounded by the transfer controller, shared by all of them.
+    def __init__(
+        self,
+        bucket_name: str,
+        endpoint_url: str | None = None,
+        max_concurrency: int = 16,
+        cache: PackageCache | None = None,
+        transfer: TransferController | None = None,
+        disk_cache: DiskCache | None = None,
+    ):
+        self.bucket_name = bucket_name
+        self.endpoint_url = endpoint_url
+        self.max_concurrency = max_concurrency
+        self.cache = cache
+        self.transfer = transfer
+        self.disk_cache = disk_cache
+        self._exporter: S3Exporter | None = None
+        self._executor: ThreadPoolExecutor | None = None
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def open(self) -> "AsyncS3Exporter":
+        # boto3 clients are blocking and thread-safe, so every call is sent to a
+        # dedicated pool and the event loop only awaits the results.
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_concurrency, thread_name_prefix="delibird-s3"
+            )
+        if self._exporter is None:
+            self._exporter = await self._run(
+                S3Exporter,
+                self.bucket_name,
+                self.endpoint_url,
+                transfer=self.transfer,
+                cache=self.cache,
+                disk_cache=self.disk_cache,
+            )
+        return self
+
+    async def close(self) -> None:
+        if self._executor is not None:
+            # Waiting for the calls still running would block the event loop
+            executor, self._executor = self._executor, None
+            await asyncio.to_thread(executor.shutdown, wait=True)
+        self._exporter = None
+
+    async def __aenter__(self) -> "AsyncS3Exporter":
+        return await self.open()
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def _run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._executor, partial(func, *args, **kwargs)
+            )
+
+    async def _get_exporter(self) -> S3Exporter:
+        await self.open()
+        await self._run(self._exporter._ensure_bucket)
+        return self._exporter
+
+    async def export(
+        self,
+        package: Package,
+        enforce_uniqueness: bool = False,
+        compress: bool = False,
+        pack_threshold: int | None = None,
+        pipeline: ExportPipeline | None = None,
+        resumable: bool = False,
+        version: str | None = None,
+        base_version: str | None = None,
+        shards: int | None = None,
+        archiver: PackageArchiver | None = None,
+    ):
+        # Uploads already run concurrently inside the blocking exporter, so the
+        # whole export is handed to the pool and the event loop stays free
+        exporter = await self._get_exporter()
+        await self._run(
+            exporter.export,
+            package,
+            enforce_uniqueness=enforce_uniqueness,
+            compress=compress,
+            pack_threshold=pack_threshold,
+            pipeline=pipeline,
+            resumable=resumable,
+            version=version,
+            base_version=base_version,
+            shards=shards,
+            archiver=archiver,
+        )
+
+    async def export_many(
+        self,
+        packages: Iterable[Package],
+        return_exceptions: bool = False,
+        **kwargs,
+    ) -> list[Exception | None]:
+        return await asyncio.gather(
+            *(self.export(package, **kwargs) for package in packages),
+            return_exceptions=return_exceptions,
+        )
+
+    async def load_many(
+        self,
+        package_names: Iterable[str],
+        return_exceptions: bool = False,
+        **kwargs,
+    ) -> list[Package | Exception]:
+        return await asyncio.gather(
+            *(self.load(package_name, **kwargs) for package_name in package_names),
+            return_exceptions=return_exceptions,
+        )
+
+    async def list_packages(
+        self, compressed: bool = False, prefix: str = ""
+    ) -> list[str]:
+        exporter = await self._get_exporter()
+        return await self._run(exporter.list_packages, compressed, prefix)
+
+    async def describe(
+        self, package_name: str, compressed: bool = False
+    ) -> PackageDescription:
+        exporter = await self._get_exporter()
+        return await self._run(exporter.describe, package_name, compressed)
+
+    async def get(
+        self, package_name: str, path: str, version: str | None = None
+    ) -> Any:
+        exporter = await self._get_exporter()
+        return await self._run(exporter.get, package_name, path, version)
+
+    async def load(
+        self,
+        package_name: str,
+        temp_dir: Path = Path(".") / "tmp",
+        compressed: bool = False,
+        require_complete: bool = True,
+        select: Selection | None = None,
+        version: str | None = None,
+    ) -> Package:
+        exporter = await self._get_exporter()
+        return await self._run(
+            exporter.load,
+            package_name,
+            temp_dir=temp_dir,
+            compressed=compressed,
+            require_complete=require_complete,
+            select=select,
+            version=version,
+        )
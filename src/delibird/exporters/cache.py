@@ -0,0 +1,99 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Hashable
+
+from .. import Package
+from ..core.spill import estimate_size
+
+
+def estimate_package_size(package: Package) -> int:
+    # What a loaded package takes in memory. Decoded content takes several
+    # times its size on disk, so this is what the cache budget is charged.
+    contents = []
+    folders = list(package.folders)
+    while folders:
+        folder = folders.pop()
+        contents.extend((file.filename, file.content) for file in folder.files)
+        folders.extend(folder.folders)
+    return estimate_size(contents)
+
+
+class CacheEntry:
+    __slots__ = ("package", "version", "size", "checked_at")
+
+    def __init__(self, package: Package, version: str, size: int):
+        self.package = package
+        self.version = version
+        self.size = size
+        self.checked_at = time.monotonic()
+
+
+class PackageCache:
+    # Cached packages are shared by every caller that loads them, so they must
+    # be treated as read-only. max_bytes bounds their estimated size in memory.
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024, revalidate_after: float = 0):
+        self.max_bytes = max_bytes
+        self.revalidate_after = revalidate_after
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[Hashable, CacheEntry] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def get(self, key: Hashable, version: str | None = None) -> Package | None:
+        # Without a version, only entries checked within revalidate_after are
+        # returned. With one, the entry is returned if it is still current.
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                now = time.monotonic()
+                if version is None:
+                    if now - entry.checked_at < self.revalidate_after:
+                        self._entries.move_to_end(key)
+                        self.hits += 1
+                        return entry.package
+                    return None
+                if entry.version == version:
+                    entry.checked_at = now
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry.package
+                self._remove(key)
+            if version is not None:
+                self.misses += 1
+            return None
+
+    def put(
+        self, key: Hashable, version: str, package: Package, size: int | None = None
+    ) -> None:
+        if size is None:
+            size = estimate_package_size(package)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if size > self.max_bytes:
+                return
+            self._entries[key] = CacheEntry(package, version, size)
+            self.size += size
+            while self.size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def _remove(self, key: Hashable) -> None:
+        self.size -= self._entries.pop(key).size
@@ -0,0 +1,53 @@
+import os
+import threading
+from typing import Any
+
+import boto3
+from botocore.config import Config
+
+MAX_POOL_CONNECTIONS = 128
+
+_clients: dict[tuple, Any] = {}
+_lock = threading.Lock()
+
+
+def get_s3_client(
+    endpoint_url: str | None = None,
+    max_pool_connections: int = MAX_POOL_CONNECTIONS,
+    max_attempts: int = 1,
+    timeout: float | None = None,
+) -> Any:
+    # boto3 clients are thread-safe once created, but creating them is not and
+    # costs tens of milliseconds, so one client (and its connection pool) is
+    # shared by every exporter with the same settings. Clients do not survive
+    # a fork, hence the process id in the key.
+    key = (os.getpid(), endpoint_url, max_pool_connections, max_attempts, timeout)
+    client = _clients.get(key)
+    if client is not None:
+        return client
+
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            # By default retries are left to the transfer controller, which
+            # needs to see throttling errors to adapt its concurrency. A
+            # timeout cuts off requests that hang instead of failing.
+            config = Config(
+                retries={"total_max_attempts": max_attempts, "mode": "standard"},
+                max_pool_connections=max_pool_connections,
+                tcp_keepalive=True,
+            )
+            if timeout is not None:
+                config = config.merge(
+                    Config(connect_timeout=timeout, read_timeout=timeout)
+                )
+            client = boto3.session.Session().client(
+                "s3", endpoint_url=endpoint_url, config=config
+            )
+            _clients[key] = client
+        return client
+
+
+def clear_s3_clients() -> None:
+    with _lock:
+        _clients.clear()
@@ -0,0 +1,161 @@
+import hashlib
+import os
+import shutil
+import threading
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterator
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+from ..core import instrumentation
+
+
+class DiskCache:
+    # Entries are immutable files named after the object's ETag and size, so
+    # any process can serve them. Fills are written to a temporary file and
+    # renamed into place, and per-entry locks (striped over a fixed set of
+    # lock files) keep concurrent processes from downloading the same object.
+    def __init__(self, directory: Path, max_bytes: int = 1024 * 1024 * 1024):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        (self.directory / "objects").mkdir(parents=True, exist_ok=True)
+        (self.directory / "locks").mkdir(parents=True, exist_ok=True)
+        self._added = 0
+        self._added_lock = threading.Lock()
+
+    def path(self, etag: str, size: int) -> Path | None:
+        entry = self._entry(etag, size)
+        if not entry.exists():
+            return None
+        self._touch(entry)
+        return entry
+
+    def fetch(
+        self,
+        etag: str,
+        size: int,
+        destination: Path,
+        fill: Callable[[Path], None],
+    ) -> None:
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        if size > self.max_bytes:
+            # It would only evict everything else and then itself
+            instrumentation.count("disk_cache.misses")
+            fill(destination)
+            return
+        entry = self._entry(etag, size)
+        # Linking is what tells a hit apart, so an entry evicted by another
+        # process right after being found is refilled, not handed out missing
+        hit = self._materialize(entry, destination)
+        added = 0
+        if not hit:
+            with self._lock(entry.name[:2]):
+                hit = self._materialize(entry, destination)
+                if not hit:
+                    added = self._fill(entry, destination, fill)
+        if hit:
+            self._touch(entry)
+        instrumentation.count("disk_cache.hits" if hit else "disk_cache.misses")
+        if added:
+            self._added_bytes(entry, added)
+
+    def _fill(
+        self, entry: Path, destination: Path, fill: Callable[[Path], None]
+    ) -> int:
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        temp = entry.with_name(f"{entry.name}.{uuid.uuid4().hex}.tmp")
+        try:
+            fill(temp)
+            size = temp.stat().st_size
+            if size > self.max_bytes:
+                # Archives are cached without knowing their size up front
+                destination.unlink(missing_ok=True)
+                shutil.move(temp, destination)
+                return 0
+            # The destination is linked before the entry is published, so
+            # eviction can never take it away
+            self._materialize(temp, destination)
+            os.replace(temp, entry)
+        finally:
+            temp.unlink(missing_ok=True)
+        return size
+
+    def _added_bytes(self, entry: Path, size: int) -> None:
+        with self._added_lock:
+            self._added += size
+            # Scanning the cache is not free, so eviction only runs once a
+            # tenth of the budget has been added by this process.
+            should_evict = self._added > self.max_bytes // 10
+            if should_evict:
+                self._added = 0
+        if should_evict:
+            self.evict(keep=entry)
+
+    def evict(self, keep: Path | None = None) -> None:
+        with self._lock("evict"):
+            entries = []
+            total = 0
+            for entry in (self.directory / "objects").rglob("*"):
+                if not entry.is_file() or entry.suffix == ".tmp":
+                    continue
+                stat = entry.stat()
+                total += stat.st_size
+                if entry != keep:
+                    entries.append((stat.st_mtime, stat.st_size, entry))
+            entries.sort()
+            for _, size, entry in entries:
+                if total <= self.max_bytes:
+                    break
+                entry.unlink(missing_ok=True)
+                total -= size
+                instrumentation.count("disk_cache.evictions")
+
+    def clear(self) -> None:
+        with self._lock("evict"):
+            shutil.rmtree(self.directory / "objects", ignore_errors=True)
+            (self.directory / "objects").mkdir(parents=True, exist_ok=True)
+
+    def _entry(self, etag: str, size: int) -> Path:
+        name = f"{etag.strip(chr(34))}:{size}"
+        digest = hashlib.sha256(name.encode()).hexdigest()
+        return self.directory / "objects" / digest[:2] / digest
+
+    @staticmethod
+    def _touch(entry: Path) -> None:
+        # mtime doubles as the last access time for LRU eviction
+        try:
+            os.utime(entry)
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def _materialize(entry: Path, destination: Path) -> bool:
+        # Entries are never modified in place, so a hard link is safe and
+        # costs no extra disk space. Fall back to a copy across filesystems.
+        destination.unlink(missing_ok=True)
+        try:
+            os.link(entry, destination)
+        except FileNotFoundError:
+            return False
+        except OSError:
+            try:
+                shutil.copyfile(entry, destination)
+            except FileNotFoundError:
+                return False
+        return True
+
+    @contextmanager
+    def _lock(self, name: str) -> Iterator[None]:
+        with open(self.directory / "locks" / f"{name}.lock", "a") as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_UN)
@@ -0,0 +1,102 @@
+import hashlib
+import threading
+from pathlib import Path
+
+from pydantic import BaseModel
+
+
+def tree_fingerprint(path: Path) -> str:
+    # Every staged file's path and content, so any change to the package
+    # shows up, not only changes to its structure
+    digest = hashlib.sha256()
+    for file_path in sorted(path.rglob("*")):
+        if file_path.is_file():
+            digest.update(file_path.relative_to(path).as_posix().encode() + b"\0")
+            with open(file_path, "rb") as f:
+                digest.update(hashlib.file_digest(f, "sha256").digest())
+    return digest.hexdigest()
+
+
+class JournalEntry(BaseModel):
+    key: str = ""
+    completed: bool = False
+    upload_id: str | None = None
+    part_number: int | None = None
+    etag: str | None = None
+    fingerprint: str | None = None
+
+
+class ExportJournal:
+    def __init__(self, path: Path):
+        self.path = path
+        self.fingerprint: str | None = None
+        self._completed: set[str] = set()
+        self._uploads: dict[str, str] = {}
+        self._parts: dict[str, dict[int, str]] = {}
+        self._lock = threading.Lock()
+        if self.path.exists():
+            self._replay()
+
+    def __bool__(self) -> bool:
+        return bool(self._completed or self._uploads)
+
+    def _replay(self) -> None:
+        with open(self.path, "r") as f:
+            for line in f:
+                try:
+                    entry = JournalEntry.model_validate_json(line)
+                except ValueError:
+                    # A crash can leave the last line half-written
+                    break
+                self._apply(entry)
+
+    def _apply(self, entry: JournalEntry) -> None:
+        if entry.fingerprint is not None:
+            self.fingerprint = entry.fingerprint
+        elif entry.completed:
+            self._completed.add(entry.key)
+            self._uploads.pop(entry.key, None)
+            self._parts.pop(entry.key, None)
+        elif entry.part_number is not None:
+            self._parts.setdefault(entry.key, {})[entry.part_number] = entry.etag
+        elif entry.upload_id is not None:
+            self._uploads[entry.key] = entry.upload_id
+            self._parts[entry.key] = {}
+
+    def _record(self, entry: JournalEntry) -> None:
+        with self._lock:
+            self._apply(entry)
+            with open(self.path, "a") as f:
+                f.write(entry.model_dump_json(exclude_defaults=True) + "\n")
+
+    def is_completed(self, key: str) -> bool:
+        return key in self._completed
+
+    def upload_id(self, key: str) -> str | None:
+        return self._uploads.get(key)
+
+    def parts(self, key: str) -> dict[int, str]:
+        return dict(self._parts.get(key, {}))
+
+    def uploads(self) -> dict[str, str]:
+        return dict(self._uploads)
+
+    def staged(self, fingerprint: str) -> None:
+        self._record(JournalEntry(fingerprint=fingerprint))
+
+    def complete(self, key: str) -> None:
+        self._record(JournalEntry(key=key, completed=True))
+
+    def start_upload(self, key: str, upload_id: str) -> None:
+        self._record(JournalEntry(key=key, upload_id=upload_id))
+
+    def complete_part(self, key: str, part_number: int, etag: str) -> None:
+        self._record(JournalEntry(key=key, part_number=part_number, etag=etag))
+
+    def reset(self) -> None:
+        with self._lock:
+            self.fingerprint = None
+            self._completed.clear()
+            self._uploads.clear()
+            self._parts.clear()
+            self.path.unlink(missing_ok=True)
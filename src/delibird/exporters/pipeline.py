@@ -0,0 +1,267 @@
+import gzip
+import queue
+import shutil
+import tempfile
+import threading
+from pathlib import Path, PurePosixPath
+from typing import Any, Callable, Iterator, Mapping
+
+from .. import Folder, Package
+from ..core.package import (
+    INDEX_FILENAME,
+    METADATA_FILENAME,
+    FolderMetadata,
+    PackageIndex,
+)
+from ..core.protocols import supports_bytes
+from ..core.spill import SpilledContent
+
+_DONE = object()
+
+# (key, data, charged bytes, extra upload args)
+_Item = tuple[str, bytes, int, Mapping[str, str]]
+
+
+class ByteBudget:
+    # Bounds the bytes queued between stages, not every byte alive. Encoders
+    # working on bytes only learn a file's size by encoding it, so each encode
+    # worker may hold one encoded file while it waits to be admitted. Peak
+    # memory is max_bytes plus up to encode_workers times the largest file.
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.in_use = 0
+        self._aborted = False
+        self._condition = threading.Condition()
+
+    def acquire(self, size: int) -> None:
+        # An item larger than the whole budget is admitted once nothing else is
+        # buffered, otherwise it could never be admitted at all.
+        with self._condition:
+            self._condition.wait_for(
+                lambda: (
+                    self._aborted
+                    or self.in_use == 0
+                    or self.in_use + size <= self.max_bytes
+                )
+            )
+            self.in_use += size
+
+    def release(self, size: int) -> None:
+        with self._condition:
+            self.in_use -= size
+            self._condition.notify_all()
+
+    def abort(self) -> None:
+        with self._condition:
+            self._aborted = True
+            self._condition.notify_all()
+
+
+class ExportPipeline:
+    def __init__(
+        self,
+        encode_workers: int = 4,
+        upload_workers: int = 8,
+        compress_workers: int = 2,
+        queue_size: int = 64,
+        max_buffered_bytes: int = 64 * 1024 * 1024,
+        compress_level: int | None = None,
+    ):
+        self.encode_workers = encode_workers
+        self.upload_workers = upload_workers
+        self.compress_workers = compress_workers
+        self.queue_size = queue_size
+        self.max_buffered_bytes = max_buffered_bytes
+        self.compress_level = compress_level
+
+    def run(
+        self,
+        package: Package,
+        upload: Callable[[str, bytes, Mapping[str, str]], None],
+        **kwargs,
+    ) -> None:
+        budget = ByteBudget(self.max_buffered_bytes)
+        errors: list[BaseException] = []
+        failed = threading.Event()
+
+        def fail(error: BaseException) -> None:
+            if not failed.is_set():
+                errors.append(error)
+                failed.set()
+                budget.abort()
+
+        def encode(job: tuple[str, Any]) -> Iterator[_Item]:
+            yield from self._encode(job, budget, **kwargs)
+
+        def compress(item: _Item) -> Iterator[_Item]:
+            yield self._compress(item, budget)
+
+        def send(item: _Item) -> Iterator[_Item]:
+            key, data, charged, extra_args = item
+            try:
+                upload(key, data, extra_args)
+            finally:
+                budget.release(charged)
+            yield from ()
+
+        stages: list[tuple[Callable[[Any], Iterator[_Item]], int]] = [
+            (encode, self.encode_workers)
+        ]
+        if self.compress_level is not None:
+            stages.append((compress, self.compress_workers))
+        stages.append((send, self.upload_workers))
+
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in stages]
+        threads = []
+        for i, (func, workers) in enumerate(stages):
+            outbox = queues[i + 1] if i + 1 < len(stages) else None
+            downstream_workers = stages[i + 1][1] if outbox is not None else 0
+            threads.extend(
+                self._start_stage(
+                    func,
+                    queues[i],
+                    outbox,
+                    workers,
+                    downstream_workers,
+                    failed,
+                    fail,
+                    budget,
+                )
+            )
+
+        try:
+            for job in self._jobs(package):
+                if failed.is_set():
+                    break
+                queues[0].put(job)
+        except BaseException as error:
+            fail(error)
+        finally:
+            for _ in range(self.encode_workers):
+                queues[0].put(_DONE)
+            for thread in threads:
+                thread.join()
+
+        if errors:
+            raise errors[0]
+
+    @staticmethod
+    def _start_stage(
+        func: Callable[[Any], Iterator[_Item]],
+        inbox: queue.Queue,
+        outbox: queue.Queue | None,
+        workers: int,
+        downstream_workers: int,
+        failed: threading.Event,
+        fail: Callable[[BaseException], None],
+        budget: ByteBudget,
+    ) -> list[threading.Thread]:
+        remaining = [workers]
+        lock = threading.Lock()
+
+        def discard(item: Any) -> None:
+            if isinstance(item, tuple) and len(item) == 4:
+                budget.release(item[2])
+
+        def worker() -> None:
+            try:
+                while True:
+                    item = inbox.get()
+                    if item is _DONE:
+                        break
+                    # Keep draining after a failure so upstream never blocks on
+                    # a full queue, but drop the work and its buffered bytes.
+                    if failed.is_set():
+                        discard(item)
+                        continue
+                    try:
+                        for output in func(item):
+                            if outbox is None or failed.is_set():
+                                discard(output)
+                            else:
+                                outbox.put(output)
+                    except BaseException as error:
+                        fail(error)
+            finally:
+                with lock:
+                    remaining[0] -= 1
+                    last = remaining[0] == 0
+                if last and outbox is not None:
+                    for _ in range(downstream_workers):
+                        outbox.put(_DONE)
+
+        threads = [threading.Thread(target=worker, daemon=True) for _ in range(workers)]
+        for thread in threads:
+            thread.start()
+        return threads
+
+    @staticmethod
+    def _jobs(package: Package) -> Iterator[tuple[str, Any]]:
+        def _walk(folder: Folder, prefix: PurePosixPath) -> Iterator[tuple[str, Any]]:
+            folder_prefix = prefix / Path(folder.name).as_posix()
+            for file in folder.files:
+                yield str(folder_prefix), file
+            for subfolder in folder.folders:
+                yield from _walk(subfolder, folder_prefix)
+            yield str(folder_prefix), folder.folder_metadata
+
+        for folder in package.folders:
+            yield from _walk(folder, PurePosixPath(package.name))
+        yield package.name, package.index
+
+    @staticmethod
+    def _encode(job: tuple[str, Any], budget: ByteBudget, **kwargs) -> Iterator[_Item]:
+        prefix, obj = job
+        if isinstance(obj, (FolderMetadata, PackageIndex)):
+            filename = (
+                METADATA_FILENAME if isinstance(obj, FolderMetadata) else INDEX_FILENAME
+            )
+            data = obj.model_dump_json().encode()
+            budget.acquire(len(data))
+            yield f"{prefix}/{filename}", data, len(data), {}
+            return
+
+        # Encoders working on bytes skip the filesystem altogether. Spilled
+        # content is already encoded on disk and is copied out as it is.
+        if supports_bytes(obj.content_encoder) and not isinstance(
+            obj.content, SpilledContent
+        ):
+            data = obj.content_encoder.dumps(
+                obj.content, **{**obj.dump_kwargs, **kwargs}
+            )
+            # Charged once encoded, see ByteBudget for what that means for
+            # the bound
+            budget.acquire(len(data))
+            yield f"{prefix}/{obj.filename}", data, len(data), {}
+            return
+
+        # Other encoders only know how to write to disk, so each file is encoded
+        # into a private scratch directory and streamed out one output at a time.
+        scratch = Path(tempfile.mkdtemp(prefix="delibird-"))
+        try:
+            obj.dump(scratch, **kwargs)
+            for path in sorted(scratch.iterdir()):
+                size = path.stat().st_size
+                budget.acquire(size)
+                try:
+                    data = path.read_bytes()
+                    path.unlink()
+                except BaseException:
+                    budget.release(size)
+                    raise
+                yield f"{prefix}/{path.name}", data, size, {}
+        finally:
+            shutil.rmtree(scratch, ignore_errors=True)
+
+    def _compress(self, item: _Item, budget: ByteBudget) -> _Item:
+        key, data, charged, extra_args = item
+        compressed = gzip.compress(data, compresslevel=self.compress_level, mtime=0)
+        if len(compressed) >= len(data):
+            return item
+        budget.release(charged - len(compressed))
+        return (
+            key,
+            compressed,
+            len(compressed),
+            {**extra_args, "ContentEncoding": "gzip"},
+        )
@@ -1,126 +1,1366 @@
+import gzip
+import hashlib
+import io
+import json
+import multiprocessing
+import os
 import shutil
+import tarfile
+import tempfile
+import threading
+import uuid
+import zipfile
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+from fnmatch import fnmatchcase
 from pathlib import Path
+from typing import Any, Callable, Iterable, Mapping, NamedTuple
 
-import boto3
+from botocore.exceptions import ClientError
 
 from .. import Package
+from ..core import instrumentation
+from ..core.description import PackageDescription, describe_package
+from ..core.package import METADATA_FILENAME, FileMetadata, FolderMetadata
+from ..core.packing import PackedFile
+from ..core.protocols import supports_bytes
+from ..core.selection import PathSelector, Selection, stored_patterns
+from .archive import ARCHIVE_SUFFIXES, PackageArchiver, archive_format, extract_archive
+from .cache import PackageCache
+from .clients import MAX_POOL_CONNECTIONS, get_s3_client
+from .disk_cache import DiskCache
+from .journal import ExportJournal, tree_fingerprint
+from .pipeline import ExportPipeline
+from .shards import (
+    SHARD_MANIFEST,
+    SHARDS_SUFFIX,
+    Shard,
+    ShardManifest,
+    plan_shards,
+    write_shard,
+)
+from .transfer import TransferController
+
+COMPLETION_MARKER = "__complete__"
+IN_PROGRESS_MARKER = "__in_progress__"
+MULTIPART_CHUNKSIZE = 8 * 1024 * 1024
+MAX_COPY_OBJECT_SIZE = 5 * 1024 * 1024 * 1024
+VERSION_SEPARATOR = "@"
+
+
+def versioned_name(package_name: str, version: str | None) -> str:
+    if version is None:
+        return package_name
+    return f"{package_name}{VERSION_SEPARATOR}{version}"
+
+
+def etag_matches(file_path: Path, etag: str) -> bool:
+    # The ETag of a single part upload is the MD5 of its content. Multipart
+    # uploads get the MD5 of the part digests followed by the part count, and
+    # boto3 picks the part size by doubling its chunk size until the upload
+    # fits in 10000 parts.
+    digest, _, parts = etag.strip('"').partition("-")
+    if not parts:
+        checksum = hashlib.md5()
+        with open(file_path, "rb") as f:
+            while chunk := f.read(MULTIPART_CHUNKSIZE):
+                checksum.update(chunk)
+        return checksum.hexdigest() == digest
+
+    size = file_path.stat().st_size
+    chunksize = MULTIPART_CHUNKSIZE
+    while -(-size // chunksize) > 10000:
+        chunksize *= 2
+    if -(-size // chunksize) != int(parts):
+        return False
+    checksum = hashlib.md5()
+    with open(file_path, "rb") as f:
+        while chunk := f.read(chunksize):
+            checksum.update(hashlib.md5(chunk).digest())
+    return checksum.hexdigest() == digest
+
+
+class StoredObject(NamedTuple):
+    key: str
+    etag: str | None = None
+    size: int | None = None
+
+
+class RangedReader(io.RawIOBase):
+    # Seekable view of an S3 object where every read is a ranged request.
+    # Wrapped in a BufferedReader it lets zipfile read an archive's central
+    # directory and selected members without downloading the whole object.
+    def __init__(self, exporter: "S3Exporter", key: str, size: int):
+        self.exporter = exporter
+        self.key = key
+        self.size = size
+        self.position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self.position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self.position
+        elif whence == io.SEEK_END:
+            offset += self.size
+        self.position = max(0, offset)
+        return self.position
+
+    def readinto(self, buffer) -> int:
+        length = min(len(buffer), self.size - self.position)
+        if length <= 0:
+            return 0
+        data = self.exporter.transfer.call(
+            self.exporter._read_range, self.key, self.position, length
+        )
+        buffer[: len(data)] = data
+        self.position += len(data)
+        return len(data)
 
 
 class S3Exporter:
-    def __init__(self, bucket_name: str, endpoint_url: str | None = None):
-        if endpoint_url:
-            self.s3 = boto3.client("s3", endpoint_url=endpoint_url)
-        else:
-            self.s3 = boto3.client("s3")
+    _ready_buckets: set[tuple[str, str]] = set()
+    _ready_buckets_lock = threading.Lock()
+
+    def __init__(
+        self,
+        bucket_name: str,
+        endpoint_url: str | None = None,
+        transfer: TransferController | None = None,
+        cache: PackageCache | None = None,
+        disk_cache: DiskCache | None = None,
+    ):
+        self.transfer = transfer or TransferController()
+        max_pool_connections = max(MAX_POOL_CONNECTIONS, self.transfer.max_concurrency)
+        self.s3 = get_s3_client(
+            endpoint_url or None,
+            max_pool_connections,
+            timeout=self.transfer.deadline,
+        )
+        # Managed transfers send the parts of a large object within a single
+        # call. Their client retries a throttled part on its own, rather than
+        # the controller sending the whole object again.
+        self.s3_transfers = get_s3_client(
+            endpoint_url or None,
+            max_pool_connections,
+            max_attempts=self.transfer.max_attempts,
+            timeout=self.transfer.deadline,
+        )
+        self.cache = cache
+        self.disk_cache = disk_cache
         self.bucket_name = bucket_name
-        if self.bucket_name not in [
-            bucket["Name"] for bucket in self.s3.list_buckets()["Buckets"]
-        ]:
-            self.s3.create_bucket(Bucket=self.bucket_name)
+
+    def _ensure_bucket(self) -> None:
+        # Checked once per process and bucket, on first use
+        key = (self.s3.meta.endpoint_url, self.bucket_name)
+        if key in S3Exporter._ready_buckets:
+            return
+        with S3Exporter._ready_buckets_lock:
+            if key in S3Exporter._ready_buckets:
+                return
+            try:
+                self.transfer.call(self.s3.head_bucket, Bucket=self.bucket_name)
+            except ClientError as error:
+                if error.response["Error"]["Code"] not in (
+                    "404",
+                    "NoSuchBucket",
+                    "NotFound",
+                ):
+                    raise
+                try:
+                    self.transfer.call(self.s3.create_bucket, Bucket=self.bucket_name)
+                except ClientError as error:
+                    if error.response["Error"]["Code"] not in (
+                        "BucketAlreadyOwnedByYou",
+                        "BucketAlreadyExists",
+                    ):
+                        raise
+            S3Exporter._ready_buckets.add(key)
 
     def _package_exists(self, package_name: str, compressed: bool = False) -> bool:
-        response = self.s3.list_objects_v2(
+        if compressed:
+            return self._find_archive(package_name) is not None
+        response = self.transfer.call(
+            self.s3.list_objects_v2,
             Bucket=self.bucket_name,
-            Prefix=f"{package_name}.zip" if compressed else f"{package_name}/",
+            Prefix=f"{package_name}/",
             MaxKeys=1,
         )
         return "Contents" in response
 
+    def _find_archives(self, package_name: str) -> list[StoredObject]:
+        # Archives of the package in any format, the most recent first
+        response = self.transfer.call(
+            self.s3.list_objects_v2,
+            Bucket=self.bucket_name,
+            Prefix=f"{package_name}.",
+            Delimiter="/",
+        )
+        keys = {f"{package_name}{suffix}" for suffix in ARCHIVE_SUFFIXES.values()}
+        archives = sorted(
+            (file for file in response.get("Contents", []) if file["Key"] in keys),
+            key=lambda file: file["LastModified"],
+            reverse=True,
+        )
+        return [
+            StoredObject(file["Key"], file["ETag"], file["Size"]) for file in archives
+        ]
+
+    def _find_archive(self, package_name: str) -> StoredObject | None:
+        archives = self._find_archives(package_name)
+        return archives[0] if archives else None
+
+    def _transfer_client(self, size: int | None) -> Any:
+        # Objects sent in a single request are retried by the controller
+        if size is not None and size < MULTIPART_CHUNKSIZE:
+            return self.s3
+        return self.s3_transfers
+
     def export(
         self,
         package: Package,
         enforce_uniqueness: bool = False,
         compress: bool = False,
+        pack_threshold: int | None = None,
+        pipeline: ExportPipeline | None = None,
+        resumable: bool = False,
+        version: str | None = None,
+        base_version: str | None = None,
+        shards: int | None = None,
+        archiver: PackageArchiver | None = None,
     ):
+        with instrumentation.span("s3.export", package=package.name, compress=compress):
+            if shards is not None and (not compress or resumable):
+                raise ValueError(
+                    "Sharded export requires compress and is not resumable"
+                )
+            if archiver is not None and (not compress or shards is not None):
+                raise ValueError(
+                    "An archiver requires compress and does not support shards"
+                )
+            if pipeline is not None and (
+                compress or pack_threshold is not None or resumable
+            ):
+                raise ValueError(
+                    "Pipelined export does not support compress, pack_threshold "
+                    "or resumable"
+                )
+            if base_version is not None and (compress or pipeline is not None):
+                raise ValueError(
+                    "Exports based on a previous version do not support compress "
+                    "or pipeline"
+                )
 
-        if enforce_uniqueness:
-            if self._package_exists(package.name):
-                raise ValueError(f"Package {package.name} already exists")
+            self._ensure_bucket()
 
-        package.dump()
+            # Unchanged files are copied from the base version inside S3, so only
+            # new and modified files are uploaded
+            base = None
+            if base_version is not None:
+                base_name = versioned_name(package.name, base_version)
+                if not self._package_complete(base_name):
+                    raise ValueError(f"Package {base_name} does not exist")
+                base = {
+                    file.key.removeprefix(f"{base_name}/"): file
+                    for file in self._get_package_files(base_name)
+                }
+            if version is not None:
+                package = package.model_copy(
+                    update={"name": versioned_name(package.name, version)}
+                )
 
-        if compress:
-            self._export_compressed(package)
-        else:
-            self._export_uncompressed(package)
+            if enforce_uniqueness:
+                if self._package_exists(package.name):
+                    raise ValueError(f"Package {package.name} already exists")
+
+            if self.cache is not None:
+                self.cache.invalidate(self._cache_key(package.name, compress))
 
-    def _export_compressed(self, package: Package):
-        shutil.make_archive(
-            package.root / package.name, "zip", package.root / package.name
+            if not compress:
+                self._retract_completion(package.name)
+            elif shards is not None:
+                # Loads prefer the single archive, so it must not outlive a
+                # sharded export of the same package
+                for archive in self._find_archives(package.name):
+                    self._delete_object(archive.key)
+                self._delete_object(f"{package.name}{SHARDS_SUFFIX}/{SHARD_MANIFEST}")
+
+            if pipeline is not None:
+                pipeline.run(package, self._upload_bytes)
+                self._publish_completion(package.name)
+                return
+
+            # Resumable exports stage at a fixed location so a later attempt can
+            # pick them up, every other export gets a directory of its own.
+            journal = None
+            if resumable:
+                journal = ExportJournal(package.root / f"{package.name}.journal")
+                staged = package
+            else:
+                staged = self._isolated_staging(package)
+
+            if journal is None:
+                staged.dump(pack_threshold=pack_threshold)
+            else:
+                self._stage_resumable(staged, journal, pack_threshold)
+
+            try:
+                if shards is not None:
+                    self._export_sharded(staged, shards)
+                elif compress:
+                    self._export_compressed(staged, journal, archiver)
+                else:
+                    self._export_uncompressed(staged, journal, base)
+                    self._publish_completion(staged.name)
+            except BaseException:
+                if journal is None:
+                    shutil.rmtree(staged.root, ignore_errors=True)
+                raise
+
+            if journal is None:
+                shutil.rmtree(staged.root, ignore_errors=True)
+            else:
+                self._cleanup_staged(staged)
+                journal.reset()
+
+    def _stage_resumable(
+        self, package: Package, journal: ExportJournal, pack_threshold: int | None
+    ) -> None:
+        # The package is staged again on every attempt and the journal only
+        # resumes when the staged files are byte for byte the ones a previous
+        # attempt started uploading. Otherwise edits made in between would be
+        # skipped as already uploaded.
+        shutil.rmtree(package.root / package.name, ignore_errors=True)
+        package.dump(pack_threshold=pack_threshold)
+        fingerprint = tree_fingerprint(package.root / package.name)
+        if journal.fingerprint == fingerprint:
+            return
+        for key, upload_id in journal.uploads().items():
+            try:
+                self.transfer.call(
+                    self.s3.abort_multipart_upload,
+                    Bucket=self.bucket_name,
+                    Key=key,
+                    UploadId=upload_id,
+                )
+            except ClientError:
+                pass
+        for suffix in ARCHIVE_SUFFIXES.values():
+            (package.root / f"{package.name}{suffix}").unlink(missing_ok=True)
+        journal.reset()
+        journal.staged(fingerprint)
+
+    def export_many(
+        self,
+        packages: Iterable[Package],
+        max_workers: int = 8,
+        return_exceptions: bool = False,
+        **kwargs,
+    ) -> list[Exception | None]:
+        return self._run_many(
+            lambda package: self.export(package, **kwargs),
+            packages,
+            max_workers,
+            return_exceptions,
         )
-        try:
-            self.s3.upload_file(
-                package.root / f"{package.name}.zip",
-                self.bucket_name,
-                f"{package.name}.zip",
+
+    def load_many(
+        self,
+        package_names: Iterable[str],
+        max_workers: int = 8,
+        return_exceptions: bool = False,
+        **kwargs,
+    ) -> list[Package | Exception]:
+        return self._run_many(
+            lambda package_name: self.load(package_name, **kwargs),
+            package_names,
+            max_workers,
+            return_exceptions,
+        )
+
+    def _run_many(
+        self,
+        func: Callable[[Any], Any],
+        items: Iterable[Any],
+        max_workers: int,
+        return_exceptions: bool,
+    ) -> list[Any]:
+        # Packages get their own workers: the transfer pool runs the requests
+        # they issue, and blocking it on whole packages could starve them. All
+        # requests still share the controller's adaptive concurrency limit.
+        with ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="delibird-batch"
+        ) as executor:
+            futures = [executor.submit(func, item) for item in items]
+            results = []
+            try:
+                for future in futures:
+                    try:
+                        results.append(future.result())
+                    except Exception as error:
+                        if not return_exceptions:
+                            raise
+                        results.append(error)
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                wait(futures)
+                raise
+        return results
+
+    def _isolated_staging(self, package: Package) -> Package:
+        package.root.mkdir(parents=True, exist_ok=True)
+        root = Path(tempfile.mkdtemp(prefix=f".{package.name}-", dir=package.root))
+        return package.model_copy(update={"root": root})
+
+    def _export_compressed(
+        self,
+        package: Package,
+        journal: ExportJournal | None = None,
+        archiver: PackageArchiver | None = None,
+    ):
+        archiver = archiver or PackageArchiver()
+        key = f"{package.name}{archiver.suffix}"
+        archive = package.root / key
+        if not journal or not archive.exists():
+            with instrumentation.span("s3.archive", package=package.name) as span:
+                archiver.write(package.root / package.name, archive)
+                if span:
+                    span.set(bytes=archive.stat().st_size)
+        self._upload_file(archive, key, journal)
+        self._delete_stale_archives(package.name, key)
+
+    def _delete_stale_archives(self, package_name: str, key: str) -> None:
+        # Archives of the package in other formats, left by earlier exports
+        for archive in self._find_archives(package_name):
+            if archive.key != key:
+                self._delete_object(archive.key)
+
+    def _export_sharded(self, package: Package, shard_count: int) -> None:
+        package_path = package.root / package.name
+        prefix = f"{package.name}{SHARDS_SUFFIX}"
+        shards_path = package.root / prefix
+        shards_path.mkdir(exist_ok=True)
+        with instrumentation.span("s3.plan_shards", package=package.name):
+            plan = plan_shards(package_path, shard_count)
+
+        # Shards are compressed in separate processes and each one is
+        # uploaded as soon as it is written
+        with ProcessPoolExecutor(
+            max_workers=min(len(plan), os.cpu_count() or 1),
+            mp_context=multiprocessing.get_context("spawn"),
+        ) as executor:
+            futures = [
+                executor.submit(
+                    write_shard, package_path, folders, shards_path / f"{i}.zip"
+                )
+                for i, folders in enumerate(plan)
+            ]
+            sizes = self.transfer.map(
+                self._upload_shard,
+                [
+                    (future, shards_path / f"{i}.zip", f"{prefix}/{i}.zip")
+                    for i, future in enumerate(futures)
+                ],
+                progress="s3.upload",
+                package=package.name,
             )
-        finally:
-            (package.root / f"{package.name}.zip").unlink()
-            shutil.rmtree(package.root / package.name)
 
-    def _export_uncompressed(self, package: Package):
-        def _upload_folder(folder_path: Path):
-            for file_path in folder_path.rglob("*"):
-                if file_path.is_file():
-                    key = str(file_path.relative_to(folder_path.parent.parent))
-                    self.s3.upload_file(str(file_path), self.bucket_name, key)
+        # The manifest is written last and marks the export as complete
+        manifest = ShardManifest(
+            shards=[
+                Shard(filename=f"{i}.zip", folders=folders, size=size)
+                for i, (folders, size) in enumerate(zip(plan, sizes))
+            ]
+        )
+        self.transfer.call(
+            self.s3.put_object,
+            Bucket=self.bucket_name,
+            Key=f"{prefix}/{SHARD_MANIFEST}",
+            Body=manifest.model_dump_json().encode(),
+        )
 
-        try:
-            for folder in package.folders:
-                _upload_folder(package.root / package.name / folder.name)
-        finally:
-            shutil.rmtree(package.root / package.name)
+        # Shards left over from a previous export with more shards
+        current = {f"{prefix}/{shard.filename}" for shard in manifest.shards}
+        for file in self._get_package_files(prefix):
+            if file.key not in current and file.key != f"{prefix}/{SHARD_MANIFEST}":
+                self._delete_object(file.key)
+
+    def _upload_shard(self, future: Future, archive: Path, key: str) -> int:
+        # Time spent here is time the upload waited for its shard to compress
+        with instrumentation.span("s3.archive", key=key) as span:
+            size = future.result()
+            span.set(bytes=size)
+        self._upload_file(archive, key)
+        return size
+
+    def _delete_object(self, key: str) -> None:
+        self.transfer.call(self.s3.delete_object, Bucket=self.bucket_name, Key=key)
+
+    def _export_uncompressed(
+        self,
+        package: Package,
+        journal: ExportJournal | None = None,
+        base: Mapping[str, StoredObject] | None = None,
+    ):
+        if base is None:
+            self.transfer.map(
+                self._upload_file,
+                [
+                    (file_path, key, journal)
+                    for file_path, key in self._staged_files(package)
+                ],
+                progress="s3.upload",
+                package=package.name,
+            )
+            return
+
+        self.transfer.map(
+            self._copy_or_upload_file,
+            [
+                (
+                    file_path,
+                    key,
+                    base.get(key.removeprefix(f"{package.name}/")),
+                    journal,
+                )
+                for file_path, key in self._staged_files(package)
+            ],
+            progress="s3.upload",
+            package=package.name,
+        )
+
+    def _copy_or_upload_file(
+        self,
+        file_path: Path,
+        key: str,
+        base_file: StoredObject | None,
+        journal: ExportJournal | None = None,
+    ) -> None:
+        if journal is not None and journal.is_completed(key):
+            return
+        if (
+            base_file is None
+            or base_file.size != file_path.stat().st_size
+            or not etag_matches(file_path, base_file.etag)
+        ):
+            self._upload_file(file_path, key, journal)
+            return
+
+        # The checksum is computed again for the copy: the one of a multipart
+        # source covers its parts, not the copied object as a whole
+        copy_source = {"Bucket": self.bucket_name, "Key": base_file.key}
+        with instrumentation.span("s3.copy", key=key, bytes=base_file.size):
+            if base_file.size <= MAX_COPY_OBJECT_SIZE:
+                self.transfer.call(
+                    self.s3.copy_object,
+                    Bucket=self.bucket_name,
+                    Key=key,
+                    CopySource=copy_source,
+                    ChecksumAlgorithm="CRC32",
+                )
+            else:
+                # Objects over the CopyObject limit are copied part by part
+                self.transfer.call(
+                    self.s3_transfers.copy,
+                    copy_source,
+                    self.bucket_name,
+                    key,
+                    ExtraArgs={"ChecksumAlgorithm": "CRC32"},
+                )
+        instrumentation.count("s3.objects_copied")
+        if journal is not None:
+            journal.complete(key)
+
+    def _cleanup_staged(self, package: Package) -> None:
+        for suffix in ARCHIVE_SUFFIXES.values():
+            (package.root / f"{package.name}{suffix}").unlink(missing_ok=True)
+        shutil.rmtree(package.root / package.name, ignore_errors=True)
+
+    def _upload_file(
+        self, file_path: Path, key: str, journal: ExportJournal | None = None
+    ) -> None:
+        if journal is not None and journal.is_completed(key):
+            return
+
+        with instrumentation.span("s3.upload", key=key) as span:
+            size = file_path.stat().st_size
+            callback = None
+            if span:
+                span.set(bytes=size)
+                callback = self._byte_progress("s3.upload_bytes", key, size)
+            if journal is not None and size > MULTIPART_CHUNKSIZE:
+                self._upload_multipart(file_path, key, journal, callback)
+            else:
+                self.transfer.call(
+                    self._transfer_client(size).upload_file,
+                    str(file_path),
+                    self.bucket_name,
+                    key,
+                    Callback=callback,
+                )
+        if span:
+            instrumentation.count("s3.objects_uploaded")
+            instrumentation.count("s3.bytes_uploaded", size)
+        if journal is not None:
+            journal.complete(key)
+
+    @staticmethod
+    def _byte_progress(
+        name: str, key: str, size: int | None
+    ) -> Callable[[int], None] | None:
+        # Only transfers long enough to be split into parts report their bytes
+        if size is None or size <= MULTIPART_CHUNKSIZE:
+            return None
+        tracker = instrumentation.progress(name, size, key=key)
+        return tracker.advance if tracker else None
+
+    def _upload_multipart(
+        self,
+        file_path: Path,
+        key: str,
+        journal: ExportJournal,
+        callback: Callable[[int], None] | None = None,
+    ) -> None:
+        upload_id = journal.upload_id(key)
+        if upload_id is not None:
+            try:
+                self.transfer.call(
+                    self.s3.list_parts,
+                    Bucket=self.bucket_name,
+                    Key=key,
+                    UploadId=upload_id,
+                    MaxParts=1,
+                )
+            except ClientError as error:
+                if error.response["Error"]["Code"] != "NoSuchUpload":
+                    raise
+                # The upload was aborted or expired, start it over
+                upload_id = None
+        if upload_id is None:
+            upload_id = self.transfer.call(
+                self.s3.create_multipart_upload, Bucket=self.bucket_name, Key=key
+            )["UploadId"]
+            journal.start_upload(key, upload_id)
+
+        parts = journal.parts(key)
+        total_parts = -(-file_path.stat().st_size // MULTIPART_CHUNKSIZE)
+        with open(file_path, "rb") as f:
+            for part_number in range(1, total_parts + 1):
+                if part_number in parts:
+                    f.seek(MULTIPART_CHUNKSIZE, io.SEEK_CUR)
+                    continue
+                body = f.read(MULTIPART_CHUNKSIZE)
+                response = self.transfer.call(
+                    self.s3.upload_part,
+                    Bucket=self.bucket_name,
+                    Key=key,
+                    UploadId=upload_id,
+                    PartNumber=part_number,
+                    Body=body,
+                )
+                parts[part_number] = response["ETag"]
+                journal.complete_part(key, part_number, response["ETag"])
+                if callback is not None:
+                    callback(len(body))
+
+        self.transfer.call(
+            self.s3.complete_multipart_upload,
+            Bucket=self.bucket_name,
+            Key=key,
+            UploadId=upload_id,
+            MultipartUpload={
+                "Parts": [
+                    {"PartNumber": part_number, "ETag": etag}
+                    for part_number, etag in sorted(parts.items())
+                ]
+            },
+        )
+
+    def _publish_completion(self, package_name: str) -> None:
+        # Written last so readers can tell a finished package from one that is
+        # still being uploaded. The export id makes each marker's ETag unique.
+        marker = {
+            "export_id": uuid.uuid4().hex,
+            "completed_at": datetime.now(timezone.utc).isoformat(),
+        }
+        self.transfer.call(
+            self.s3.put_object,
+            Bucket=self.bucket_name,
+            Key=f"{package_name}/{COMPLETION_MARKER}",
+            Body=json.dumps(marker).encode(),
+        )
+        self._delete_object(f"{package_name}/{IN_PROGRESS_MARKER}")
+
+    def _retract_completion(self, package_name: str) -> None:
+        # The in progress marker goes up first, so a package never shows
+        # neither marker while its files are being replaced
+        self.transfer.call(
+            self.s3.put_object,
+            Bucket=self.bucket_name,
+            Key=f"{package_name}/{IN_PROGRESS_MARKER}",
+            Body=b"",
+        )
+        self._delete_object(f"{package_name}/{COMPLETION_MARKER}")
+
+    def _export_in_progress(self, package_name: str) -> bool:
+        return self._head_object(f"{package_name}/{IN_PROGRESS_MARKER}") is not None
+
+    def _package_complete(self, package_name: str) -> bool:
+        if self._package_version(package_name) is not None:
+            return True
+        # Packages exported before the markers existed carry neither of them
+        return not self._export_in_progress(package_name) and self._package_exists(
+            package_name
+        )
+
+    def _upload_bytes(
+        self, key: str, data: bytes, extra_args: Mapping[str, str]
+    ) -> None:
+        self.transfer.call(
+            self._transfer_client(len(data)).upload_fileobj,
+            io.BytesIO(data),
+            self.bucket_name,
+            key,
+            ExtraArgs=dict(extra_args),
+        )
+
+    def _staged_files(self, package: Package) -> list[tuple[Path, str]]:
+        staged_files = []
+        for file_path in (package.root / package.name).rglob("*"):
+            if file_path.is_file():
+                key = file_path.relative_to(package.root).as_posix()
+                staged_files.append((file_path, key))
+        return staged_files
 
     def load(
         self,
         package_name: str,
         temp_dir: Path = Path(".") / "tmp",
         compressed: bool = False,
+        require_complete: bool = True,
+        select: Selection | None = None,
+        version: str | None = None,
     ) -> Package:
-        if not self._package_exists(package_name, compressed=compressed):
-            raise ValueError(f"Package {package_name} does not exist")
+        with instrumentation.span(
+            "s3.load", package=package_name, compressed=compressed
+        ):
+            self._ensure_bucket()
+            name = package_name
+            package_name = versioned_name(package_name, version)
+            cache_key = self._cache_key(package_name, compressed)
+            use_cache = self.cache is not None and select is None
+            if use_cache:
+                package = self.cache.get(cache_key)
+                if package is not None:
+                    return package
 
-        # Create temp directory to store downloaded files
-        temp_dir = temp_dir
-        temp_dir.mkdir(exist_ok=True)
+            # The completion marker (or the archive) identifies the exported
+            # version, so a single request both validates and revalidates the
+            # package.
+            archive = None
+            if compressed:
+                archive = self._find_archive(package_name)
+                etag = None if archive is None else archive.etag
+            else:
+                etag = self._package_version(package_name)
+            sharded = False
+            if etag is None and compressed:
+                response = self._head_object(self._manifest_key(package_name))
+                if response is not None:
+                    etag = response["ETag"]
+                    sharded = True
+            if etag is None:
+                if compressed or not self._package_exists(package_name):
+                    raise ValueError(f"Package {package_name} does not exist")
+                if require_complete and self._export_in_progress(package_name):
+                    raise ValueError(f"Package {package_name} is incomplete")
+                use_cache = False
 
-        if compressed:
-            self._download_compressed_package(package_name, temp_dir)
-        else:
-            files = self._get_package_files(package_name)
-            self._download_uncompressed_package(files, temp_dir)
+            if use_cache:
+                package = self.cache.get(cache_key, etag)
+                if package is not None:
+                    return package
+
+            # Every load downloads into a directory of its own, so concurrent
+            # loads of the same package do not overwrite each other's files
+            temp_dir.mkdir(parents=True, exist_ok=True)
+            staging = Path(tempfile.mkdtemp(prefix=f"{package_name}-", dir=temp_dir))
+            try:
+                if sharded:
+                    self._download_sharded_package(
+                        package_name,
+                        staging,
+                        None if select is None else PathSelector(select),
+                    )
+                elif compressed:
+                    self._download_compressed_package(package_name, staging, archive)
+                else:
+                    files = self._get_package_files(package_name)
+                    if select is None:
+                        self._download_uncompressed_package(files, staging)
+                    else:
+                        self._download_selected_files(
+                            package_name, files, PathSelector(select), staging
+                        )
+
+                # Load package from downloaded files
+                package = Package.load(staging / package_name, select=select)
+                package.root = temp_dir
+                package.name = name
+
+                if use_cache:
+                    self.cache.put(cache_key, etag, package)
+            finally:
+                shutil.rmtree(staging, ignore_errors=True)
+
+            return package
+
+    def list_packages(self, compressed: bool = False, prefix: str = "") -> list[str]:
+        # Only the top level of the bucket is listed: uncompressed packages
+        # show up as common prefixes, compressed ones as archives.
+        self._ensure_bucket()
+        paginator = self.s3.get_paginator("list_objects_v2")
+        pages = paginator.paginate(
+            Bucket=self.bucket_name, Prefix=prefix, Delimiter="/"
+        )
+        names = []
+        for page in self.transfer.call(list, pages):
+            common_prefixes = [
+                common_prefix["Prefix"].removesuffix("/")
+                for common_prefix in page.get("CommonPrefixes", [])
+            ]
+            if compressed:
+                names.extend(
+                    file["Key"].removesuffix(
+                        ARCHIVE_SUFFIXES[archive_format(file["Key"])]
+                    )
+                    for file in page.get("Contents", [])
+                    if archive_format(file["Key"]) is not None
+                )
+                names.extend(
+                    common_prefix.removesuffix(SHARDS_SUFFIX)
+                    for common_prefix in common_prefixes
+                    if common_prefix.endswith(SHARDS_SUFFIX)
+                )
+            else:
+                names.extend(
+                    common_prefix
+                    for common_prefix in common_prefixes
+                    if not common_prefix.endswith(SHARDS_SUFFIX)
+                )
+        return list(dict.fromkeys(names))
+
+    def list_versions(self, package_name: str) -> list[str]:
+        prefix = f"{package_name}{VERSION_SEPARATOR}"
+        return [name.removeprefix(prefix) for name in self.list_packages(prefix=prefix)]
+
+    def get(self, package_name: str, path: str, version: str | None = None) -> Any:
+        # A single file, fetched without loading the package around it. Bodies
+        # of encoders working on bytes are decoded in memory, packed files
+        # with a ranged read of their blob.
+        self._ensure_bucket()
+        package_name = versioned_name(package_name, version)
+        prefix, filename, read = self._file_reader(package_name, path)
+        folder_metadata = self._read_folder_metadata(package_name, path, read)
+        file_metadata = self._find_file_metadata(folder_metadata, package_name, path)
+        encoder = file_metadata.file_content_encoder_class
+        klass = file_metadata.file_content_class
+        packed_file = folder_metadata.get("packed_files", {}).get(filename)
+        if packed_file is not None:
+            packed_file = PackedFile.model_validate(packed_file)
+
+        if supports_bytes(encoder):
+            if packed_file is None:
+                data = read(filename)
+            else:
+                data = self._read_packed(f"{prefix}{packed_file.blob}", packed_file)
+            return encoder.loads(data, klass)
 
-        # Load package from downloaded files
-        package = Package.load(temp_dir / package_name)
+        # Other encoders read from disk, so what they wrote is fetched into a
+        # scratch directory first
+        with tempfile.TemporaryDirectory(prefix="delibird-") as scratch:
+            scratch_path = Path(scratch)
+            if packed_file is not None:
+                (scratch_path / filename).write_bytes(
+                    self._read_packed(f"{prefix}{packed_file.blob}", packed_file)
+                )
+            else:
+                patterns = stored_patterns(encoder, filename)
+                names = [
+                    name
+                    for name in self._list_folder(prefix)
+                    if any(fnmatchcase(name, pattern) for pattern in patterns)
+                ]
+                self.transfer.map(
+                    lambda name: (scratch_path / name).write_bytes(read(name)),
+                    [(name,) for name in names],
+                )
+            return encoder.disk_load(scratch_path / filename, klass)
 
+    def lookup(
+        self,
+        package_name: str,
+        path: str,
+        field: str,
+        value: Any,
+        version: str | None = None,
+    ) -> list[Any]:
+        # Point lookup through an encoder's secondary index: only the folder
+        # metadata, the index and the pages holding matches are fetched
+        self._ensure_bucket()
+        package_name = versioned_name(package_name, version)
+        _, filename, read = self._file_reader(package_name, path)
+        folder_metadata = self._read_folder_metadata(package_name, path, read)
+        file_metadata = self._find_file_metadata(folder_metadata, package_name, path)
+
+        encoder = file_metadata.file_content_encoder_class
+        if not hasattr(encoder, "lookup"):
+            raise ValueError(f"{encoder.__name__} does not support lookups")
+        return encoder.lookup(
+            Path(filename), file_metadata.file_content_class, field, value, read=read
+        )
+
+    def _file_reader(
+        self, package_name: str, path: str
+    ) -> tuple[str, str, Callable[[str], bytes]]:
+        # Reads objects next to the file at path, by name
+        folder, _, filename = path.strip("/").rpartition("/")
+        prefix = f"{package_name}/{folder}/" if folder else f"{package_name}/"
+
+        def read(name: str) -> bytes:
+            try:
+                if self.disk_cache is not None:
+                    return self._read_cached(f"{prefix}{name}")
+                return self.transfer.call(self._read_object, f"{prefix}{name}")
+            except ClientError as error:
+                if error.response["Error"]["Code"] in ("404", "NoSuchKey", "NotFound"):
+                    raise FileNotFoundError(f"{prefix}{name}") from error
+                raise
+
+        return prefix, filename, read
+
+    @staticmethod
+    def _read_folder_metadata(
+        package_name: str, path: str, read: Callable[[str], bytes]
+    ) -> dict:
+        try:
+            return json.loads(read(METADATA_FILENAME))
+        except FileNotFoundError:
+            folder = path.strip("/").rpartition("/")[0]
+            raise ValueError(f"Package {package_name} has no folder {folder}") from None
+
+    @staticmethod
+    def _find_file_metadata(
+        folder_metadata: dict, package_name: str, path: str
+    ) -> FileMetadata:
+        filename = path.strip("/").rpartition("/")[2]
+        for entry in folder_metadata["files_metadata"]:
+            if entry["filename"] == filename:
+                return FileMetadata.load(entry)
+        raise ValueError(f"File {path} does not exist in package {package_name}")
+
+    def _read_cached(self, key: str) -> bytes:
+        # Objects are only known to the cache by ETag, which a HEAD gets
+        # without transferring the body
+        response = self._head_object(key)
+        if response is None:
+            raise FileNotFoundError(key)
+        etag, size = response["ETag"], response["ContentLength"]
+        cached = self.disk_cache.path(etag, size)
+        if cached is not None:
+            try:
+                return cached.read_bytes()
+            except FileNotFoundError:
+                pass
+        with tempfile.TemporaryDirectory(prefix="delibird-") as scratch:
+            destination = Path(scratch) / "object"
+            self.disk_cache.fetch(
+                etag,
+                size,
+                destination,
+                lambda path: self.transfer.call(self._get_object_to_file, key, path),
+            )
+            return destination.read_bytes()
+
+    def _read_packed(self, key: str, packed_file: PackedFile) -> bytes:
+        if packed_file.length == 0:
+            return b""
+        # A blob already in the disk cache is sliced locally
+        if self.disk_cache is not None:
+            response = self._head_object(key)
+            cached = None
+            if response is not None:
+                cached = self.disk_cache.path(
+                    response["ETag"], response["ContentLength"]
+                )
+            if cached is not None:
+                try:
+                    with open(cached, "rb") as f:
+                        f.seek(packed_file.offset)
+                        return f.read(packed_file.length)
+                except FileNotFoundError:
+                    pass
+        return self.transfer.call(
+            self._read_range, key, packed_file.offset, packed_file.length
+        )
+
+    def _list_folder(self, prefix: str) -> list[str]:
+        paginator = self.s3.get_paginator("list_objects_v2")
+        pages = paginator.paginate(
+            Bucket=self.bucket_name, Prefix=prefix, Delimiter="/"
+        )
+        return [
+            file["Key"].removeprefix(prefix)
+            for page in self.transfer.call(list, pages)
+            for file in page.get("Contents", [])
+        ]
+
+    def describe(
+        self, package_name: str, compressed: bool = False
+    ) -> PackageDescription:
+        self._ensure_bucket()
         if compressed:
-            (temp_dir / f"{package_name}.zip").unlink()
+            return self._describe_compressed(package_name)
 
-        shutil.rmtree(temp_dir / package_name)
+        files = self._get_package_files(package_name)
+        if not files:
+            raise ValueError(f"Package {package_name} does not exist")
+        prefix = f"{package_name}/"
+        metadata_files = [
+            file for file in files if file.key.rpartition("/")[2] == METADATA_FILENAME
+        ]
+        metadata = self.transfer.map(
+            self._read_json, [(file.key,) for file in metadata_files]
+        )
+        return describe_package(
+            package_name,
+            {
+                file.key.removeprefix(prefix).rpartition("/")[0]: folder_metadata
+                for file, folder_metadata in zip(metadata_files, metadata)
+            },
+            {file.key.removeprefix(prefix): file.size for file in files},
+            complete=self._package_complete(package_name),
+        )
 
-        return package
+    def _describe_compressed(self, package_name: str) -> PackageDescription:
+        archive = self._find_archive(package_name)
+        if archive is not None and archive_format(archive.key) != "zip":
+            return self._describe_tar(package_name, archive.key)
+        if archive is not None:
+            archives = [(archive.key, archive.size)]
+        elif self._head_object(self._manifest_key(package_name)) is not None:
+            manifest = self._read_manifest(package_name)
+            archives = [
+                (f"{package_name}{SHARDS_SUFFIX}/{shard.filename}", shard.size)
+                for shard in manifest.shards
+            ]
+        else:
+            raise ValueError(f"Package {package_name} does not exist")
+
+        metadata = {}
+        sizes = {}
+        for key, size in archives:
+            reader = RangedReader(self, key, size)
+            with zipfile.ZipFile(io.BufferedReader(reader, 256 * 1024)) as archive:
+                archive_sizes = {
+                    info.filename: info.file_size
+                    for info in archive.infolist()
+                    if not info.is_dir()
+                }
+                metadata.update(
+                    (name.rpartition("/")[0], json.loads(archive.read(name)))
+                    for name in archive_sizes
+                    if name.rpartition("/")[2] == METADATA_FILENAME
+                )
+            sizes.update(archive_sizes)
+        return describe_package(package_name, metadata, sizes, compressed=True)
+
+    def _describe_tar(self, package_name: str, key: str) -> PackageDescription:
+        # Tar archives have no central directory, the stream is read through
+        # once and only the folder metadata members are extracted
+        response = self.transfer.call(
+            self.s3.get_object, Bucket=self.bucket_name, Key=key
+        )
+        metadata = {}
+        sizes = {}
+        with tarfile.open(fileobj=response["Body"], mode="r|*") as archive:
+            for member in archive:
+                if not member.isfile():
+                    continue
+                sizes[member.name] = member.size
+                folder, _, filename = member.name.rpartition("/")
+                if filename == METADATA_FILENAME:
+                    metadata[folder] = json.loads(archive.extractfile(member).read())
+        return describe_package(package_name, metadata, sizes, compressed=True)
+
+    def _manifest_key(self, package_name: str) -> str:
+        return f"{package_name}{SHARDS_SUFFIX}/{SHARD_MANIFEST}"
 
-    def _get_package_files(self, package_name: str) -> list[str]:
-        response = self.s3.list_objects_v2(
-            Bucket=self.bucket_name, Prefix=f"{package_name}/"
+    def _read_manifest(self, package_name: str) -> ShardManifest:
+        return ShardManifest.model_validate(
+            self._read_json(self._manifest_key(package_name))
         )
-        return [file["Key"] for file in response["Contents"]]
+
+    def _read_json(self, key: str) -> dict:
+        return json.loads(self.transfer.call(self._read_object, key))
+
+    def _read_object(self, key: str) -> bytes:
+        response = self.s3.get_object(Bucket=self.bucket_name, Key=key)
+        body = response["Body"].read()
+        if response.get("ContentEncoding") == "gzip":
+            body = gzip.decompress(body)
+        return body
+
+    def _cache_key(self, package_name: str, compressed: bool) -> tuple:
+        return (self.s3.meta.endpoint_url, self.bucket_name, package_name, compressed)
+
+    def _package_version(self, package_name: str) -> str | None:
+        response = self._head_object(f"{package_name}/{COMPLETION_MARKER}")
+        if response is None:
+            return None
+        return response["ETag"]
+
+    def _head_object(self, key: str) -> dict | None:
+        try:
+            return self.transfer.call(
+                self.s3.head_object, Bucket=self.bucket_name, Key=key
+            )
+        except ClientError as error:
+            if error.response["Error"]["Code"] in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+
+    def _get_package_files(self, package_name: str) -> list[StoredObject]:
+        paginator = self.s3.get_paginator("list_objects_v2")
+        pages = paginator.paginate(Bucket=self.bucket_name, Prefix=f"{package_name}/")
+        markers = {
+            f"{package_name}/{COMPLETION_MARKER}",
+            f"{package_name}/{IN_PROGRESS_MARKER}",
+        }
+        files = []
+        for page in self.transfer.call(list, pages):
+            files.extend(
+                StoredObject(file["Key"], file["ETag"], file["Size"])
+                for file in page.get("Contents", [])
+                if file["Key"] not in markers
+            )
+        return files
 
     def _download_compressed_package(
-        self, package_name: str, temp_dir: Path = Path(".") / "tmp"
+        self,
+        package_name: str,
+        temp_dir: Path = Path(".") / "tmp",
+        stored: StoredObject | None = None,
     ) -> Package:
-        self.s3.download_file(
+        # The format is told apart by the suffix of the archive found in S3
+        stored = stored or StoredObject(f"{package_name}.zip")
+        archive = temp_dir / stored.key
+        with instrumentation.span("s3.download", key=archive.name):
+            if self.disk_cache is not None and stored.etag is not None:
+                # Archives are only known by their ETag, the size is not needed
+                # to tell two of them apart
+                self.disk_cache.fetch(
+                    stored.etag,
+                    0,
+                    archive,
+                    lambda path: self._download_archive(archive, path),
+                )
+            else:
+                self._download_archive(archive, archive)
+        with instrumentation.span("s3.unarchive", key=archive.name):
+            extract_archive(archive, temp_dir / package_name)
+
+    def _download_archive(self, archive: Path, destination: Path) -> None:
+        # The archive size is not known up front, progress only counts up
+        tracker = instrumentation.progress("s3.download_bytes", key=archive.name)
+        self.transfer.call(
+            self.s3_transfers.download_file,
             self.bucket_name,
-            f"{package_name}.zip",
-            str(temp_dir / f"{package_name}.zip"),
+            archive.name,
+            str(destination),
+            Callback=tracker.advance if tracker else None,
         )
-        shutil.unpack_archive(temp_dir / f"{package_name}.zip", temp_dir / package_name)
+        if tracker:
+            instrumentation.count("s3.objects_downloaded")
+            instrumentation.count("s3.bytes_downloaded", destination.stat().st_size)
+
+    def _download_sharded_package(
+        self,
+        package_name: str,
+        temp_dir: Path,
+        selector: PathSelector | None = None,
+    ) -> None:
+        # Only the shards holding folders the selection may reach are fetched
+        prefix = f"{package_name}{SHARDS_SUFFIX}"
+        shards = self._read_manifest(package_name).select(selector)
+        files = {}
+        if self.disk_cache is not None:
+            files = {file.key: file for file in self._get_package_files(prefix)}
+        keys = [f"{prefix}/{shard.filename}" for shard in shards]
+        self.transfer.map(
+            self._download_file,
+            [(files.get(key, StoredObject(key)), temp_dir) for key in keys],
+            progress="s3.download",
+            package=package_name,
+        )
+        for key in keys:
+            with instrumentation.span("s3.unarchive", key=key):
+                shutil.unpack_archive(temp_dir / key, temp_dir / package_name, "zip")
 
     def _download_uncompressed_package(
-        self, files: list[str], temp_dir: Path = Path(".") / "tmp"
+        self, files: list[StoredObject], temp_dir: Path = Path(".") / "tmp"
     ) -> Package:
         # Download all files
+        self.transfer.map(
+            self._download_file,
+            [(file, temp_dir) for file in files],
+            progress="s3.download",
+        )
+
+    def _download_selected_files(
+        self,
+        package_name: str,
+        files: list[StoredObject],
+        selector: PathSelector,
+        temp_dir: Path,
+    ) -> None:
+        folders: dict[str, dict[str, StoredObject]] = {}
         for file in files:
-            file_path = Path(file)
-            (temp_dir / file_path.parent).mkdir(parents=True, exist_ok=True)
-            self.s3.download_file(self.bucket_name, file, str(temp_dir / file_path))
+            folder, _, name = file.key.removeprefix(f"{package_name}/").rpartition("/")
+            if folder:
+                folders.setdefault(folder, {})[name] = file
+
+        # Folder metadata comes first: it tells which objects hold which file
+        folders = {
+            folder: names
+            for folder, names in folders.items()
+            if METADATA_FILENAME in names and selector.may_contain(folder)
+        }
+        self.transfer.map(
+            self._download_file,
+            [(names[METADATA_FILENAME], temp_dir) for names in folders.values()],
+        )
+
+        downloads = []
+        ranged_reads = []
+        for folder, names in folders.items():
+            folder_path = temp_dir / package_name / folder
+            folder_metadata = FolderMetadata.load(folder_path)
+            blobs = {entry.blob for entry in folder_metadata.packed_files.values()}
+            for file_metadata in folder_metadata.files_metadata:
+                if not selector.matches(
+                    f"{folder}/{file_metadata.filename}", file_metadata
+                ):
+                    continue
+                packed_file = folder_metadata.packed_files.get(file_metadata.filename)
+                if packed_file is not None:
+                    ranged_reads.append(
+                        (
+                            names[packed_file.blob],
+                            packed_file,
+                            folder_path / file_metadata.filename,
+                        )
+                    )
+                    continue
+                patterns = stored_patterns(
+                    file_metadata.file_content_encoder_class, file_metadata.filename
+                )
+                downloads.extend(
+                    (file, temp_dir)
+                    for name, file in names.items()
+                    if name != METADATA_FILENAME
+                    and name not in blobs
+                    and any(fnmatchcase(name, pattern) for pattern in patterns)
+                )
+
+        self.transfer.map(
+            self._download_file, downloads, progress="s3.download", package=package_name
+        )
+        self.transfer.map(
+            self._download_packed_file,
+            ranged_reads,
+            progress="s3.download",
+            package=package_name,
+        )
+
+    def _download_packed_file(
+        self, blob: StoredObject, packed_file: PackedFile, destination: Path
+    ) -> None:
+        if packed_file.length == 0:
+            destination.write_bytes(b"")
+            return
+        # A blob already in the disk cache is read locally instead of issuing
+        # a ranged request
+        cached = None
+        if self.disk_cache is not None and blob.etag is not None:
+            cached = self.disk_cache.path(blob.etag, blob.size)
+        if cached is not None:
+            try:
+                with open(cached, "rb") as f:
+                    f.seek(packed_file.offset)
+                    destination.write_bytes(f.read(packed_file.length))
+                return
+            except FileNotFoundError:
+                pass
+        destination.write_bytes(
+            self.transfer.call(
+                self._read_range, blob.key, packed_file.offset, packed_file.length
+            )
+        )
+
+    def _read_range(self, key: str, offset: int, length: int) -> bytes:
+        response = self.s3.get_object(
+            Bucket=self.bucket_name,
+            Key=key,
+            Range=f"bytes={offset}-{offset + length - 1}",
+        )
+        body = response["Body"].read()
+        instrumentation.count("s3.ranged_reads")
+        instrumentation.count("s3.bytes_downloaded", len(body))
+        return body
+
+    def _download_file(self, file: StoredObject, temp_dir: Path) -> None:
+        destination = temp_dir / file.key
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        with instrumentation.span("s3.download", key=file.key):
+            if self.disk_cache is not None and file.etag is not None:
+                self.disk_cache.fetch(
+                    file.etag,
+                    file.size,
+                    destination,
+                    lambda path: self.transfer.call(
+                        self._get_object_to_file, file.key, path
+                    ),
+                )
+                return
+            # The whole request is retried, including reading the body
+            self.transfer.call(self._get_object_to_file, file.key, destination)
+
+    def _get_object_to_file(self, key: str, destination: Path) -> None:
+        response = self.s3.get_object(Bucket=self.bucket_name, Key=key)
+        body = response["Body"]
+        size = response.get("ContentLength")
+        callback = None
+        # Objects written by a compressing ExportPipeline are stored gzipped
+        if response.get("ContentEncoding") == "gzip":
+            body = gzip.GzipFile(fileobj=body)
+        else:
+            callback = self._byte_progress("s3.download_bytes", key, size)
+        with open(destination, "wb") as f:
+            if callback is None:
+                shutil.copyfileobj(body, f)
+            else:
+                while chunk := body.read(MULTIPART_CHUNKSIZE):
+                    f.write(chunk)
+                    callback(len(chunk))
+        if size is not None:
+            instrumentation.count("s3.objects_downloaded")
+            instrumentation.count("s3.bytes_downloaded", size)
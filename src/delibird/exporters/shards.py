@@ -0,0 +1,66 @@
+import heapq
+import zipfile
+from pathlib import Path
+
+from pydantic import BaseModel
+
+from ..core.selection import PathSelector
+
+SHARDS_SUFFIX = ".shards"
+SHARD_MANIFEST = "__manifest__.json"
+
+
+class Shard(BaseModel):
+    filename: str
+    folders: list[str]
+    size: int
+
+
+class ShardManifest(BaseModel):
+    shards: list[Shard] = []
+
+    def select(self, selector: PathSelector | None) -> list[Shard]:
+        # The package root ("") is always needed, other folders only when the
+        # selection may reach into them
+        if selector is None:
+            return list(self.shards)
+        return [
+            shard
+            for shard in self.shards
+            if any(
+                folder == "" or selector.may_contain(folder) for folder in shard.folders
+            )
+        ]
+
+
+def plan_shards(package_path: Path, shard_count: int) -> list[list[str]]:
+    # Each folder is kept whole (its own files, not its subfolders) and the
+    # largest folders are placed first, each into the lightest shard so far
+    sizes = {}
+    for folder_path in [package_path, *package_path.rglob("*")]:
+        if not folder_path.is_dir():
+            continue
+        folder = folder_path.relative_to(package_path).as_posix()
+        sizes["" if folder == "." else folder] = sum(
+            path.stat().st_size for path in folder_path.iterdir() if path.is_file()
+        )
+
+    shards: list[list[str]] = [[] for _ in range(shard_count)]
+    heap = [(0, i) for i in range(shard_count)]
+    for folder, size in sorted(sizes.items(), key=lambda item: (-item[1], item[0])):
+        total, i = heapq.heappop(heap)
+        shards[i].append(folder)
+        heapq.heappush(heap, (total + size, i))
+    return [sorted(folders) for folders in shards if folders]
+
+
+def write_shard(package_path: Path, folders: list[str], archive_path: Path) -> int:
+    with zipfile.ZipFile(archive_path, "w", zipfile.ZIP_DEFLATED) as archive:
+        for folder in folders:
+            for file_path in sorted((package_path / folder).iterdir()):
+                if file_path.is_file():
+                    archive.write(
+                        file_path,
+                        f"{folder}/{file_path.name}" if folder else file_path.name,
+                    )
+    return archive_path.stat().st_size
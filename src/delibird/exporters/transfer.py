@@ -0,0 +1,212 @@
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Callable, Iterable, TypeVar
+
+from botocore.exceptions import ClientError, HTTPClientError
+from botocore.exceptions import ConnectionError as BotoConnectionError
+
+from ..core import instrumentation
+
+T = TypeVar("T")
+
+THROTTLING_ERROR_CODES = {
+    "SlowDown",
+    "Throttling",
+    "ThrottlingException",
+    "ThrottledException",
+    "RequestThrottled",
+    "RequestThrottledException",
+    "RequestLimitExceeded",
+    "TooManyRequestsException",
+    "ProvisionedThroughputExceededException",
+    "ServiceUnavailable",
+}
+TRANSIENT_ERROR_CODES = {
+    "RequestTimeout",
+    "RequestTimeoutException",
+    "InternalError",
+    "PriorRequestNotComplete",
+}
+
+
+def _client_error(error: BaseException) -> ClientError | None:
+    # boto3's upload_file re-raises client errors as S3UploadFailedError while
+    # handling them, so the original error is found in the exception context.
+    while error is not None:
+        if isinstance(error, ClientError):
+            return error
+        error = error.__cause__ or error.__context__
+    return None
+
+
+def is_throttling_error(error: BaseException) -> bool:
+    client_error = _client_error(error)
+    if client_error is None:
+        return False
+    code = client_error.response.get("Error", {}).get("Code")
+    status = client_error.response.get("ResponseMetadata", {}).get("HTTPStatusCode")
+    return code in THROTTLING_ERROR_CODES or status in (429, 503)
+
+
+def is_transient_error(error: BaseException) -> bool:
+    if isinstance(error, (BotoConnectionError, HTTPClientError)):
+        return True
+    client_error = _client_error(error)
+    if client_error is None:
+        return False
+    code = client_error.response.get("Error", {}).get("Code")
+    status = client_error.response.get("ResponseMetadata", {}).get("HTTPStatusCode")
+    return code in TRANSIENT_ERROR_CODES or (status is not None and status >= 500)
+
+
+class TransferController:
+    def __init__(
+        self,
+        max_attempts: int = 8,
+        base_delay: float = 0.1,
+        max_delay: float = 20.0,
+        initial_concurrency: int = 8,
+        min_concurrency: int = 1,
+        max_concurrency: int = 64,
+        latency_target: float | None = None,
+        deadline: float | None = None,
+    ):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.latency_target = latency_target
+        self.deadline = deadline
+        self.limit = float(initial_concurrency)
+        self.in_flight = 0
+        self.retries = 0
+        self.throttles = 0
+        self._last_decrease = 0.0
+        self._latency = 0.0
+        self._condition = threading.Condition()
+        self._executor: ThreadPoolExecutor | None = None
+        self._executor_lock = threading.Lock()
+
+    @property
+    def concurrency(self) -> int:
+        return max(self.min_concurrency, int(self.limit))
+
+    def call(self, func: Callable[..., T], *args, **kwargs) -> T:
+        deadline = None
+        if self.deadline is not None:
+            deadline = time.monotonic() + self.deadline
+
+        attempt = 1
+        while True:
+            self._acquire(deadline)
+            start = time.monotonic()
+            try:
+                result = func(*args, **kwargs)
+            except Exception as error:
+                self._release()
+                throttled = is_throttling_error(error)
+                if not (throttled or is_transient_error(error)):
+                    raise
+                if attempt >= self.max_attempts:
+                    raise
+                if throttled:
+                    self._decrease()
+                delay = self._backoff(attempt)
+                if deadline is not None and time.monotonic() + delay > deadline:
+                    raise TimeoutError(
+                        f"Transfer did not complete within {self.deadline}s"
+                    ) from error
+                with self._condition:
+                    self.retries += 1
+                instrumentation.count(
+                    "transfer.retries",
+                    error=type(error).__name__,
+                    throttled=throttled,
+                    attempt=attempt,
+                )
+                time.sleep(delay)
+                attempt += 1
+                continue
+
+            self._release()
+            self._increase(time.monotonic() - start)
+            return result
+
+    def map(
+        self,
+        func: Callable[..., T],
+        items: Iterable[tuple],
+        progress: str | None = None,
+        **attributes,
+    ) -> list[T]:
+        # Workers are shared across calls. They do not take a slot themselves:
+        # the requests issued through call() do, so the adaptive limit and not
+        # the pool size decides how many requests run at once.
+        items = list(items)
+        futures = [self._get_executor().submit(func, *item) for item in items]
+        if progress is not None:
+            tracker = instrumentation.progress(progress, len(items), **attributes)
+            if tracker:
+                for future in futures:
+                    future.add_done_callback(lambda _: tracker.advance())
+        try:
+            return [future.result() for future in futures]
+        except BaseException:
+            # Transfers already running are waited for, so nothing is still
+            # writing once the error reaches the caller.
+            for future in futures:
+                future.cancel()
+            wait(futures)
+            raise
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_concurrency,
+                    thread_name_prefix="delibird-transfer",
+                )
+            return self._executor
+
+    def _backoff(self, attempt: int) -> float:
+        # Full jitter: spreads retries of concurrent transfers apart
+        ceiling = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return random.uniform(0, ceiling)
+
+    def _acquire(self, deadline: float | None) -> None:
+        with self._condition:
+            timeout = None if deadline is None else deadline - time.monotonic()
+            if not self._condition.wait_for(
+                lambda: self.in_flight < self.concurrency, timeout=timeout
+            ):
+                raise TimeoutError(f"Transfer did not start within {self.deadline}s")
+            self.in_flight += 1
+
+    def _release(self) -> None:
+        with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+    def _decrease(self) -> None:
+        # Multiplicative decrease, at most once per round trip so a burst of
+        # throttled requests sent together only halves the limit once.
+        instrumentation.count("transfer.throttles")
+        with self._condition:
+            self.throttles += 1
+            now = time.monotonic()
+            if now - self._last_decrease < max(self._latency, self.base_delay):
+                return
+            self._last_decrease = now
+            self.limit = max(float(self.min_concurrency), self.limit / 2)
+
+    def _increase(self, latency: float) -> None:
+        with self._condition:
+            self._latency = 0.8 * self._latency + 0.2 * latency
+            if self.latency_target is not None and latency > self.latency_target:
+                return
+            # Additive increase: roughly one extra slot per window of transfers
+            self.limit = min(float(self.max_concurrency), self.limit + 1 / self.limit)
+            self._condition.notify_all()
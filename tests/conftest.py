@@ -1,6 +1,11 @@
 import pytest
+from moto import mock_aws
 from pydantic import BaseModel
 
+from delibird import File, Folder, Package
+from delibird.exporters.clients import clear_s3_clients
+from delibird.exporters.s3 import S3Exporter
+
 
 class TestContent(BaseModel):
     name: str
@@ -15,3 +20,41 @@ def test_content():
 @pytest.fixture
 def test_content_class():
     return TestContent
+
+
+@pytest.fixture
+def s3_exporter(monkeypatch, tmp_path):
+    # Every test gets an empty in-memory S3 and its own working directory,
+    # where exports stage and loads download
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    with mock_aws():
+        clear_s3_clients()
+        S3Exporter._ready_buckets.clear()
+        yield S3Exporter(bucket_name="delibird-test")
+    clear_s3_clients()
+    S3Exporter._ready_buckets.clear()
+
+
+@pytest.fixture
+def build_package(test_content_class):
+    def build(name: str) -> Package:
+        inner = Folder(name="inner")
+        inner.add_file(
+            File(filename="a.json", content=test_content_class(name="a", age=1))
+        )
+        inner.add_file(
+            File(filename="b.json", content=test_content_class(name="b", age=2))
+        )
+        outer = Folder(name="outer")
+        outer.add_file(
+            File(filename="c.json", content=test_content_class(name="c", age=3))
+        )
+        outer.add_folder(inner)
+        package = Package(name=name)
+        package.add_folder(outer)
+        return package
+
+    return build
@@ -0,0 +1,62 @@
+import shutil
+from pathlib import Path
+
+from delibird import File, Folder, Package
+from delibird.core.description import describe_directory
+from delibird.encoders.paginated_pydantic_encoder import PaginatedPydanticEncoder
+
+
+def test_describe_directory(test_content):
+    package = Package(name="test_describe")
+    folder = Folder(name="test")
+    folder.add_file(File(filename="test.json", content=test_content))
+    folder.add_file(File(filename="small.json", content=test_content))
+    subfolder = Folder(name="nested")
+    subfolder.add_file(
+        File(
+            filename="pages.json",
+            content=[test_content] * 10,
+            content_encoder=PaginatedPydanticEncoder,
+            dump_kwargs={"page_size": 3},
+        )
+    )
+    folder.add_folder(subfolder)
+    package.add_folder(folder)
+    package.dump()
+
+    description = describe_directory(Path(".") / "test_describe")
+
+    assert description.name == "test_describe"
+    assert description.file_count == 3
+    assert description.folder_count == 2
+    [test_folder] = description.folders
+    assert [file.filename for file in test_folder.files] == ["test.json", "small.json"]
+    assert (
+        test_folder.files[0].size == Path("test_describe/test/test.json").stat().st_size
+    )
+    pages = test_folder.folders[0].files[0]
+    assert pages.encoder_class.endswith("PaginatedPydanticEncoder")
+    assert pages.size == sum(
+        path.stat().st_size
+        for path in Path("test_describe/test/nested").glob("pages_*.json")
+    )
+    assert description.size == sum(file.size for file in description.iter_files())
+    assert sum(description.encoder_classes.values()) == 3
+
+    shutil.rmtree("test_describe")
+
+
+def test_describe_directory_packed(test_content):
+    package = Package(name="test_describe_packed")
+    folder = Folder(name="test")
+    folder.add_file(File(filename="test.json", content=test_content))
+    package.add_folder(folder)
+    package.dump(pack_threshold=1024)
+
+    description = describe_directory(Path(".") / "test_describe_packed")
+
+    [file] = description.folders[0].files
+    assert file.packed
+    assert file.size == len(test_content.model_dump_json())
+
+    shutil.rmtree("test_describe_packed")
@@ -1,8 +1,10 @@
+import json
 from pathlib import Path
 
 import pytest
 
 from delibird import File
+from delibird.core.package import FileMetadata
 from delibird.encoders.pydantic_encoder import PydanticEncoder
 
 
@@ -54,3 +56,14 @@ def test_file_load(test_content, test_content_class):
 
     # clean up
     (Path(".") / "test.json").unlink()
+
+
+def test_file_metadata_round_trip(test_content, test_content_class):
+    file = File(filename="test.json", content=test_content, dump_kwargs={"indent": 2})
+    metadata = file.metadata
+    # Built from the file's own, already validated fields
+    assert metadata.file_dump_kwargs is file.dump_kwargs
+    loaded = FileMetadata.load(json.loads(metadata.model_dump_json()))
+    assert loaded == metadata
+    assert loaded.file_content_class is test_content_class
+    assert loaded.file_content_encoder_class is PydanticEncoder
@@ -1,4 +1,6 @@
+import gc
 import shutil
+import tracemalloc
 from pathlib import Path
 
 import pytest
@@ -179,3 +181,76 @@ def test_getitem_nested(test_content):
     folder.add_folder(Folder(name="test2"))
     folder["test2"].add_file(File(filename="test2.json", content=test_content))
     assert folder["test2"]["test2.json"] == test_content
+
+
+def test_files_write_through(test_content_class):
+    folder = Folder(name="test")
+    file = File(filename="test.json", content=test_content_class(name="a", age=1))
+    folder.add_file(file)
+
+    file.content = test_content_class(name="b", age=2)
+    assert folder["test.json"].name == "b"
+    folder.files[0].content = test_content_class(name="c", age=3)
+    assert folder["test.json"].name == "c"
+    assert folder.files == [File(filename="test.json", content=folder["test.json"])]
+    assert folder.folder_metadata[0] == folder.files[0].metadata
+
+
+def test_files_are_kept_compact(test_content_class):
+    contents = [test_content_class(name="x", age=i) for i in range(10000)]
+    names = [f"{i}.json" for i in range(10000)]
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        folder = Folder(name="test")
+        for name, content in zip(names, contents):
+            folder.add_file(File(filename=name, content=content))
+        gc.collect()
+        per_file = (tracemalloc.get_traced_memory()[0] - before) / len(names)
+    finally:
+        tracemalloc.stop()
+
+    # A File model with its metadata alone took over 600 bytes
+    assert per_file < 300
+    assert len(folder.folder_metadata) == len(names)
+
+
+def test_folder_serialization(test_content):
+    folder = Folder(name="test")
+    folder.add_file(File(filename="test.json", content=test_content))
+    folder.add_folder(Folder(name="test2"))
+
+    dumped = folder.model_dump()
+    assert dumped["files"][0]["metadata"]["filename"] == "test.json"
+    assert dumped["folder_metadata"]["folders"] == ["test2"]
+    assert (
+        Folder(
+            name="test",
+            files=folder.files,
+            folders=folder.folders,
+            folder_metadata=folder.folder_metadata,
+        )
+        == folder
+    )
+    with pytest.raises(ValueError):
+        Folder(name="test", folder_metadata=folder.folder_metadata)
+
+
+def test_files_list_changes_go_through_the_folder(test_content):
+    folder = Folder(name="test")
+    folder.files.append(File(filename="a.json", content=test_content))
+    folder.files.insert(0, File(filename="b.json", content=test_content))
+    assert [file.filename for file in folder.files] == ["b.json", "a.json"]
+    assert folder["a.json"] == test_content
+
+    folder.files[0] = File(filename="c.json", content=test_content)
+    del folder.files[1]
+    assert [file.filename for file in folder.files] == ["c.json"]
+    assert [
+        metadata.filename for metadata in folder.folder_metadata.files_metadata
+    ] == ["c.json"]
+    with pytest.raises(KeyError):
+        _ = folder["a.json"]
+    with pytest.raises(ValueError):
+        folder.files.append(File(filename="c.json", content=test_content))
@@ -0,0 +1,109 @@
+import copy
+import gc
+import pickle
+import shutil
+import weakref
+from pathlib import Path
+
+from delibird import File, Folder, Package
+from delibird.core.package import PackageIndex
+
+
+def build_package(test_content) -> Package:
+    package = Package(name="test_index")
+    folder = Folder(name="a")
+    package.add_folder(folder)
+    # Added after the folder joined the package, the index follows along
+    subfolder = Folder(name="b")
+    folder.add_folder(subfolder)
+    subfolder.add_file(File(filename="c.json", content=test_content))
+    folder.add_file(File(filename="d.json", content=test_content))
+    package.add_folder(Folder(name="e"))
+    return package
+
+
+def test_package_get(test_content):
+    package = build_package(test_content)
+
+    assert package.get("a/b/c.json") == package["a"]["b"]["c.json"]
+    assert package.get("a/b") is package["a"]["b"]
+    assert package.get("a/missing.json") is None
+    assert package.get("a/missing.json", default=1) == 1
+
+
+def test_package_paths_and_glob(test_content):
+    package = build_package(test_content)
+
+    assert package.paths() == ["a", "a/b", "a/b/c.json", "a/d.json", "e"]
+    assert package.paths("a/b") == ["a/b", "a/b/c.json"]
+    assert package.glob("a/*.json") == ["a/d.json"]
+    assert package.glob("**/*.json") == ["a/b/c.json", "a/d.json"]
+
+
+def test_package_index_remove_file(test_content):
+    package = build_package(test_content)
+    file = package["a"].files[0]
+    package["a"].remove_file(file)
+
+    assert package.get("a/d.json") is None
+    assert package.glob("**/*.json") == ["a/b/c.json"]
+
+
+def test_package_index_shared_folder(test_content):
+    package = Package(name="test_index")
+    shared = Folder(name="shared")
+    outer = Folder(name="outer")
+    outer.add_folder(shared)
+    package.add_folder(shared)
+    package.add_folder(outer)
+    shared.add_file(File(filename="f.json", content=test_content))
+
+    assert package.glob("**/f.json") == ["outer/shared/f.json", "shared/f.json"]
+
+
+def test_package_index_dump_and_load(test_content):
+    package = build_package(test_content)
+    package.dump()
+
+    index = PackageIndex.load(Path("test_index"))
+    assert index.files == ["a/b/c.json", "a/d.json"]
+    assert index.folders == ["a", "a/b", "e"]
+
+    # Directories left next to the package are not part of it
+    (Path("test_index") / "stray").mkdir()
+    loaded_package = Package.load(Path("test_index"))
+    assert loaded_package["a"] == package["a"]
+    assert loaded_package.paths() == package.paths()
+    assert [str(folder.name) for folder in loaded_package.folders] == ["a", "e"]
+
+    shutil.rmtree("test_index")
+
+
+def test_folders_do_not_keep_packages_alive(test_content):
+    folder = Folder(name="a")
+    packages = [weakref.ref(Package(name=f"p{i}", folders=[folder])) for i in range(10)]
+    gc.collect()
+    assert all(package() is None for package in packages)
+
+    # Live packages still follow changes to the folder
+    package = Package(name="live", folders=[folder])
+    folder.add_file(File(filename="b.json", content=test_content))
+    assert package.get("a/b.json") == test_content
+    assert len(folder._parents.refs) == 1
+
+
+def test_copied_packages_follow_their_own_folders(test_content):
+    package = build_package(test_content)
+    copies = [
+        copy.deepcopy(package),
+        package.model_copy(deep=True),
+        package.model_copy(update={"name": "copied"}, deep=True),
+        pickle.loads(pickle.dumps(package)),
+    ]
+
+    for i, copied in enumerate(copies):
+        assert copied["a"] == package["a"]
+        copied["a"]["b"].add_file(File(filename=f"{i}.json", content=test_content))
+        assert copied.get(f"a/b/{i}.json") == test_content
+        assert package.get(f"a/b/{i}.json") is None
+    assert package.paths() == ["a", "a/b", "a/b/c.json", "a/d.json", "e"]
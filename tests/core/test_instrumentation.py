@@ -0,0 +1,60 @@
+import shutil
+from pathlib import Path
+
+import pytest
+
+from delibird import File, Folder, Package
+from delibird.core import instrumentation
+from delibird.core.instrumentation import MetricsRecorder
+
+
+def test_disabled_by_default():
+    assert not instrumentation.enabled()
+    assert instrumentation.span("file.dump") is instrumentation.DISABLED
+    assert instrumentation.progress("s3.upload", 10) is instrumentation.DISABLED
+    with instrumentation.span("file.dump") as span:
+        span.set(bytes=1)
+
+
+def test_package_dump_and_load_spans(test_content):
+    package = Package(name="test_instrumentation")
+    folder = Folder(name="a")
+    folder.add_file(File(filename="b.json", content=test_content))
+    package.add_folder(folder)
+
+    events = []
+    recorder = MetricsRecorder()
+    try:
+        with instrumentation.subscribed(events.append):
+            with instrumentation.subscribed(recorder):
+                package.dump()
+                Package.load(Path("test_instrumentation"))
+    finally:
+        shutil.rmtree("test_instrumentation")
+    assert not instrumentation.enabled()
+
+    parents = {event.name: event.parent for event in events if event.kind == "span"}
+    assert parents["package.dump"] is None
+    assert parents["folder.dump"] == "package.dump"
+    assert parents["encoder.encode"] == "file.dump"
+
+    summary = recorder.summary()["spans"]
+    assert summary["file.dump"]["count"] == 1
+    assert summary["file.load"]["count"] == 1
+    written = len(test_content.model_dump_json())
+    assert summary["fs.write"]["bytes"] >= written
+    assert summary["fs.read"]["bytes"] >= written
+
+
+def test_failing_callback_does_not_break_dump(test_content):
+    def broken(event):
+        raise RuntimeError("sink down")
+
+    folder = Folder(name="test_instrumentation_broken")
+    folder.add_file(File(filename="b.json", content=test_content))
+    try:
+        with instrumentation.subscribed(broken):
+            with pytest.warns(RuntimeWarning, match="sink down"):
+                folder.dump(Path("."))
+    finally:
+        shutil.rmtree("test_instrumentation_broken")
@@ -0,0 +1,144 @@
+import shutil
+from pathlib import Path
+
+import pytest
+from pydantic import BaseModel
+
+from delibird import File, Folder, Package
+from delibird.core.packing import (
+    PACK_FILENAME,
+    PackedFile,
+    pack_files,
+    read_packed_files,
+    unpack_files,
+)
+from delibird.encoders.paginated_pydantic_encoder import PaginatedPydanticEncoder
+from delibird.encoders.pydantic_encoder import PydanticEncoder
+
+
+class SimpleModel(BaseModel):
+    name: str
+    age: int
+
+
+def test_pack_files():
+    directory = Path(".") / "packing"
+    directory.mkdir(parents=True, exist_ok=True)
+    (directory / "a.json").write_bytes(b"aaa")
+    (directory / "b.json").write_bytes(b"bb")
+    (directory / "c.json").write_bytes(b"c" * 100)
+
+    packed = pack_files(directory, ["a.json", "b.json", "c.json"], threshold=10)
+
+    assert set(packed) == {"a.json", "b.json"}
+    assert packed["a.json"].offset == 0
+    assert packed["a.json"].length == 3
+    assert packed["b.json"].offset == 3
+    assert packed["b.json"].length == 2
+    assert (directory / PACK_FILENAME).read_bytes() == b"aaabb"
+    assert not (directory / "a.json").exists()
+    assert (directory / "c.json").exists()
+
+    unpacked = unpack_files(directory, packed)
+    assert len(unpacked) == 2
+    assert (directory / "a.json").read_bytes() == b"aaa"
+    assert (directory / "b.json").read_bytes() == b"bb"
+
+    shutil.rmtree(directory)
+
+
+def test_pack_files_nothing_to_pack():
+    directory = Path(".") / "packing"
+    directory.mkdir(parents=True, exist_ok=True)
+    (directory / "a.json").write_bytes(b"a" * 100)
+
+    packed = pack_files(directory, ["a.json", "missing.json"], threshold=10)
+
+    assert packed == {}
+    assert not (directory / PACK_FILENAME).exists()
+
+    shutil.rmtree(directory)
+
+
+def test_package_dump_and_load_packed(test_content):
+    package = Package(name="test_packed")
+    folder = Folder(name="test")
+    for i in range(5):
+        folder.add_file(File(filename=f"test{i}.json", content=test_content))
+    folder.add_file(
+        File(
+            filename="paginated.json",
+            content=[SimpleModel(name=f"test_{i}", age=i) for i in range(10)],
+            content_encoder=PaginatedPydanticEncoder,
+            dump_kwargs={"page_size": 3},
+        )
+    )
+    folder.add_folder(
+        Folder(name="nested").add_file(File(filename="test.json", content=test_content))
+    )
+    package.add_folder(folder)
+
+    package.dump(pack_threshold=1024)
+
+    directory = Path(".") / "test_packed" / "test"
+    assert (directory / PACK_FILENAME).exists()
+    assert not (directory / "test0.json").exists()
+    assert (directory / "paginated_0.json").exists()
+    assert (directory / "nested" / PACK_FILENAME).exists()
+
+    loaded_package = Package.load(Path(".") / "test_packed")
+    assert loaded_package == package
+    assert not (directory / "test0.json").exists()
+
+    shutil.rmtree(Path(".") / "test_packed")
+
+
+def test_read_packed_files(tmp_path: Path):
+    (tmp_path / "a.json").write_bytes(b"aaa")
+    (tmp_path / "b.json").write_bytes(b"bb")
+    packed = pack_files(tmp_path, ["a.json", "b.json"], threshold=10)
+
+    assert read_packed_files(tmp_path, packed) == {"a.json": b"aaa", "b.json": b"bb"}
+    assert not (tmp_path / "a.json").exists()
+
+    (tmp_path / "empty").write_bytes(b"")
+    empty = {"c.json": PackedFile(blob="empty", offset=0, length=0)}
+    assert read_packed_files(tmp_path, empty) == {"c.json": b""}
+
+
+def test_packed_files_load_without_unpacking(test_content, monkeypatch):
+    folder = Folder(name="test_packed_in_memory")
+    folder.add_file(File(filename="a.json", content=test_content))
+    folder.dump(Path("."), pack_threshold=1024)
+    path = Path("test_packed_in_memory")
+    try:
+        written = []
+        monkeypatch.setattr(
+            Path, "write_bytes", lambda self, data: written.append(self)
+        )
+        loaded = Folder.load(path)
+    finally:
+        shutil.rmtree(path)
+
+    assert written == []
+    assert loaded["a.json"] == test_content
+
+
+def test_failed_load_removes_unpacked_files(test_content, monkeypatch):
+    folder = Folder(name="test_packed_failure")
+    folder.add_file(File(filename="a.json", content=test_content))
+    folder.dump(Path("."), pack_threshold=1024)
+    path = Path("test_packed_failure")
+
+    def failing_load(*args, **kwargs):
+        raise ValueError("corrupted")
+
+    # Loaded from disk, as encoders without bytes support are
+    monkeypatch.setattr("delibird.core.package.supports_bytes", lambda encoder: False)
+    monkeypatch.setattr(PydanticEncoder, "disk_load", failing_load)
+    try:
+        with pytest.raises(ValueError):
+            Folder.load(path)
+        assert not (path / "a.json").exists()
+    finally:
+        shutil.rmtree(path)
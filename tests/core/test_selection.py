@@ -0,0 +1,99 @@
+import shutil
+from pathlib import Path
+
+from pydantic import BaseModel
+
+from delibird import File, Folder, Package
+from delibird.core.selection import PathSelector, glob_to_regex
+from delibird.encoders.paginated_pydantic_encoder import PaginatedPydanticEncoder
+
+
+class SimpleModel(BaseModel):
+    name: str
+    age: int
+
+
+def test_glob_to_regex():
+    assert glob_to_regex("reports/*.json").match("reports/a.json")
+    assert not glob_to_regex("reports/*.json").match("reports/2026/a.json")
+    assert glob_to_regex("reports/**/*.json").match("reports/a.json")
+    assert glob_to_regex("reports/**/*.json").match("reports/2026/01/a.json")
+    assert glob_to_regex("reports/**").match("reports/2026/a.json")
+    assert glob_to_regex("reports/202?/[ab].json").match("reports/2026/a.json")
+    assert not glob_to_regex("reports/202?/[!ab].json").match("reports/2026/a.json")
+    assert not glob_to_regex("reports/a.json").match("reports/a_json")
+
+
+def test_selector_may_contain():
+    selector = PathSelector("reports/2026/*.json")
+    assert selector.may_contain("reports")
+    assert selector.may_contain("reports/2026")
+    assert not selector.may_contain("reports/2025")
+    assert not selector.may_contain("reports/2026/01")
+    assert not selector.may_contain("users")
+
+    selector = PathSelector(["users/*", "reports/**/*.json"])
+    assert selector.may_contain("users")
+    assert selector.may_contain("reports/2026/01")
+
+
+def test_selector_predicate(test_content):
+    file = File(filename="test.json", content=test_content)
+    selector = PathSelector(lambda path, metadata: path.startswith("a/"))
+    assert selector.may_contain("b")
+    assert selector.matches("a/test.json", file.metadata)
+    assert not selector.matches("b/test.json", file.metadata)
+
+
+def build_package(test_content) -> Package:
+    reports = Folder(name="reports")
+    for year in ("2025", "2026"):
+        folder = Folder(name=year)
+        folder.add_file(File(filename="summary.json", content=test_content))
+        folder.add_file(File(filename="details.json", content=test_content))
+        reports.add_folder(folder)
+    reports.add_file(
+        File(
+            filename="paginated.json",
+            content=[SimpleModel(name=f"test_{i}", age=i) for i in range(10)],
+            content_encoder=PaginatedPydanticEncoder,
+            dump_kwargs={"page_size": 3},
+        )
+    )
+    users = Folder(name="users").add_file(
+        File(filename="test.json", content=test_content)
+    )
+    return Package(name="test_selection").add_folder(reports).add_folder(users)
+
+
+def test_package_load_select(test_content):
+    package = build_package(test_content)
+    package.dump(pack_threshold=1024)
+
+    loaded = Package.load(Path(".") / "test_selection", select="reports/2026/*.json")
+    assert [str(folder.name) for folder in loaded.folders] == ["reports"]
+    reports = loaded["reports"]
+    assert reports.files == []
+    assert [str(folder.name) for folder in reports.folders] == ["2026"]
+    assert [file.filename for file in reports["2026"].files] == [
+        "summary.json",
+        "details.json",
+    ]
+    assert reports.folder_metadata.folders == ["2026"]
+    assert len(reports.folder_metadata) == 0
+
+    loaded = Package.load(
+        Path(".") / "test_selection",
+        select=lambda path, metadata: (
+            metadata.file_content_encoder_class is PaginatedPydanticEncoder
+        ),
+    )
+    assert [str(folder.name) for folder in loaded.folders] == ["reports"]
+    assert loaded["reports"].folders == []
+    assert loaded["reports"]["paginated.json"] == package["reports"]["paginated.json"]
+
+    assert not (
+        Path(".") / "test_selection" / "reports" / "2026" / "summary.json"
+    ).exists()
+
+    shutil.rmtree(Path(".") / "test_selection")
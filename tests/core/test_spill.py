@@ -0,0 +1,82 @@
+import filecmp
+
+from delibird import File, Folder, Package
+from delibird.core.spill import SpillArea, SpilledContent, estimate_size
+from delibird.encoders.paginated_pydantic_encoder import PaginatedPydanticEncoder
+
+
+def build_package(test_content_class, spill_area: SpillArea | None) -> Package:
+    package = Package(name="test_spill", spill_area=spill_area)
+    folder = Folder(name="a")
+    package.add_folder(folder)
+    for i in range(3):
+        folder.add_file(
+            File(filename=f"{i}.json", content=test_content_class(name="x", age=i))
+        )
+    folder.add_file(
+        File(
+            filename="pages.json",
+            content=[test_content_class(name="y", age=i) for i in range(5)],
+            content_encoder=PaginatedPydanticEncoder,
+            dump_kwargs={"page_size": 2},
+        )
+    )
+    return package
+
+
+def test_spill_over_budget(test_content_class, tmp_path):
+    # Each file counts as one byte, so only the two newest stay in memory
+    area = SpillArea(tmp_path / "spill", memory_budget=2, size_of=lambda _: 1)
+    package = build_package(test_content_class, area)
+    files = package["a"].files
+
+    assert [isinstance(file.content, SpilledContent) for file in files] == [
+        True,
+        True,
+        False,
+        False,
+    ]
+    assert area.resident_bytes == 2
+    assert package["a"]["0.json"] == test_content_class(name="x", age=0)
+    assert package.get("a/1.json") == test_content_class(name="x", age=1)
+    assert (
+        files[0].metadata
+        == File(filename="0.json", content=test_content_class(name="x", age=0)).metadata
+    )
+
+    package["a"].remove_file(files[3])
+    assert area.resident_bytes == 1
+
+
+def test_spilled_dump_matches_in_memory_dump(test_content_class, tmp_path):
+    spilled = build_package(
+        test_content_class, SpillArea(tmp_path / "spill", memory_budget=0)
+    )
+    assert all(isinstance(f.content, SpilledContent) for f in spilled["a"].files)
+    spilled.root = tmp_path / "spilled"
+    spilled.dump()
+    expected = build_package(test_content_class, None)
+    expected.root = tmp_path / "expected"
+    expected.dump()
+
+    spilled_path = tmp_path / "spilled" / "test_spill" / "a"
+    expected_path = tmp_path / "expected" / "test_spill" / "a"
+    names = sorted(path.name for path in expected_path.iterdir())
+    assert names == sorted(path.name for path in spilled_path.iterdir())
+    assert filecmp.cmpfiles(spilled_path, expected_path, names, shallow=False)[0] == (
+        names
+    )
+    loaded = Package.load(tmp_path / "spilled" / "test_spill")
+    assert loaded["a"]["pages.json"] == expected["a"]["pages.json"]
+
+    # Other dump kwargs than the spilled ones encode the content again
+    spilled["a"].files[3].dump(tmp_path, page_size=5)
+    assert (tmp_path / "pages_0.json").exists()
+    assert not (tmp_path / "pages_1.json").exists()
+
+
+def test_estimate_size(test_content_class):
+    small = test_content_class(name="x", age=1)
+    large = test_content_class(name="x" * 10000, age=1)
+    assert estimate_size(large) - estimate_size(small) >= 9999
+    assert estimate_size([small, small]) < 2 * estimate_size(small)
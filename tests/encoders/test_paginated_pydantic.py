@@ -156,3 +156,50 @@ def test_paginated_with_package():
     assert loaded_package == package
 
     shutil.rmtree(directory / "test_paginated")
+
+
+def test_paginated_index_lookup():
+    content = [SimpleModel(name=f"test_{i}", age=i % 4) for i in range(10)]
+    directory = Path(".") / "paginated"
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / "test.json"
+    PaginatedPydanticEncoder.disk_dump(
+        content, path, page_size=3, index_fields=["age", "name"]
+    )
+
+    assert (directory / "test.index.json").exists()
+    # The index is not mistaken for a page
+    assert PaginatedPydanticEncoder.disk_load(path, SimpleModel) == content
+
+    reads = []
+
+    def read(name: str) -> bytes:
+        reads.append(name)
+        return (directory / name).read_bytes()
+
+    found = PaginatedPydanticEncoder.lookup(path, SimpleModel, "name", "test_7", read)
+    assert found == [content[7]]
+    assert reads == ["test.index.json", "test_2.json"]
+
+    found = PaginatedPydanticEncoder.lookup(path, SimpleModel, "age", 1)
+    assert found == [content[1], content[5], content[9]]
+    assert PaginatedPydanticEncoder.lookup(path, SimpleModel, "age", 10) == []
+
+    with pytest.raises(ValueError):
+        PaginatedPydanticEncoder.lookup(path, SimpleModel, "other", 1)
+
+    shutil.rmtree(directory)
+
+
+def test_paginated_lookup_without_index():
+    content = [SimpleModel(name=f"test_{i}", age=i) for i in range(10)]
+    directory = Path(".") / "paginated"
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / "test.json"
+    PaginatedPydanticEncoder.disk_dump(content, path, page_size=3)
+
+    assert not (directory / "test.index.json").exists()
+    with pytest.raises(ValueError):
+        PaginatedPydanticEncoder.lookup(path, SimpleModel, "age", 1)
+
+    shutil.rmtree(directory)
@@ -0,0 +1,31 @@
+from pathlib import Path
+
+from pydantic import BaseModel
+
+from delibird.core.protocols import BytesContentEncoderProtocol, supports_bytes
+from delibird.encoders.paginated_pydantic_encoder import PaginatedPydanticEncoder
+from delibird.encoders.pydantic_encoder import PydanticEncoder
+
+
+class SimpleModel(BaseModel):
+    name: str
+    age: int
+
+
+def test_pydantic_encoder_bytes_round_trip():
+    content = SimpleModel(name="tést", age=1)
+
+    data = PydanticEncoder.dumps(content, indent=2)
+    assert data == content.model_dump_json(indent=2).encode()
+    assert PydanticEncoder.loads(data, SimpleModel) == content
+    assert isinstance(PydanticEncoder, BytesContentEncoderProtocol)
+    assert supports_bytes(PydanticEncoder)
+    assert not supports_bytes(PaginatedPydanticEncoder)
+
+
+def test_pydantic_encoder_disk_round_trip(tmp_path: Path):
+    content = SimpleModel(name="tést", age=1)
+    PydanticEncoder.disk_dump(content, tmp_path / "a.json")
+
+    assert (tmp_path / "a.json").read_bytes() == PydanticEncoder.dumps(content)
+    assert PydanticEncoder.disk_load(tmp_path / "a.json", SimpleModel) == content
@@ -0,0 +1,82 @@
+import gzip
+import os
+import shutil
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from delibird.exporters.archive import PackageArchiver, extract_archive
+
+
+def make_tree(root: Path) -> dict[str, bytes]:
+    files = {
+        "__metadata__.json": b'{"name": "root"}',
+        "users/john.json": b'{"name": "John"}' * 1000,
+        "users/empty.json": b"",
+        "images/photo.png": os.urandom(2000),
+        "blobs/random.bin": os.urandom(2 * 1024 * 1024),
+    }
+    for path, content in files.items():
+        (root / path).parent.mkdir(parents=True, exist_ok=True)
+        (root / path).write_bytes(content)
+    return files
+
+
+@pytest.mark.parametrize("format", ["zip", "tar.gz", "tar.bz2", "tar.xz"])
+def test_archive_round_trip(format):
+    root = Path("test_archive")
+    files = make_tree(root / "source")
+    archiver = PackageArchiver(format, level=1, chunk_size=256 * 1024)
+    archive = root / f"package{archiver.suffix}"
+
+    archiver.write(root / "source", archive)
+    extract_archive(archive, root / "extracted")
+
+    assert {
+        path.relative_to(root / "extracted").as_posix(): path.read_bytes()
+        for path in (root / "extracted").rglob("*")
+        if path.is_file()
+    } == files
+
+    shutil.rmtree(root)
+
+
+def test_zip_stores_incompressible_members():
+    root = Path("test_archive_zip")
+    make_tree(root / "source")
+    archive = root / "package.zip"
+
+    PackageArchiver(levels={"users/*": 9}).write(root / "source", archive)
+
+    with zipfile.ZipFile(archive) as zip_file:
+        methods = {info.filename: info.compress_type for info in zip_file.infolist()}
+    assert methods["users/john.json"] == zipfile.ZIP_DEFLATED
+    assert methods["images/photo.png"] == zipfile.ZIP_STORED
+    assert methods["blobs/random.bin"] == zipfile.ZIP_STORED
+
+    shutil.rmtree(root)
+
+
+def test_tar_chunks_are_independent_streams():
+    root = Path("test_archive_tar")
+    make_tree(root / "source")
+    archive = root / "package.tar.gz"
+
+    PackageArchiver("tar.gz", max_workers=4, chunk_size=64 * 1024).write(
+        root / "source", archive
+    )
+
+    # Every chunk is a gzip member of its own, read back as a single stream
+    data = archive.read_bytes()
+    assert data.count(b"\x1f\x8b\x08") > 1
+    assert len(gzip.decompress(data)) > 2 * 1024 * 1024
+
+    shutil.rmtree(root)
+
+
+def test_archiver_rejects_unknown_formats_and_tar_levels():
+    with pytest.raises(ValueError):
+        PackageArchiver("rar")
+    with pytest.raises(ValueError):
+        PackageArchiver("tar.gz", levels={"*.json": 9})
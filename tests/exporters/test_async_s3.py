@@ -0,0 +1,87 @@
+import asyncio
+import time
+from pathlib import Path
+
+import pytest
+
+from delibird.exporters.archive import PackageArchiver
+from delibird.exporters.async_s3 import AsyncS3Exporter
+from delibird.exporters.disk_cache import DiskCache
+from delibird.exporters.transfer import TransferController
+
+
+def test_async_export_and_load(s3_exporter, build_package):
+    packages = [build_package(f"package_{i}") for i in range(3)]
+
+    async def run():
+        async with AsyncS3Exporter(bucket_name="delibird-test") as exporter:
+            await exporter.export_many(packages, pack_threshold=1024)
+            loaded = await exporter.load_many([package.name for package in packages])
+            names = await exporter.list_packages()
+            file = await exporter.get("package_0", "outer/inner/a.json")
+            [missing] = await exporter.load_many(["missing"], return_exceptions=True)
+            return loaded, names, file, missing
+
+    loaded, names, file, missing = asyncio.run(run())
+
+    assert [package.folders for package in loaded] == [
+        package.folders for package in packages
+    ]
+    assert names == [package.name for package in packages]
+    assert file == packages[0].get("outer/inner/a.json")
+    assert isinstance(missing, ValueError)
+
+
+def test_async_compressed_export(s3_exporter, build_package):
+    package = build_package("package")
+
+    async def run():
+        async with AsyncS3Exporter(bucket_name="delibird-test") as exporter:
+            await exporter.export(
+                package, compress=True, archiver=PackageArchiver("tar.gz")
+            )
+            description = await exporter.describe("package", compressed=True)
+            loaded = await exporter.load("package", compressed=True)
+            with pytest.raises(ValueError):
+                await exporter.export(package, archiver=PackageArchiver("tar.gz"))
+            return description, loaded
+
+    description, loaded = asyncio.run(run())
+
+    assert description.file_count == 3
+    assert loaded.folders == package.folders
+
+
+def test_async_exporter_options_and_close(s3_exporter, build_package):
+    package = build_package("package")
+    transfer = TransferController(max_concurrency=4)
+    disk_cache = DiskCache(Path("disk_cache"))
+
+    async def run():
+        exporter = AsyncS3Exporter(
+            bucket_name="delibird-test", transfer=transfer, disk_cache=disk_cache
+        )
+        async with exporter:
+            await exporter.export(package)
+            loaded = await exporter.load("package")
+            assert exporter._exporter.transfer is transfer
+
+            # Closing waits for running calls without blocking the event loop
+            slow = asyncio.create_task(exporter._run(time.sleep, 0.3))
+            await asyncio.sleep(0)
+            ticks = 0
+
+            async def tick():
+                nonlocal ticks
+                while not slow.done():
+                    ticks += 1
+                    await asyncio.sleep(0.01)
+
+            await asyncio.gather(exporter.close(), tick())
+        return loaded, ticks
+
+    loaded, ticks = asyncio.run(run())
+
+    assert loaded.folders == package.folders
+    assert any(path.is_file() for path in Path("disk_cache/objects").rglob("*"))
+    assert ticks > 5
@@ -0,0 +1,76 @@
+import time
+
+from delibird import Package
+from delibird.exporters.cache import PackageCache, estimate_package_size
+
+
+def test_cache_hit_and_version_mismatch():
+    cache = PackageCache(max_bytes=100)
+    package = Package(name="test")
+    cache.put("test", '"v1"', package, size=10)
+
+    assert cache.get("test", '"v1"') is package
+    assert cache.get("test", '"v2"') is None
+    assert "test" not in cache
+    assert cache.hits == 1
+    assert cache.misses == 1
+
+
+def test_cache_revalidate_after():
+    cache = PackageCache(revalidate_after=0.05)
+    package = Package(name="test")
+    cache.put("test", '"v1"', package, size=10)
+
+    assert cache.get("test") is package
+    time.sleep(0.06)
+    assert cache.get("test") is None
+    # A successful revalidation restarts the window
+    assert cache.get("test", '"v1"') is package
+    assert cache.get("test") is package
+
+
+def test_cache_without_revalidate_window_always_checks():
+    cache = PackageCache()
+    cache.put("test", '"v1"', Package(name="test"), size=10)
+    assert cache.get("test") is None
+
+
+def test_cache_lru_eviction():
+    cache = PackageCache(max_bytes=25)
+    cache.put("a", '"v1"', Package(name="a"), size=10)
+    cache.put("b", '"v1"', Package(name="b"), size=10)
+    cache.get("a", '"v1"')
+    cache.put("c", '"v1"', Package(name="c"), size=10)
+
+    assert "a" in cache
+    assert "b" not in cache
+    assert "c" in cache
+    assert cache.size == 20
+
+
+def test_cache_skips_oversized_packages():
+    cache = PackageCache(max_bytes=25)
+    cache.put("a", '"v1"', Package(name="a"), size=10)
+    cache.put("b", '"v1"', Package(name="b"), size=30)
+    assert "a" in cache
+    assert "b" not in cache
+
+
+def test_cache_invalidate():
+    cache = PackageCache()
+    cache.put("a", '"v1"', Package(name="a"), size=10)
+    cache.invalidate("a")
+    assert len(cache) == 0
+    assert cache.size == 0
+
+
+def test_cache_charges_packages_by_their_size_in_memory(build_package, tmp_path):
+    package = build_package("test")
+    cache = PackageCache()
+    cache.put("test", '"v1"', package)
+
+    package.root = tmp_path
+    package.dump()
+    on_disk = sum(path.stat().st_size for path in tmp_path.rglob("*.json"))
+    assert cache.size == estimate_package_size(package)
+    assert cache.size > on_disk
@@ -0,0 +1,43 @@
+import threading
+
+from delibird.exporters.clients import clear_s3_clients, get_s3_client
+
+
+def test_clients_are_shared():
+    client = get_s3_client("http://localhost:9000")
+
+    assert get_s3_client("http://localhost:9000") is client
+    assert get_s3_client("http://localhost:9001") is not client
+    assert get_s3_client("http://localhost:9000", max_pool_connections=8) is not client
+    assert client.meta.config.max_pool_connections == 128
+
+    clear_s3_clients()
+    assert get_s3_client("http://localhost:9000") is not client
+
+
+def test_clients_created_once_across_threads():
+    clear_s3_clients()
+    clients = []
+    threads = [
+        threading.Thread(
+            target=lambda: clients.append(get_s3_client("http://localhost:9000"))
+        )
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len({id(client) for client in clients}) == 1
+
+
+def test_client_retries_and_timeouts():
+    client = get_s3_client("http://localhost:9000")
+    transfers = get_s3_client("http://localhost:9000", max_attempts=8, timeout=5)
+
+    assert transfers is not client
+    assert client.meta.config.retries["total_max_attempts"] == 1
+    assert transfers.meta.config.retries["total_max_attempts"] == 8
+    assert transfers.meta.config.read_timeout == 5
+    assert transfers.meta.config.connect_timeout == 5
@@ -0,0 +1,134 @@
+import os
+import shutil
+import threading
+from pathlib import Path
+
+from delibird.exporters.disk_cache import DiskCache
+
+
+def test_disk_cache_fills_once():
+    cache = DiskCache(Path("test_disk_cache"))
+    fills = []
+
+    def fill(path: Path):
+        fills.append(path)
+        path.write_bytes(b"content")
+
+    cache.fetch('"etag"', 7, Path("test_disk_cache_a"), fill)
+    cache.fetch('"etag"', 7, Path("test_disk_cache_b"), fill)
+
+    assert len(fills) == 1
+    assert Path("test_disk_cache_a").read_bytes() == b"content"
+    assert Path("test_disk_cache_b").read_bytes() == b"content"
+    assert cache.path('"etag"', 7) is not None
+    assert cache.path('"other"', 7) is None
+
+    Path("test_disk_cache_a").unlink()
+    Path("test_disk_cache_b").unlink()
+    shutil.rmtree("test_disk_cache")
+
+
+def test_disk_cache_concurrent_fetches_fill_once():
+    cache = DiskCache(Path("test_disk_cache"))
+    fills = []
+
+    def fill(path: Path):
+        fills.append(path)
+        path.write_bytes(b"content")
+
+    threads = [
+        threading.Thread(
+            target=cache.fetch,
+            args=('"etag"', 7, Path(f"test_disk_cache_{i}"), fill),
+        )
+        for i in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(fills) == 1
+    for i in range(8):
+        assert Path(f"test_disk_cache_{i}").read_bytes() == b"content"
+        Path(f"test_disk_cache_{i}").unlink()
+    shutil.rmtree("test_disk_cache")
+
+
+def test_disk_cache_failed_fill_leaves_no_entry():
+    cache = DiskCache(Path("test_disk_cache"))
+
+    def fill(path: Path):
+        path.write_bytes(b"partial")
+        raise OSError("connection reset")
+
+    try:
+        cache.fetch('"etag"', 7, Path("test_disk_cache_a"), fill)
+    except OSError:
+        pass
+
+    assert cache.path('"etag"', 7) is None
+    assert not any(
+        path.is_file() for path in Path("test_disk_cache/objects").rglob("*")
+    )
+    shutil.rmtree("test_disk_cache")
+
+
+def test_disk_cache_evicts_least_recently_used():
+    cache = DiskCache(Path("test_disk_cache"))
+    for i, etag in enumerate(['"a"', '"b"', '"c"']):
+        cache.fetch(
+            etag, 10, Path("test_disk_cache_a"), lambda p: p.write_bytes(b"x" * 10)
+        )
+        entry = cache.path(etag, 10)
+        os.utime(entry, (i, i))
+    # Reading "a" makes it the most recently used entry
+    cache.path('"a"', 10)
+    cache.max_bytes = 25
+    cache.evict()
+
+    assert cache.path('"a"', 10) is not None
+    assert cache.path('"b"', 10) is None
+    assert cache.path('"c"', 10) is not None
+
+    Path("test_disk_cache_a").unlink()
+    shutil.rmtree("test_disk_cache")
+
+
+def test_disk_cache_objects_over_budget_skip_the_cache():
+    cache = DiskCache(Path("test_disk_cache"), max_bytes=100)
+    content = b"x" * 500
+
+    # Known to be too large up front, and only once downloaded
+    cache.fetch('"a"', 500, Path("test_disk_cache_a"), lambda p: p.write_bytes(content))
+    cache.fetch('"b"', 0, Path("test_disk_cache_b"), lambda p: p.write_bytes(content))
+
+    assert Path("test_disk_cache_a").read_bytes() == content
+    assert Path("test_disk_cache_b").read_bytes() == content
+    assert not any(
+        path.is_file() for path in Path("test_disk_cache/objects").rglob("*")
+    )
+
+    Path("test_disk_cache_a").unlink()
+    Path("test_disk_cache_b").unlink()
+    shutil.rmtree("test_disk_cache")
+
+
+def test_disk_cache_refills_entries_evicted_elsewhere():
+    cache = DiskCache(Path("test_disk_cache"), max_bytes=100)
+    fills = []
+
+    def fill(path: Path):
+        fills.append(path)
+        path.write_bytes(b"x" * 60)
+
+    cache.fetch('"a"', 60, Path("test_disk_cache_a"), fill)
+    # As if another process evicted it
+    cache.path('"a"', 60).unlink()
+    cache.fetch('"a"', 60, Path("test_disk_cache_a"), fill)
+
+    assert len(fills) == 2
+    assert Path("test_disk_cache_a").read_bytes() == b"x" * 60
+
+    Path("test_disk_cache_a").unlink()
+    shutil.rmtree("test_disk_cache")
@@ -0,0 +1,58 @@
+from pathlib import Path
+
+from delibird.exporters.journal import ExportJournal
+
+
+def test_journal_replay():
+    path = Path(".") / "test.journal"
+    journal = ExportJournal(path)
+    assert not journal
+
+    journal.complete("package/a.json")
+    journal.start_upload("package/big.json", "upload-1")
+    journal.complete_part("package/big.json", 1, '"etag-1"')
+    journal.complete_part("package/big.json", 2, '"etag-2"')
+    journal.staged("fingerprint")
+
+    replayed = ExportJournal(path)
+    assert replayed.fingerprint == "fingerprint"
+    assert replayed
+    assert replayed.is_completed("package/a.json")
+    assert not replayed.is_completed("package/big.json")
+    assert replayed.upload_id("package/big.json") == "upload-1"
+    assert replayed.parts("package/big.json") == {1: '"etag-1"', 2: '"etag-2"'}
+
+    replayed.complete("package/big.json")
+    assert ExportJournal(path).upload_id("package/big.json") is None
+
+    replayed.reset()
+    assert not path.exists()
+    assert replayed.fingerprint is None
+
+
+def test_journal_restarted_upload_drops_parts():
+    path = Path(".") / "test.journal"
+    journal = ExportJournal(path)
+    journal.start_upload("package/big.json", "upload-1")
+    journal.complete_part("package/big.json", 1, '"etag-1"')
+    journal.start_upload("package/big.json", "upload-2")
+
+    replayed = ExportJournal(path)
+    assert replayed.upload_id("package/big.json") == "upload-2"
+    assert replayed.parts("package/big.json") == {}
+
+    replayed.reset()
+
+
+def test_journal_ignores_truncated_entry():
+    path = Path(".") / "test.journal"
+    journal = ExportJournal(path)
+    journal.complete("package/a.json")
+    with open(path, "a") as f:
+        f.write('{"key": "package/b.js')
+
+    replayed = ExportJournal(path)
+    assert replayed.is_completed("package/a.json")
+    assert not replayed.is_completed("package/b.json")
+
+    replayed.reset()
@@ -0,0 +1,116 @@
+import gzip
+import shutil
+import threading
+from pathlib import Path
+
+import pytest
+from pydantic import BaseModel
+
+from delibird import File, Folder, Package
+from delibird.encoders.paginated_pydantic_encoder import PaginatedPydanticEncoder
+from delibird.exporters.pipeline import ByteBudget, ExportPipeline
+
+
+class SimpleModel(BaseModel):
+    name: str
+    age: int
+
+
+def build_package(test_content) -> Package:
+    folder = Folder(name="test")
+    for i in range(20):
+        folder.add_file(File(filename=f"test{i}.json", content=test_content))
+    folder.add_file(
+        File(
+            filename="paginated.json",
+            content=[SimpleModel(name=f"test_{i}", age=i) for i in range(10)],
+            content_encoder=PaginatedPydanticEncoder,
+            dump_kwargs={"page_size": 3},
+        )
+    )
+    folder.add_folder(
+        Folder(name="nested").add_file(File(filename="test.json", content=test_content))
+    )
+    return Package(name="test_pipeline").add_folder(folder)
+
+
+def test_pipeline_matches_dump(test_content):
+    package = build_package(test_content)
+    uploaded = {}
+    lock = threading.Lock()
+
+    def upload(key, data, extra_args):
+        with lock:
+            uploaded[key] = data
+
+    ExportPipeline(encode_workers=3, upload_workers=3).run(package, upload)
+
+    package.dump()
+    directory = Path(".") / "test_pipeline"
+    expected = {
+        str(path.relative_to(Path("."))): path.read_bytes()
+        for path in directory.rglob("*")
+        if path.is_file()
+    }
+    assert uploaded == expected
+
+    shutil.rmtree(directory)
+
+
+def test_pipeline_respects_byte_budget(test_content, monkeypatch):
+    budgets = []
+
+    class TrackingByteBudget(ByteBudget):
+        peak = 0
+
+        def acquire(self, size):
+            super().acquire(size)
+            self.peak = max(self.peak, self.in_use)
+
+    def make_budget(max_bytes):
+        budgets.append(TrackingByteBudget(max_bytes))
+        return budgets[-1]
+
+    monkeypatch.setattr("delibird.exporters.pipeline.ByteBudget", make_budget)
+    sizes = []
+
+    def upload(key, data, extra_args):
+        sizes.append(len(data))
+
+    max_buffered_bytes = 64
+    ExportPipeline(
+        encode_workers=4, upload_workers=1, max_buffered_bytes=max_buffered_bytes
+    ).run(build_package(test_content), upload)
+
+    # An item larger than the budget is only ever admitted on its own
+    assert 0 < budgets[0].peak <= max(max_buffered_bytes, max(sizes))
+    assert budgets[0].in_use == 0
+
+
+def test_pipeline_compression(test_content):
+    package = build_package(test_content)
+    uploaded = {}
+
+    def upload(key, data, extra_args):
+        uploaded[key] = (data, extra_args)
+
+    ExportPipeline(compress_level=9).run(package, upload)
+
+    data, extra_args = uploaded["test_pipeline/test/paginated_0.json"]
+    assert extra_args == {"ContentEncoding": "gzip"}
+    assert gzip.decompress(data).startswith(b"[")
+
+    # Tiny objects that do not shrink are sent as they are
+    data, extra_args = uploaded["test_pipeline/test/test0.json"]
+    assert extra_args == {}
+    assert data == test_content.model_dump_json().encode()
+
+
+def test_pipeline_propagates_upload_errors(test_content):
+    package = build_package(test_content)
+
+    def upload(key, data, extra_args):
+        raise RuntimeError("upload failed")
+
+    with pytest.raises(RuntimeError, match="upload failed"):
+        ExportPipeline(max_buffered_bytes=16).run(package, upload)
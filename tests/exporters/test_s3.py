@@ -0,0 +1,205 @@
+import pytest
+
+from delibird.core import instrumentation
+from delibird.core.instrumentation import MetricsRecorder
+from delibird.exporters.archive import PackageArchiver
+from delibird.exporters.disk_cache import DiskCache
+from delibird.exporters.s3 import COMPLETION_MARKER, IN_PROGRESS_MARKER
+
+
+def keys(exporter, prefix: str = "") -> list[str]:
+    response = exporter.s3.list_objects_v2(Bucket=exporter.bucket_name, Prefix=prefix)
+    return sorted(file["Key"] for file in response.get("Contents", []))
+
+
+def test_export_and_load(s3_exporter, build_package):
+    package = build_package("package")
+    s3_exporter.export(package, pack_threshold=1024)
+
+    assert f"package/{COMPLETION_MARKER}" in keys(s3_exporter)
+    assert s3_exporter.load("package").folders == package.folders
+    assert s3_exporter.get("package", "outer/inner/a.json") == package.get(
+        "outer/inner/a.json"
+    )
+    assert s3_exporter.describe("package").file_count == 3
+    assert s3_exporter.list_packages() == ["package"]
+
+
+def test_incomplete_package_is_not_loaded(s3_exporter, build_package):
+    package = build_package("package")
+    s3_exporter.export(package)
+    # As left by an export interrupted while replacing the package
+    s3_exporter._retract_completion("package")
+
+    assert f"package/{COMPLETION_MARKER}" not in keys(s3_exporter)
+    assert f"package/{IN_PROGRESS_MARKER}" in keys(s3_exporter)
+    with pytest.raises(ValueError, match="incomplete"):
+        s3_exporter.load("package")
+    assert s3_exporter.load("package", require_complete=False).folders == (
+        package.folders
+    )
+    with pytest.raises(ValueError, match="does not exist"):
+        s3_exporter.load("missing")
+
+
+def test_packages_without_markers_load(s3_exporter, build_package):
+    package = build_package("package")
+    s3_exporter.export(package)
+    # Exported before completion markers were introduced
+    s3_exporter._delete_object(f"package/{COMPLETION_MARKER}")
+
+    assert s3_exporter.load("package").folders == package.folders
+    assert s3_exporter.describe("package").complete
+
+
+def test_resumable_export_skips_uploaded_files(s3_exporter, build_package):
+    package = build_package("package")
+    upload_file = s3_exporter.s3.upload_file
+    uploaded = []
+
+    def failing_upload_file(*args, **kwargs):
+        uploaded.append(args[2])
+        if len(uploaded) == 2:
+            raise ConnectionError("simulated network failure")
+        return upload_file(*args, **kwargs)
+
+    s3_exporter.s3.upload_file = failing_upload_file
+    try:
+        with pytest.raises(ConnectionError):
+            s3_exporter.export(package, resumable=True)
+        with pytest.raises(ValueError, match="incomplete"):
+            s3_exporter.load("package")
+        s3_exporter.export(package, resumable=True)
+    finally:
+        del s3_exporter.s3.upload_file
+
+    # The file uploaded before the failure is not sent again
+    assert len(uploaded) == len(set(uploaded)) + 1
+    assert s3_exporter.load("package").folders == package.folders
+
+
+def test_resumed_export_picks_up_edits(s3_exporter, build_package):
+    package = build_package("package")
+    upload_file = s3_exporter.s3.upload_file
+    uploads = []
+
+    def failing_upload_file(*args, **kwargs):
+        uploads.append(args[2])
+        if len(uploads) == 3:
+            raise ConnectionError("simulated network failure")
+        return upload_file(*args, **kwargs)
+
+    s3_exporter.s3.upload_file = failing_upload_file
+    try:
+        with pytest.raises(ConnectionError):
+            s3_exporter.export(package, resumable=True)
+    finally:
+        del s3_exporter.s3.upload_file
+    # Edited between attempts, the files already uploaded are stale
+    for file in package["outer"]["inner"].files + package["outer"].files:
+        file.content.age += 10
+    s3_exporter.export(package, resumable=True)
+
+    assert s3_exporter.load("package").folders == package.folders
+
+
+def test_selective_load(s3_exporter, build_package):
+    package = build_package("package")
+    s3_exporter.export(package, pack_threshold=1024)
+
+    loaded = s3_exporter.load("package", select="outer/inner/*.json")
+
+    assert loaded["outer"].files == []
+    assert loaded["outer"]["inner"] == package["outer"]["inner"]
+
+
+def test_export_many_and_load_many(s3_exporter, build_package):
+    packages = [build_package(f"package_{i}") for i in range(4)]
+
+    assert s3_exporter.export_many(packages) == [None] * 4
+    # Staging happens in isolated directories that are removed afterwards
+    assert not any(
+        path.name.startswith(".package_") for path in packages[0].root.iterdir()
+    )
+    names = [package.name for package in packages] * 2
+    for package, loaded in zip(packages * 2, s3_exporter.load_many(names)):
+        assert loaded.folders == package.folders
+    [missing] = s3_exporter.load_many(["missing"], return_exceptions=True)
+    assert isinstance(missing, ValueError)
+
+
+def test_versioned_export_copies_unchanged_files(s3_exporter, build_package):
+    package = build_package("package")
+    s3_exporter.export(package, version="1")
+    package["outer"]["c.json"].age = 30
+
+    recorder = MetricsRecorder()
+    with instrumentation.subscribed(recorder):
+        s3_exporter.export(package, version="2", base_version="1")
+
+    # Only c.json changed, every other file and metadata is copied within S3
+    assert recorder.counters["s3.objects_copied"] == 5
+    assert s3_exporter.list_versions("package") == ["1", "2"]
+    assert s3_exporter.load("package", version="1")["outer"]["c.json"].age == 3
+    assert s3_exporter.load("package", version="2")["outer"]["c.json"].age == 30
+
+
+def test_sharded_export(s3_exporter, build_package):
+    package = build_package("package")
+    package.add_folder(
+        build_package("other")["outer"].model_copy(update={"name": "second"})
+    )
+    s3_exporter.export(package, compress=True, shards=2)
+
+    assert s3_exporter.list_packages(compressed=True) == ["package"]
+    assert keys(s3_exporter, "package.shards/") == [
+        "package.shards/0.zip",
+        "package.shards/1.zip",
+        "package.shards/__manifest__.json",
+    ]
+    loaded = s3_exporter.load("package", compressed=True)
+    assert loaded.paths() == package.paths()
+    assert loaded["second"]["inner"] == package["second"]["inner"]
+    assert s3_exporter.describe("package", compressed=True).file_count == 6
+
+    # Fewer shards than before: the stale ones are removed
+    s3_exporter.export(package, compress=True, shards=1)
+    assert keys(s3_exporter, "package.shards/") == [
+        "package.shards/0.zip",
+        "package.shards/__manifest__.json",
+    ]
+
+
+def test_archive_format_is_detected(s3_exporter, build_package):
+    package = build_package("package")
+    s3_exporter.export(package, compress=True)
+    s3_exporter.export(package, compress=True, archiver=PackageArchiver("tar.xz"))
+
+    # The zip from the first export is replaced, not left to shadow the new one
+    assert keys(s3_exporter) == ["package.tar.xz"]
+    assert s3_exporter.list_packages(compressed=True) == ["package"]
+    assert s3_exporter.load("package", compressed=True).folders == package.folders
+    assert s3_exporter.describe("package", compressed=True).file_count == 3
+
+    with pytest.raises(ValueError):
+        s3_exporter.export(package, archiver=PackageArchiver("tar.gz"))
+
+
+def test_get_is_served_from_the_disk_cache(s3_exporter, build_package, tmp_path):
+    package = build_package("package")
+    s3_exporter.export(package)
+    s3_exporter.disk_cache = DiskCache(tmp_path / "cache")
+    get_object = s3_exporter.s3.get_object
+    fetched = []
+    s3_exporter.s3.get_object = lambda **kwargs: (
+        fetched.append(kwargs["Key"]) or get_object(**kwargs)
+    )
+    try:
+        first = s3_exporter.get("package", "outer/inner/a.json")
+        fetched.clear()
+        second = s3_exporter.get("package", "outer/inner/a.json")
+    finally:
+        del s3_exporter.s3.get_object
+
+    assert first == second == package.get("outer/inner/a.json")
+    assert fetched == []
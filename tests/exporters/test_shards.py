@@ -0,0 +1,76 @@
+import shutil
+import zipfile
+from pathlib import Path
+
+from delibird.core.selection import PathSelector
+from delibird.exporters.shards import Shard, ShardManifest, plan_shards, write_shard
+
+
+def make_tree(root: Path, sizes: dict[str, int]) -> None:
+    for path, size in sizes.items():
+        (root / path).parent.mkdir(parents=True, exist_ok=True)
+        (root / path).write_bytes(b"x" * size)
+
+
+def test_plan_shards_balances_folders():
+    root = Path("test_shards")
+    make_tree(
+        root,
+        {
+            "a/file": 100,
+            "b/file": 60,
+            "b/c/file": 50,
+            "d/file": 40,
+            "d/other": 5,
+        },
+    )
+
+    plan = plan_shards(root, 2)
+
+    assert sorted(folder for shard in plan for folder in shard) == [
+        "",
+        "a",
+        "b",
+        "b/c",
+        "d",
+    ]
+    assert sorted(plan) == [["", "b", "b/c"], ["a", "d"]]
+
+    shutil.rmtree(root)
+
+
+def test_plan_shards_drops_empty_shards():
+    root = Path("test_shards")
+    make_tree(root, {"a/file": 10})
+
+    assert len(plan_shards(root, 8)) == 2
+
+    shutil.rmtree(root)
+
+
+def test_write_shard_keeps_folders_whole():
+    root = Path("test_shards")
+    make_tree(root, {"a/file": 10, "a/b/file": 10, "root": 1})
+
+    write_shard(root, ["", "a"], Path("test_shards.zip"))
+
+    with zipfile.ZipFile("test_shards.zip") as archive:
+        assert sorted(archive.namelist()) == ["a/file", "root"]
+
+    Path("test_shards.zip").unlink()
+    shutil.rmtree(root)
+
+
+def test_manifest_select():
+    manifest = ShardManifest(
+        shards=[
+            Shard(filename="0.zip", folders=["", "a"], size=1),
+            Shard(filename="1.zip", folders=["b", "b/c"], size=1),
+            Shard(filename="2.zip", folders=["d"], size=1),
+        ]
+    )
+
+    selected = manifest.select(PathSelector("b/c/*.json"))
+
+    assert [shard.filename for shard in selected] == ["0.zip", "1.zip"]
+    assert manifest.select(None) == manifest.shards
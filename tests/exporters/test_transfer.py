@@ -0,0 +1,145 @@
+import threading
+import time
+
+import pytest
+from boto3.exceptions import S3UploadFailedError
+from botocore.exceptions import ClientError
+
+from delibird.core import instrumentation
+from delibird.exporters.transfer import (
+    TransferController,
+    is_throttling_error,
+    is_transient_error,
+)
+
+
+def client_error(code: str, status: int) -> ClientError:
+    return ClientError(
+        {"Error": {"Code": code}, "ResponseMetadata": {"HTTPStatusCode": status}},
+        "PutObject",
+    )
+
+
+def test_error_classification():
+    assert is_throttling_error(client_error("SlowDown", 503))
+    assert is_throttling_error(client_error("Unknown", 429))
+    assert not is_throttling_error(client_error("NoSuchKey", 404))
+    assert is_transient_error(client_error("InternalError", 500))
+    assert not is_transient_error(client_error("AccessDenied", 403))
+    assert not is_throttling_error(ValueError("boom"))
+
+    try:
+        try:
+            raise client_error("SlowDown", 503)
+        except ClientError:
+            raise S3UploadFailedError("Failed to upload")
+    except S3UploadFailedError as error:
+        assert is_throttling_error(error)
+
+
+def test_call_retries_throttling_and_backs_off():
+    controller = TransferController(base_delay=0.001, initial_concurrency=8)
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise client_error("SlowDown", 503)
+        return "ok"
+
+    assert controller.call(flaky) == "ok"
+    assert len(attempts) == 3
+    assert controller.retries == 2
+    assert controller.throttles == 2
+    assert controller.concurrency < 8
+
+
+def test_call_does_not_retry_permanent_errors():
+    controller = TransferController(base_delay=0.001)
+    attempts = []
+
+    def forbidden():
+        attempts.append(1)
+        raise client_error("AccessDenied", 403)
+
+    with pytest.raises(ClientError):
+        controller.call(forbidden)
+    assert len(attempts) == 1
+
+
+def test_call_gives_up_after_max_attempts():
+    controller = TransferController(max_attempts=3, base_delay=0.001)
+    attempts = []
+
+    def throttled():
+        attempts.append(1)
+        raise client_error("SlowDown", 503)
+
+    with pytest.raises(ClientError):
+        controller.call(throttled)
+    assert len(attempts) == 3
+
+
+def test_call_deadline():
+    controller = TransferController(base_delay=10, max_delay=10, deadline=0.05)
+
+    def throttled():
+        raise client_error("SlowDown", 503)
+
+    with pytest.raises(TimeoutError):
+        controller.call(throttled)
+
+
+def test_additive_increase():
+    controller = TransferController(initial_concurrency=2, max_concurrency=4)
+    for _ in range(100):
+        controller.call(lambda: None)
+    assert controller.concurrency == 4
+
+
+def test_map_respects_concurrency_limit():
+    controller = TransferController(
+        initial_concurrency=2, min_concurrency=2, max_concurrency=2
+    )
+    lock = threading.Lock()
+    running = [0]
+    peak = [0]
+
+    def transfer(i):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.01)
+        with lock:
+            running[0] -= 1
+        return i
+
+    results = controller.map(
+        lambda i: controller.call(transfer, i), [(i,) for i in range(10)]
+    )
+    assert results == list(range(10))
+    assert peak[0] == 2
+
+
+def test_retries_and_map_progress_are_instrumented():
+    controller = TransferController(base_delay=0.001)
+    attempts = []
+
+    def flaky(i):
+        attempts.append(i)
+        if attempts.count(i) == 1:
+            raise client_error("SlowDown", 503)
+        return i
+
+    events = []
+    with instrumentation.subscribed(events.append):
+        assert controller.map(
+            lambda i: controller.call(flaky, i), [(0,), (1,)], progress="upload"
+        ) == [0, 1]
+
+    counters = [event for event in events if event.kind == "counter"]
+    assert sum(e.value for e in counters if e.name == "transfer.retries") == 2
+    assert sum(e.value for e in counters if e.name == "transfer.throttles") == 2
+    done = [event.value for event in events if event.kind == "progress"]
+    assert done == [1, 2]
+    assert all(event.total == 2 for event in events if event.kind == "progress")
@@ -0,0 +1,32 @@
+import hashlib
+from pathlib import Path
+
+from delibird.exporters.s3 import MULTIPART_CHUNKSIZE, etag_matches, versioned_name
+
+
+def test_versioned_name():
+    assert versioned_name("test", None) == "test"
+    assert versioned_name("test", "2") == "test@2"
+
+
+def test_etag_matches_single_part():
+    path = Path("test_etag")
+    path.write_bytes(b"content")
+
+    assert etag_matches(path, f'"{hashlib.md5(b"content").hexdigest()}"')
+    assert not etag_matches(path, f'"{hashlib.md5(b"other").hexdigest()}"')
+
+    path.unlink()
+
+
+def test_etag_matches_multipart():
+    path = Path("test_etag")
+    data = b"x" * (MULTIPART_CHUNKSIZE + 10)
+    path.write_bytes(data)
+    parts = [data[:MULTIPART_CHUNKSIZE], data[MULTIPART_CHUNKSIZE:]]
+    digest = hashlib.md5(b"".join(hashlib.md5(part).digest() for part in parts))
+
+    assert etag_matches(path, f'"{digest.hexdigest()}-2"')
+    assert not etag_matches(path, f'"{digest.hexdigest()}-3"')
+
+    path.unlink()